@@ -0,0 +1,121 @@
+"""
+Shared helpers for the Dev_Tools benchmarks
+-------------------------------------------
+Deterministic synthetic inputs (sequences, structures, plists, FASTA files)
+and a timing helper that reports median/IQR wall time and peak Python
+allocations per call. Same seed and length always give the same input, so
+results from different runs and machines are comparable.
+"""
+
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Add engine path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNAfold_to_RNArtist_engine as engine
+
+
+BENCH_LENGTHS = [100, 500, 1000, 5000, 10000]
+
+
+def synthetic_sequence(length, seed=0):
+    """Random RNA sequence of `length` nt."""
+    rng = random.Random(f"seq-{seed}-{length}")
+    return ''.join(rng.choice("ACGU") for _ in range(length))
+
+
+def synthetic_structure(length, seed=0):
+    """Dot-bracket string of consecutive hairpins (4-8 bp stems, 3-8 nt loops)."""
+    rng = random.Random(f"struct-{seed}-{length}")
+    parts = []
+    pos = 0
+    while pos < length:
+        stem, loop, spacer = rng.randint(4, 8), rng.randint(3, 8), rng.randint(0, 5)
+        if pos + 2 * stem + loop > length:
+            parts.append('.' * (length - pos))
+            break
+        parts.append('(' * stem + '.' * loop + ')' * stem + '.' * min(spacer, length - pos - 2 * stem - loop))
+        pos += len(parts[-1])
+    return ''.join(parts)[:length]
+
+
+def synthetic_plist(structure, seed=0, alternatives=3):
+    """
+    Plist for `structure`: its pairs with high probability plus a few weak
+    alternative pairs per base, as engine.PlistEntry (1-based i < j).
+    """
+    rng = random.Random(f"plist-{seed}-{len(structure)}")
+    entries = []
+    stack = []
+    for idx, char in enumerate(structure, start=1):
+        if char == '(':
+            stack.append(idx)
+        elif char == ')':
+            entries.append(engine.PlistEntry(stack.pop(), idx, rng.uniform(0.5, 0.95)))
+    length = len(structure)
+    for i in range(1, length - 4):
+        for _ in range(rng.randint(0, alternatives)):
+            j = rng.randint(i + 4, min(length, i + 200))
+            entries.append(engine.PlistEntry(i, j, rng.uniform(0.0, 0.05)))
+    entries.sort(key=lambda e: (e.i, e.j))
+    return entries
+
+
+def write_fasta(path, records, width=80):
+    """Write (header, seq) records as FASTA wrapped at `width`."""
+    with open(path, 'w') as f:
+        for header, seq in records:
+            f.write(f">{header}\n")
+            for start in range(0, len(seq), width):
+                f.write(seq[start:start + width] + "\n")
+    return path
+
+
+def summarize_samples(samples):
+    """Median, interquartile range and min of a list of timings."""
+    if len(samples) >= 2:
+        q1, _, q3 = statistics.quantiles(samples, n=4, method='inclusive')
+    else:
+        q1 = q3 = samples[0]
+    return {
+        'median': statistics.median(samples),
+        'iqr': q3 - q1,
+        'min': min(samples),
+        'samples': list(samples),
+    }
+
+
+def time_call(func, *args, repeat=5, quiet=True, **kwargs):
+    """
+    Time func(*args, **kwargs) `repeat` times after one warm-up call, then once
+    more under tracemalloc for the allocation peak (kept separate so tracing does
+    not skew timings). Returns summarize_samples() plus 'peak_kb'.
+    """
+    sink = io.StringIO()
+    samples = []
+    with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+        func(*args, **kwargs)  # Warm-up: imports, colormap lookups, file cache
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+            t_start = time.perf_counter()
+            func(*args, **kwargs)
+            samples.append(time.perf_counter() - t_start)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+        func(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    if not was_tracing:
+        tracemalloc.stop()
+    result = summarize_samples(samples)
+    result['peak_kb'] = (peak - base) / 1024
+    return result
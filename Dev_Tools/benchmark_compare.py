@@ -0,0 +1,197 @@
+"""
+Benchmark Baselines & Regression Gate
+-------------------------------------
+Records benchmark results as a JSON baseline and compares later runs against
+it. Every metric is a median over repeated trials; a change only counts when
+it exceeds the relative threshold, the noise band (IQR of either run) and a
+small absolute floor, and the best-of-N time agrees, so jitter on a busy
+machine does not fail the gate.
+
+Usage:
+    python benchmark_compare.py record  [--suite micro|scaling] [--out FILE] [--repeat N]
+    python benchmark_compare.py compare BASELINE CURRENT [--threshold F]
+    python benchmark_compare.py check   [--baseline FILE] [--save FILE] [--threshold F]
+
+    record   Run a suite and save it as a baseline
+             (default: benchmark_baseline.json next to this script)
+    compare  Compare two saved result files
+    check    Re-run the baseline's suite with its settings and compare
+
+Exit code: 0 = no significant slowdown, 1 = slowdown detected, 2 = usage error.
+Baselines are machine-specific: record one per machine, before your change.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+
+import benchmark_microbench
+import benchmark_scaling
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# How rows are matched between runs, per suite
+ROW_KEYS = {
+    'microbench': ('function', 'length'),
+    'scaling': ('length', 'workers', 'stages'),
+}
+
+DEFAULT_THRESHOLD = 0.25    # Relative change that counts as significant
+DEFAULT_IQR_FACTOR = 1.5    # ... and it must exceed this many IQRs
+DEFAULT_MIN_ABS = 0.0005    # ... and this many seconds
+MEMORY_THRESHOLD = 0.25     # Relative growth of peak allocations (microbench)
+MEMORY_MIN_ABS_KB = 64
+
+
+def run_suite(suite, settings):
+    """Run a suite with the given settings. Returns a result document."""
+    if suite == 'microbench':
+        rows = benchmark_microbench.run_microbenchmarks(settings['lengths'], settings['repeat'], settings.get('only'))
+    else:
+        rows = benchmark_scaling.run_matrix(
+            settings['lengths'], settings['workers'], settings['stages'], settings['sequences'],
+            settings['trials'], settings['executor'], 'fake', settings['latency'])
+    return {
+        'benchmark': suite,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'settings': settings,
+        'results': rows,
+    }
+
+
+def default_settings(suite, repeat):
+    if suite == 'microbench':
+        return {'lengths': [100, 1000, 5000], 'repeat': repeat, 'only': None}
+    return {'lengths': [100, 300], 'workers': [1, 2], 'stages': ['fold', 'full'], 'sequences': 4,
+            'trials': repeat, 'executor': 'auto', 'latency': 0.2}
+
+
+def _is_significant(base, cur, base_spread, cur_spread, threshold, iqr_factor, min_abs):
+    """True if cur differs from base beyond the relative, noise and absolute limits."""
+    return abs(cur - base) > max(threshold * base, iqr_factor * max(base_spread, cur_spread), min_abs)
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD, iqr_factor=DEFAULT_IQR_FACTOR,
+                    min_abs=DEFAULT_MIN_ABS):
+    """
+    Compare two result documents of the same suite.
+    Returns a list of rows: key, metric, baseline, current, delta (relative), status
+    where status is 'slower', 'faster', 'ok' or 'missing'.
+    """
+    suite = baseline.get('benchmark')
+    if suite != current.get('benchmark'):
+        raise ValueError(f"Cannot compare '{suite}' with '{current.get('benchmark')}' results")
+    key_fields = ROW_KEYS[suite]
+    current_rows = {tuple(r[k] for k in key_fields): r for r in current['results']}
+    report = []
+    for base in baseline['results']:
+        key = tuple(base[k] for k in key_fields)
+        cur = current_rows.get(key)
+        if cur is None:
+            report.append({'key': key, 'metric': 'median', 'baseline': base['median'], 'current': None,
+                           'delta': None, 'status': 'missing'})
+            continue
+        delta = (cur['median'] - base['median']) / base['median'] if base['median'] else 0.0
+        status = 'ok'
+        # The best-of-N time must move the same way: a burst of load on the machine
+        # shifts the median but rarely the minimum.
+        if (_is_significant(base['median'], cur['median'], base['iqr'], cur['iqr'], threshold, iqr_factor, min_abs)
+                and _is_significant(base['min'], cur['min'], 0, 0, threshold, 0, min_abs)
+                and (cur['median'] > base['median']) == (cur['min'] > base['min'])):
+            status = 'slower' if cur['median'] > base['median'] else 'faster'
+        report.append({'key': key, 'metric': 'median', 'baseline': base['median'], 'current': cur['median'],
+                       'delta': delta, 'status': status})
+        if 'peak_kb' in base and 'peak_kb' in cur:
+            mem_delta = (cur['peak_kb'] - base['peak_kb']) / base['peak_kb'] if base['peak_kb'] else 0.0
+            mem_status = 'ok'
+            if _is_significant(base['peak_kb'], cur['peak_kb'], 0, 0, MEMORY_THRESHOLD, 0, MEMORY_MIN_ABS_KB):
+                mem_status = 'slower' if cur['peak_kb'] > base['peak_kb'] else 'faster'
+            report.append({'key': key, 'metric': 'peak_kb', 'baseline': base['peak_kb'], 'current': cur['peak_kb'],
+                           'delta': mem_delta, 'status': mem_status})
+    return report
+
+
+def print_report(report):
+    """Print the comparison table. Returns the number of significant regressions."""
+    print("=" * 92)
+    print(f"{'Benchmark':<46}{'Metric':<9}{'Baseline':>11}{'Current':>11}{'Delta':>9}  Status")
+    print("-" * 92)
+    for row in report:
+        name = ' / '.join(str(k) for k in row['key'])
+        unit = 1e3 if row['metric'] == 'median' else 1.0  # ms for timings, KB for memory
+        base = f"{row['baseline'] * unit:.3f}"
+        cur = f"{row['current'] * unit:.3f}" if row['current'] is not None else "-"
+        delta = f"{row['delta'] * 100:+.1f}%" if row['delta'] is not None else "-"
+        marker = {'slower': 'SLOWER', 'faster': 'faster', 'missing': 'missing'}.get(row['status'], '')
+        metric = 'ms' if row['metric'] == 'median' else 'peak KB'
+        print(f"{name[:45]:<46}{metric:<9}{base:>11}{cur:>11}{delta:>9}  {marker}")
+    print("=" * 92)
+    regressions = sum(1 for row in report if row['status'] == 'slower')
+    improvements = sum(1 for row in report if row['status'] == 'faster')
+    print(f"Significant: {regressions} slower, {improvements} faster, of {len(report)} metrics")
+    return regressions
+
+
+def load_results(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Record benchmark baselines and detect slowdowns")
+    commands = parser.add_subparsers(dest="command", required=True)
+    limits_parser = argparse.ArgumentParser(add_help=False)
+    limits_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Relative change that counts (default: 0.25)")
+    limits_parser.add_argument("--iqr-factor", type=float, default=DEFAULT_IQR_FACTOR, help="Change must exceed this many IQRs")
+    limits_parser.add_argument("--min-abs", type=float, default=DEFAULT_MIN_ABS, help="Change must exceed this many seconds")
+
+    record = commands.add_parser("record", help="Run a suite and save it as a baseline")
+    record.add_argument("--suite", choices=["micro", "scaling"], default="micro")
+    record.add_argument("--out", type=str, default=DEFAULT_BASELINE)
+    record.add_argument("--repeat", type=int, default=7, help="Trials per benchmark")
+
+    compare = commands.add_parser("compare", parents=[limits_parser], help="Compare two saved result files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+
+    check = commands.add_parser("check", parents=[limits_parser], help="Re-run the baseline's suite and compare")
+    check.add_argument("--baseline", type=str, default=DEFAULT_BASELINE)
+    check.add_argument("--save", type=str, default=None, help="Also save the new results here")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        suite = 'microbench' if args.suite == 'micro' else 'scaling'
+        results = run_suite(suite, default_settings(suite, args.repeat))
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.out}")
+        sys.exit(0)
+
+    if args.command == "compare":
+        baseline, current = load_results(args.baseline), load_results(args.current)
+    else:
+        if not os.path.exists(args.baseline):
+            print(f"Error: baseline not found: {args.baseline}")
+            print("Record one first: python benchmark_compare.py record")
+            sys.exit(2)
+        baseline = load_results(args.baseline)
+        print(f"Re-running '{baseline['benchmark']}' with the baseline settings...")
+        current = run_suite(baseline['benchmark'], baseline['settings'])
+        if args.save:
+            with open(args.save, 'w') as f:
+                json.dump(current, f, indent=2)
+
+    try:
+        report = compare_results(baseline, current, args.threshold, args.iqr_factor, args.min_abs)
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+    sys.exit(1 if print_report(report) else 0)
@@ -0,0 +1,101 @@
+"""
+JVM Startup Benchmark for RNArtistCore
+--------------------------------------
+Measures how much an AppCDS (class-data-sharing) archive saves per render.
+Renders the same small structure N times without the archive and N times
+with it, then reports the per-render saving.
+
+Usage:
+    python benchmark_jvm_startup.py [--runs N] [--rebuild]
+
+    --runs N     Renders per configuration (default: 5)
+    --rebuild    Delete the cached archive first (includes creation time)
+"""
+
+import time
+import sys
+import os
+import argparse
+import statistics
+import tempfile
+
+# Add engine path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNAfold_to_RNArtist_engine as engine
+import RNA
+
+
+def find_jar(script_dir):
+    possible_jars = [
+        os.path.join(script_dir, "..", "RNAfold_App", "bin", "rnartistcore-0.4.6-SNAPSHOT-jar-with-dependencies.jar"),
+        os.path.join(script_dir, "..", "RNAfold_App", "bin", "RNArtistCore.jar"),
+    ]
+    for p in possible_jars:
+        if os.path.exists(p):
+            return os.path.abspath(p)
+    return None
+
+
+def time_renders(script_path, jar_path, settings, runs):
+    """Render the script `runs` times and return the wall times."""
+    times = []
+    for _ in range(runs):
+        info = engine.run_rnartist_visualization(script_path, jar_path, settings)
+        if info['returncode'] != 0:
+            print(f"Warning: render exited with {info['returncode']}")
+        times.append(info['wall_time'])
+    return times
+
+
+def run_benchmark(runs=5, rebuild=False):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    jar_path = find_jar(script_dir)
+    if not jar_path:
+        print("Error: RNArtistCore JAR not found in RNAfold_App/bin/")
+        return
+    if not engine.check_java_available():
+        return
+
+    settings = engine.get_rnartist_settings()
+    settings['cds'] = True
+    archive_path = engine.get_cds_archive_path(jar_path, settings)
+    if rebuild and os.path.exists(archive_path):
+        os.remove(archive_path)
+
+    t_start = time.time()
+    archive = engine.ensure_cds_archive(jar_path, settings)
+    t_create = time.time() - t_start
+    if not archive:
+        print("AppCDS is not available with this JVM. Nothing to compare.")
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        seq = engine.CDS_TRAINING_SEQUENCE
+        structure = RNA.fold(seq)[0]
+        vienna_file = engine.create_vienna_file(seq, structure, work_dir, "bench.vienna", "bench")
+        script_path = engine.create_rnartist_script(vienna_file, None, work_dir, seq, [], sequence_name="bench")
+
+        print("-" * 60)
+        print(f"Timing {runs} renders without archive...")
+        plain = time_renders(script_path, jar_path, dict(settings, shared_archive=None), runs)
+        print(f"Timing {runs} renders with archive...")
+        shared = time_renders(script_path, jar_path, dict(settings, shared_archive=archive), runs)
+
+    plain_med = statistics.median(plain)
+    shared_med = statistics.median(shared)
+    print("-" * 60)
+    print(f"Archive: {archive} ({os.path.getsize(archive) / 1e6:.1f} MB, ready in {t_create:.2f} s)")
+    print(f"Without CDS: median {plain_med:.3f} s  (min {min(plain):.3f} s)")
+    print(f"With CDS:    median {shared_med:.3f} s  (min {min(shared):.3f} s)")
+    if plain_med > 0:
+        saving = plain_med - shared_med
+        print(f"Startup saving: {saving:.3f} s per render ({saving / plain_med * 100:.1f} %)")
+    print("-" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark RNArtistCore JVM startup with and without AppCDS")
+    parser.add_argument("--runs", type=int, default=5, help="Renders per configuration (default: 5)")
+    parser.add_argument("--rebuild", action="store_true", help="Delete the cached archive first")
+    args = parser.parse_args()
+    run_benchmark(args.runs, args.rebuild)
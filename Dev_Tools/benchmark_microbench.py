@@ -0,0 +1,117 @@
+"""
+Microbenchmarks for the Engine Hot Paths
+----------------------------------------
+Times individual engine functions in isolation on synthetic inputs of
+increasing length (no Java, no folding), reporting the median time, IQR and
+peak Python allocations per call. Use it to spot regressions in a single
+function that an end-to-end run would hide.
+
+Usage:
+    python benchmark_microbench.py [--lengths 100 1000 ...] [--repeat N]
+                                   [--only NAME ...] [--json PATH]
+
+    --lengths  Sequence lengths in nt (default: 100 500 1000 5000 10000)
+    --repeat   Timed calls per function and length (default: 5)
+    --only     Run only these functions (see the list printed by --help)
+    --json     Also write the results as JSON (usable as a baseline later)
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+
+import bench_common
+from bench_common import engine
+
+
+def build_inputs(length, work_dir):
+    """Synthetic sequence/structure/plist plus the files the file-based functions read."""
+    seq = bench_common.synthetic_sequence(length)
+    structure = bench_common.synthetic_structure(length)
+    plist = bench_common.synthetic_plist(structure)
+    pi_values = engine.compute_base_pairing_probabilities(seq, plist)
+    paired_status = engine.get_paired_status(structure)
+    colors = engine.map_probabilities_to_colors(pi_values, paired_status, engine.SELECTED_COLORMAP, engine.COLORING_MODE)
+    stats = {'mfe': -1.0, 'ensemble_energy': -1.5, 'frequency': 0.1, 'diversity': 10.0}
+    out_dir = os.path.join(work_dir, f"len_{length}")
+    os.makedirs(out_dir, exist_ok=True)
+    name = f"bench_{length}"
+    engine.write_fold_results(seq, structure, plist, stats, out_dir, name)
+    fasta_single = bench_common.write_fasta(os.path.join(out_dir, "single.fasta"), [(name, seq)])
+    fasta_multi = bench_common.write_fasta(
+        os.path.join(out_dir, "multi.fasta"),
+        [(f"{name}_{n}", bench_common.synthetic_sequence(length, seed=n)) for n in range(10)])
+    return {
+        'seq': seq, 'structure': structure, 'plist': plist, 'stats': stats,
+        'pi_values': pi_values, 'paired_status': paired_status, 'colors': colors,
+        'out_dir': out_dir, 'name': name,
+        'vienna_file': os.path.join(out_dir, engine.create_output_filename("structure", name, "vienna")),
+        'bpp_file': os.path.join(out_dir, engine.create_output_filename("structure_basepair_probs", name, "txt")),
+        'fasta_single': fasta_single, 'fasta_multi': fasta_multi,
+    }
+
+
+# name -> callable(inputs) for one call of the function under test
+BENCHMARKS = {
+    'compute_base_pairing_probabilities': lambda d: engine.compute_base_pairing_probabilities(d['seq'], d['plist']),
+    'get_paired_status': lambda d: engine.get_paired_status(d['structure']),
+    'map_probabilities_to_colors': lambda d: engine.map_probabilities_to_colors(
+        d['pi_values'], d['paired_status'], engine.SELECTED_COLORMAP, engine.COLORING_MODE),
+    'write_fold_results': lambda d: engine.write_fold_results(
+        d['seq'], d['structure'], d['plist'], d['stats'], d['out_dir'], d['name']),
+    'create_rnartist_script': lambda d: engine.create_rnartist_script(
+        d['vienna_file'], d['bpp_file'], d['out_dir'], d['seq'], d['plist'],
+        engine.SELECTED_COLORMAP, d['name'], engine.COLORING_MODE),
+    'read_fasta': lambda d: engine.read_fasta(d['fasta_single']),
+    'parse_multi_fasta (10 records)': lambda d: engine.parse_multi_fasta(d['fasta_multi']),
+    'save_probability_results': lambda d: engine.save_probability_results(
+        d['seq'], d['pi_values'], d['colors'], d['out_dir'], engine.SELECTED_COLORMAP, d['name']),
+}
+
+
+def run_microbenchmarks(lengths, repeat=5, only=None):
+    """Run BENCHMARKS for every length. Returns a list of result rows."""
+    names = [n for n in BENCHMARKS if not only or n in only or n.split(' ')[0] in only]
+    work_dir = tempfile.mkdtemp(prefix="rnafold_microbench_")
+    rows = []
+    try:
+        for length in lengths:
+            inputs = build_inputs(length, work_dir)
+            for name in names:
+                result = bench_common.time_call(BENCHMARKS[name], inputs, repeat=repeat)
+                result.update(function=name, length=length)
+                rows.append(result)
+                print(f"{name:<38}{length:>8}{result['median'] * 1e3:>12.3f}{result['iqr'] * 1e3:>10.3f}{result['peak_kb']:>12.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks for engine hot paths")
+    parser.add_argument("--lengths", type=int, nargs="+", default=bench_common.BENCH_LENGTHS, help="Sequence lengths in nt")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per function and length")
+    parser.add_argument("--only", nargs="+", choices=[n.split(' ')[0] for n in BENCHMARKS], help="Run only these functions")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"{'Function':<38}{'Length':>8}{'Median ms':>12}{'IQR ms':>10}{'Peak KB':>12}")
+    print("-" * 80)
+    rows = run_microbenchmarks(args.lengths, args.repeat, args.only)
+    print("=" * 80)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'benchmark': 'microbench',
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'settings': {'lengths': args.lengths, 'repeat': args.repeat, 'only': args.only},
+                'results': rows,
+            }, f, indent=2)
+        print(f"Results written to {args.json}")
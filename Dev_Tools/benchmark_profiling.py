@@ -4,12 +4,15 @@ Benchmark Profiling Script for RNAfold to RNArtist Engine
 Tests parallel performance using real RNA sequences from Rfam.
 
 Usage:
-    python benchmark_profiling.py [single|multi]
+    python benchmark_profiling.py [single|multi] [--executor BACKEND]
     
     single  - Uses benchmark_single.fasta (1 sequence, quick test)
     multi   - Uses benchmark_10seq.fasta (10 sequences, multithread test)
     
-    Default: multi
+    --executor  auto, process, thread, serial, or 'compare' to time
+                serial, thread and process back to back
+    
+    Default: multi, auto
 """
 
 import time
@@ -22,12 +25,19 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__f
 import RNAfold_to_RNArtist_engine as engine
 
 
-def run_benchmark(mode="multi"):
+COMPARE_BACKENDS = ["serial", "thread", "process"]
+
+
+def run_benchmark(mode="multi", executor="auto"):
     """
     Run benchmark on RNA sequences.
     
     Args:
         mode: 'single' for 1 sequence, 'multi' for 10 sequences
+        executor: Executor backend, or 'compare' to run all of COMPARE_BACKENDS
+    
+    Returns:
+        Total execution time in seconds (dict per backend for 'compare'), or None on error.
     """
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -65,8 +75,29 @@ def run_benchmark(mode="multi"):
     output_dir = os.path.join(script_dir, "..", "bench_outputs")
     os.makedirs(output_dir, exist_ok=True)
 
+    if executor == "compare":
+        timings = {}
+        for backend in COMPARE_BACKENDS:
+            timings[backend] = time_engine_run(input_file, output_dir, records, backend)
+        print("=" * 60)
+        print(f"{'Executor':<12}{'Total (s)':>12}{'Per seq (s)':>14}{'Speedup':>10}")
+        baseline = timings.get("serial")
+        for backend, t_total in timings.items():
+            if t_total is None:
+                print(f"{backend:<12}{'failed':>12}")
+                continue
+            speedup = f"{baseline / t_total:.2f}x" if baseline else "-"
+            print(f"{backend:<12}{t_total:>12.3f}{t_total / len(records):>14.3f}{speedup:>10}")
+        print("=" * 60)
+        return timings
+
+    return time_engine_run(input_file, output_dir, records, executor)
+
+
+def time_engine_run(input_file, output_dir, records, executor):
+    """Time one run_engine_programmatic call with the given executor backend."""
     print("-" * 60)
-    print("Testing Parallel Performance (run_engine_programmatic)...")
+    print(f"Testing Parallel Performance (run_engine_programmatic, executor: {executor})...")
     print("-" * 60)
 
     t_start = time.time()
@@ -75,7 +106,8 @@ def run_benchmark(mode="multi"):
     success = engine.run_engine_programmatic(
         input_path=input_file, 
         profile_path=None,
-        output_dir=output_dir
+        output_dir=output_dir,
+        executor=executor
     )
     
     t_total = time.time() - t_start
@@ -91,6 +123,7 @@ def run_benchmark(mode="multi"):
     else:
         print("✗ Engine reported failure.")
     print("-" * 60)
+    return t_total if success else None
 
 
 if __name__ == "__main__":
@@ -107,6 +140,7 @@ Examples:
     python benchmark_profiling.py single   # Quick test with 1 sequence
     python benchmark_profiling.py multi    # Full test with 10 sequences
     python benchmark_profiling.py          # Default: multi
+    python benchmark_profiling.py multi --executor compare   # serial vs thread vs process
         """
     )
     parser.add_argument(
@@ -117,5 +151,12 @@ Examples:
         help="Benchmark mode: 'single' (1 seq) or 'multi' (10 seqs)"
     )
     
+    parser.add_argument(
+        "--executor",
+        choices=list(engine.EXECUTOR_BACKENDS) + ["compare"],
+        default="auto",
+        help="Executor backend, or 'compare' to benchmark serial, thread and process"
+    )
+    
     args = parser.parse_args()
-    run_benchmark(args.mode)
+    run_benchmark(args.mode, args.executor)
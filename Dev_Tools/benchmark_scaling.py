@@ -0,0 +1,159 @@
+"""
+End-to-End Scaling Benchmark
+----------------------------
+Runs the full engine (run_engine_programmatic) over a matrix of
+sequence lengths x worker counts x enabled stages on deterministic synthetic
+sequences, and reports wall time, throughput and per-stage totals for each
+cell. Renders use the stand-in renderer (fake_rnartist.py) by default, so the
+matrix runs on any machine without Java; pass --renderer java for real
+RNArtistCore renders.
+
+Stage sets:
+    fold      fold + text outputs only
+    colorbar  fold + per-base table + colorbar images
+    full      everything, including the (stand-in) render
+
+Usage:
+    python benchmark_scaling.py [--lengths 200 1000 ...] [--workers 1 2 4 ...]
+                                [--stages fold colorbar full] [--sequences N]
+                                [--trials N] [--executor BACKEND]
+                                [--renderer fake|java] [--latency S]
+                                [--out PREFIX]
+
+    Writes PREFIX.csv and PREFIX.json (default: scaling_results).
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import bench_common
+from bench_common import engine
+
+
+STAGE_SETS = {
+    'fold': {'colorbar': False, 'render': False},
+    'colorbar': {'colorbar': True, 'render': False},
+    'full': {'colorbar': True, 'render': True},
+}
+
+FAKE_RENDERER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_rnartist.py")
+
+
+def build_profile(workers, stages, executor, renderer, latency):
+    profile = {
+        'pipeline': dict(STAGE_SETS[stages]),
+        'performance': {'max_workers': workers, 'executor': executor, 'incremental': False},
+    }
+    if renderer == 'fake':
+        profile['rnartist'] = {'command': [sys.executable, FAKE_RENDERER, "--latency", str(latency)]}
+    return profile
+
+
+def run_cell(length, workers, stages, n_sequences, executor, renderer, latency, work_dir):
+    """One engine run for a matrix cell. Returns the wall time and performance.json contents."""
+    cell_dir = tempfile.mkdtemp(prefix=f"cell_{length}_{workers}_{stages}_", dir=work_dir)
+    fasta = bench_common.write_fasta(
+        os.path.join(cell_dir, "input.fasta"),
+        [(f"syn_{length}_{n}", bench_common.synthetic_sequence(length, seed=n)) for n in range(n_sequences)])
+    profile_path = os.path.join(cell_dir, "profile.json")
+    with open(profile_path, 'w') as f:
+        json.dump(build_profile(workers, stages, executor, renderer, latency), f)
+
+    t_start = time.perf_counter()
+    ok = engine.run_engine_programmatic(fasta, profile_path, output_dir=os.path.join(cell_dir, "out"),
+                                        callback=lambda msg: None)
+    wall_time = time.perf_counter() - t_start
+    reports = glob.glob(os.path.join(cell_dir, "out", "**", "performance.json"), recursive=True)
+    perf = {}
+    if ok and reports:
+        with open(reports[0], 'r') as f:
+            perf = json.load(f)
+    shutil.rmtree(cell_dir, ignore_errors=True)
+    return (wall_time if ok else None), perf
+
+
+def run_matrix(lengths, workers_list, stage_sets, n_sequences=8, trials=1, executor="auto",
+               renderer="fake", latency=0.5):
+    """Run every (length, workers, stages) cell `trials` times. Returns result rows."""
+    work_dir = tempfile.mkdtemp(prefix="rnafold_scaling_")
+    rows = []
+    try:
+        for length in lengths:
+            for stages in stage_sets:
+                for workers in workers_list:
+                    times = []
+                    perf = {}
+                    for _ in range(trials):
+                        wall_time, perf = run_cell(length, workers, stages, n_sequences, executor, renderer, latency, work_dir)
+                        if wall_time is not None:
+                            times.append(wall_time)
+                    if not times:
+                        print(f"{length:>8}{workers:>9}  {stages:<10}{'failed':>10}")
+                        continue
+                    row = {'length': length, 'workers': workers, 'stages': stages, 'sequences': n_sequences}
+                    row.update(bench_common.summarize_samples(times))
+                    row['seq_per_s'] = n_sequences / row['median']
+                    row['nt_per_s'] = n_sequences * length / row['median']
+                    for stage, stats in (perf.get('stages') or {}).items():
+                        row[f"stage_{stage}_total"] = stats['total']
+                    rows.append(row)
+                    print(f"{length:>8}{workers:>9}  {stages:<10}{row['median']:>10.3f}{row['iqr']:>9.3f}"
+                          f"{row['seq_per_s']:>10.2f}{row['nt_per_s']:>12.0f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return rows
+
+
+def write_results(rows, prefix, meta):
+    """Write rows to PREFIX.csv and PREFIX.json."""
+    columns = []
+    for row in rows:
+        columns.extend(k for k in row if k not in columns and k != 'samples')
+    with open(prefix + ".csv", 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(prefix + ".json", 'w') as f:
+        json.dump(dict(meta, results=rows), f, indent=2)
+    print(f"Results written to {prefix}.csv and {prefix}.json")
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="End-to-end scaling matrix for the engine")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[100, 300, 600], help="Sequence lengths in nt")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGE_SETS), default=list(STAGE_SETS), help="Stage sets")
+    parser.add_argument("--sequences", type=int, default=8, help="Sequences per run")
+    parser.add_argument("--trials", type=int, default=1, help="Runs per cell (median and IQR reported)")
+    parser.add_argument("--executor", choices=engine.EXECUTOR_BACKENDS, default="auto", help="Executor backend")
+    parser.add_argument("--renderer", choices=["fake", "java"], default="fake", help="Stand-in renderer or real RNArtistCore")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stand-in render latency in seconds")
+    parser.add_argument("--out", type=str, default="scaling_results", help="Output prefix for .csv/.json")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"{'Length':>8}{'Workers':>9}  {'Stages':<10}{'Median s':>10}{'IQR s':>9}{'Seq/s':>10}{'nt/s':>12}")
+    print("-" * 70)
+    rows = run_matrix(args.lengths, args.workers, args.stages, args.sequences, args.trials,
+                      args.executor, args.renderer, args.latency)
+    print("=" * 70)
+    write_results(rows, args.out, {
+        'benchmark': 'scaling',
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {'lengths': args.lengths, 'workers': args.workers, 'stages': args.stages,
+                     'sequences': args.sequences, 'trials': args.trials, 'executor': args.executor,
+                     'renderer': args.renderer, 'latency': args.latency},
+    })
@@ -0,0 +1,70 @@
+"""
+Stand-in RNArtistCore Renderer
+------------------------------
+Mimics an RNArtistCore render for benchmarks on machines without Java: reads
+the .kts script, waits a configurable latency (the JVM startup + layout time)
+and writes placeholder SVG/PNG files named like RNArtistCore's outputs.
+
+Use it through the engine's rnartist.command setting, e.g. in a profile:
+    {"rnartist": {"command": ["python", "Dev_Tools/fake_rnartist.py", "--latency", "0.5"]}}
+
+Usage:
+    python fake_rnartist.py [--latency S] [--jitter S] [--memory MB] [--exit-code N] SCRIPT.kts
+"""
+
+import argparse
+import base64
+import os
+import random
+import re
+import sys
+import time
+
+# 1x1 transparent PNG
+PLACEHOLDER_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==")
+
+
+def render(script_path, latency=0.5, jitter=0.0, memory_mb=0):
+    with open(script_path, 'r') as f:
+        kts = f.read()
+    vienna = re.search(r'file = "([^"]*)"', kts)
+    name = "structure"
+    seq_len = 0
+    if vienna and os.path.exists(vienna.group(1)):
+        with open(vienna.group(1), 'r') as vf:
+            lines = [l.strip() for l in vf if l.strip()]
+        if lines and lines[0].startswith('>'):
+            name = lines[0][1:].split()[0]
+        seq_len = len(lines[-1]) if lines else 0
+
+    # Hold some memory like the JVM heap would, so RSS telemetry has something to see
+    ballast = bytearray(memory_mb * 1024 * 1024) if memory_mb > 0 else None
+    # Jitter is seeded by the script, so the same input always takes the same time
+    delay = latency + random.Random(kts).uniform(0, jitter) if jitter > 0 else latency
+    time.sleep(max(delay, 0.0))
+
+    for fmt in ('svg', 'png'):
+        match = re.search(fmt + r' \{\s*path = "([^"]*)"', kts)
+        if not match:
+            continue
+        out_path = os.path.join(match.group(1), f"{name}.{fmt}")
+        if fmt == 'svg':
+            with open(out_path, 'w') as f:
+                f.write(f'<svg xmlns="http://www.w3.org/2000/svg"><!-- stand-in render, {seq_len} nt --></svg>\n')
+        else:
+            with open(out_path, 'wb') as f:
+                f.write(PLACEHOLDER_PNG)
+    del ballast
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in RNArtistCore renderer for benchmarks")
+    parser.add_argument("script", help="RNArtistCore .kts script")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per render (default: 0.5)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra 0..S seconds, deterministic per script")
+    parser.add_argument("--memory", type=int, default=0, help="MB to allocate while 'rendering'")
+    parser.add_argument("--exit-code", type=int, default=0, help="Exit code to return (simulate failures)")
+    args = parser.parse_args()
+    render(args.script, args.latency, args.jitter, args.memory)
+    sys.exit(args.exit_code)
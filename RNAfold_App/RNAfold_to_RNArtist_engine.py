@@ -7,13 +7,30 @@ import matplotlib
 matplotlib.use('Agg') # Force non-interactive backend to avoid GUI/SVG dependency issues
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
+from matplotlib.figure import Figure
 import yaml
 import glob
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 import concurrent.futures
 import shutil
 import json
+import signal
+import threading
 import argparse
+import hashlib
+import re
+import tempfile
+import time
+import contextlib
+import cProfile
+import pstats
+import io
+import tracemalloc
+import shlex
+import gzip
+import heapq
+import functools
+import itertools
 
 import traceback
 
@@ -298,18 +315,20 @@ def configure_model_details(profile):
     if 'circ' in folding_params: md.circ = int(folding_params['circ'])
     if 'max_bp_span' in folding_params: md.max_bp_span = int(folding_params['max_bp_span'])
     
+    # Stats-only: the partition function runs without the pair probability matrix
+    # (ensemble diversity needs it, so it is kept when diversity is requested)
+    algorithms = profile.get('algorithms', {})
+    if algorithms.get('stats_only') and not algorithms.get('diversity', False):
+        md.compute_bpp = 0
+    
     return md
 
-def fold_sequence(seq, profile={}):
-    """
-    Fold sequence using RNAlib with profile-based configuration.
-    """
-    # Create model details object from profile
-    md = configure_model_details(profile)
-    
-    # helper to apply global params safely
-    folding_params = profile.get('folding_params', {})
-    
+# Energy parameter loading is process-global in RNAlib. The thread backend
+# serializes it together with fold compound creation (which copies the params).
+_PARAMS_LOCK = threading.Lock()
+
+def load_energy_parameters(folding_params):
+    """Load the profile's energy parameter set and salt correction (global state)."""
     # Apply Parameter Set (Global State in process)
     param_set = folding_params.get('param_set', 'turner2004')
     if param_set == 'dna_matthews2004':
@@ -330,9 +349,31 @@ def fold_sequence(seq, profile={}):
         # Try global loader
         if hasattr(RNA, 'params_load_salt'):
            RNA.params_load_salt(salt_conc)
+
+def create_fold_compound(seq, profile={}, md=None):
+    """Create a fold compound with the profile's model details and energy parameters."""
+    if md is None:
+        md = configure_model_details(profile)
+    with _PARAMS_LOCK:
+        load_energy_parameters(profile.get('folding_params', {}))
+        return RNA.fold_compound(seq, md)
+
+def fold_sequence(seq, profile={}, timer=None, bpp_cutoff=0.0):
+    """
+    Fold sequence using RNAlib with profile-based configuration.
+    If a StageTimer is given, MFE, partition function and plist are timed.
+    Pairs with probability below bpp_cutoff are left out of the plist.
+    Job profiles carrying an 'alignment' are folded by fold_alignment().
+    """
+    alignment = profile.get('alignment')
+    if alignment:
+        return fold_alignment(alignment['sequences'], profile, timer, bpp_cutoff)
+
+    # Create model details object from profile
+    md = configure_model_details(profile)
     
     # Create fold compound with model details
-    fc = RNA.fold_compound(seq, md)
+    fc = create_fold_compound(seq, profile, md)
     
 
     # Apply Constraints
@@ -353,23 +394,24 @@ def fold_sequence(seq, profile={}):
             else:
                 print(f"Warning: Constraint string length ({len(constraint_string)}) does not match sequence length ({len(seq)}). Ignoring.")
 
-    # 2. SHAPE Reactivity (Placeholder)
-    shape_cfg = profile.get('shape_reactivity', {})
-    if shape_cfg.get('file'):
-        print("Info: SHAPE data loading requested but requires specific API verification. Skipping for this version.")
+    # 2. SHAPE Reactivity (soft constraints)
+    apply_shape_constraints(fc, len(seq), profile)
 
     # Compute MFE and Structure
-    structure, mfe = fc.mfe()
+    with timed_stage(timer, 'fold_mfe'):
+        structure, mfe = fc.mfe()
     
     # Compute Partition Function
     algorithms = profile.get('algorithms', {})
+    stats_only = algorithms.get('stats_only', False)
     ensemble_energy = 0.0
     frequency = 0.0
     diversity = 0.0
     
-    if algorithms.get('partition_function', True):
+    if algorithms.get('partition_function', True) or stats_only:
         # fc.pf() returns (structure, energy) or [structure, energy]
-        pf_result = fc.pf()
+        with timed_stage(timer, 'fold_pf'):
+            pf_result = fc.pf()
         if isinstance(pf_result, (list, tuple)) and len(pf_result) >= 2:
             ensemble_energy = pf_result[1]
         elif isinstance(pf_result, float):
@@ -378,8 +420,12 @@ def fold_sequence(seq, profile={}):
              print(f"Warning: Unexpected return from fc.pf(): {pf_result}")
              ensemble_energy = 0.0
         
-        # Get base pair probabilities
-        plist = fc.plist_from_probs(0.0)
+        # Get base pair probabilities (not needed for stats only)
+        if stats_only:
+            plist = []
+        else:
+            with timed_stage(timer, 'fold_plist'):
+                plist = fc.plist_from_probs(bpp_cutoff)
         
         # Calculate Frequency of MFE structure in ensemble
         # Frequency = exp((E_ensemble - E_mfe) / RT)
@@ -391,7 +437,10 @@ def fold_sequence(seq, profile={}):
             
         # Ensemble Diversity
         # fc.mean_bp_distance() calculates the mean base pair distance in the thermodynamic ensemble
-        diversity = fc.mean_bp_distance()
+        if stats_only and not algorithms.get('diversity', False):
+            diversity = None  # Needs the pair probabilities that were skipped
+        else:
+            diversity = fc.mean_bp_distance()
     else:
         plist = []
     
@@ -509,11 +558,14 @@ def save_probability_results(seq, pi_values, colors, out_dir, colormap_name=SELE
             f.write(f"{i+1}\t{base}\t{pi:.6f}\t{rgb}\n")
     
     # Adjust figure size for vertical orientation
+    # Figure objects instead of pyplot: pyplot's global state is not thread-safe
     if cb_orientation == 'vertical':
-        fig, ax = plt.subplots(figsize=(cb_height, cb_width))  # Swap width/height for vertical
+        fig = Figure(figsize=(cb_height, cb_width))  # Swap width/height for vertical
+        ax = fig.add_subplot()
         fig.subplots_adjust(right=0.8)  # Adjust for vertical color bar
     else:
-        fig, ax = plt.subplots(figsize=(cb_width, cb_height))
+        fig = Figure(figsize=(cb_width, cb_height))
+        ax = fig.add_subplot()
     fig.subplots_adjust(bottom=0.5)
     
     # Validate colormap for color bar generation
@@ -530,8 +582,8 @@ def save_probability_results(seq, pi_values, colors, out_dir, colormap_name=SELE
         print(f"Error: Failed to load colormap '{colormap_name}' for color bar. Using 'viridis' instead.")
         cmap = plt.get_cmap('viridis')
     norm = mcolors.Normalize(vmin=0, vmax=1)
-    sm = plt.cm.ScalarMappable(norm=norm, cmap=cmap)
-    cb1 = plt.colorbar(sm, cax=ax, orientation=cb_orientation)
+    sm = matplotlib.cm.ScalarMappable(norm=norm, cmap=cmap)
+    cb1 = fig.colorbar(sm, cax=ax, orientation=cb_orientation)
     cb1.set_label(f'Base-Pairing Probability (Pi) - Colormap: {colormap_name}', fontsize=font_size)
     cb1.set_ticks([0, 0.25, 0.5, 0.75, 1.0])
     cb1.set_ticklabels(['0.0', '0.25', '0.5', '0.75', '1.0'])
@@ -565,11 +617,9 @@ def save_probability_results(seq, pi_values, colors, out_dir, colormap_name=SELE
             if settings['dpi'] is not None:
                 save_args['dpi'] = settings['dpi']
             
-            plt.savefig(**save_args)
+            fig.savefig(**save_args)
         else:
             print(f"Warning: Unsupported color bar format '{cb_format}'. Skipping.")
-    
-    plt.close()
 
 def create_vienna_file(seq, structure, output_dir, filename, sequence_name):
     vienna_path = os.path.join(output_dir, filename)
@@ -768,70 +818,1077 @@ def create_rnartist_script(vienna_file, basepair_probs_file, output_dir, seq, pl
         f.write(script_content)
     return script_path
 
-def run_rnartist_visualization(script_path, jar_path):
+# =============================================================================
+# SHAPE SOFT CONSTRAINTS (shape_reactivity)
+# =============================================================================
+# Reactivity files hold 'position [nucleotide] reactivity' per line (RNAfold
+# --shape format). They are parsed in one NumPy call and the per-method vectors
+# are cached per (file, modification stamp, length, method, parameters), so
+# batch runs over many sequences or conditions parse and convert each file once
+# per worker.
+SHAPE_METHODS = ('deigan', 'zarringhalam', 'washietl')
+DEFAULT_SHAPE_SETTINGS = {
+    'method': 'Deigan',    # Deigan, Zarringhalam or Washietl
+    'slope': 1.8,          # Deigan m (kcal/mol)
+    'intercept': -0.6,     # Deigan b (kcal/mol)
+    'beta': 0.89,          # Zarringhalam scaling factor
+    'conversion': 'O',     # Zarringhalam reactivity -> probability conversion (as RNAfold --shapeConversion)
+    'default_value': 0.5,  # Zarringhalam unpaired probability where data is missing
+}
+SHAPE_CACHE_SIZE = 256
+
+def read_shape_reactivities(path):
+    """Parse a reactivity file into (positions, values) arrays. Unparsable values (e.g. NA) become NaN."""
+    data = np.genfromtxt(path, usecols=(0, -1), comments='#', dtype=float, invalid_raise=False, ndmin=2)
+    data = data[np.isfinite(data[:, 0])]
+    return data[:, 0].astype(np.int64), data[:, 1]
+
+def shape_file_stamp(path):
+    """(mtime_ns, size) of a reactivity file: part of the cache key and the fold fingerprint."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+@functools.lru_cache(maxsize=SHAPE_CACHE_SIZE)
+def shape_vector(path, stamp, length, method, params=()):
+    """
+    1-based vector (index 0 unused) for one method, as a tuple:
+    deigan: stacking pseudo-energies m * ln(r + 1) + b (0 where data is missing),
+    washietl: the file values as unpaired perturbation energies (0 where missing),
+    zarringhalam: the reactivities, -1 where missing (converted by RNAlib).
+    """
+    positions, values = read_shape_reactivities(path)
+    keep = (positions >= 1) & (positions <= length) & np.isfinite(values)
+    observed = np.full(length + 1, np.nan)
+    observed[positions[keep]] = values[keep]
+    observed[0] = np.nan
+    if method == 'deigan':
+        m, b = params
+        # Negative reactivities count as missing, as in RNAfold
+        vector = np.where(observed >= 0, m * np.log1p(np.where(observed >= 0, observed, 0.0)) + b, 0.0)
+    elif method == 'washietl':
+        vector = np.nan_to_num(observed, nan=0.0)
+    else:
+        vector = np.where(observed >= 0, observed, -1.0)
+    return tuple(vector.tolist())
+
+def get_shape_settings(profile={}):
+    """Merge SHAPE settings: defaults < profile['shape_reactivity']."""
+    settings = dict(DEFAULT_SHAPE_SETTINGS)
+    settings.update({k: v for k, v in (profile.get('shape_reactivity') or {}).items() if v is not None})
+    return settings
+
+def apply_shape_constraints(fc, length, profile):
+    """Add the profile's SHAPE reactivity file to fc as soft constraints. Returns False if none is set."""
+    settings = get_shape_settings(profile)
+    path = settings.get('file')
+    if not path:
+        return False
+    method = str(settings['method']).lower()
+    if method not in SHAPE_METHODS:
+        raise ValueError(f"Unknown SHAPE method '{settings['method']}' (choose from Deigan, Zarringhalam, Washietl)")
+    stamp = shape_file_stamp(path)
+    if method == 'deigan':
+        params = (float(settings['slope']), float(settings['intercept']))
+        fc.sc_set_stack(list(shape_vector(path, stamp, length, method, params)))
+    elif method == 'washietl':
+        fc.sc_set_up(list(shape_vector(path, stamp, length, method)))
+    else:
+        fc.sc_add_SHAPE_zarringhalam(list(shape_vector(path, stamp, length, method)), float(settings['beta']),
+                                     float(settings['default_value']), str(settings['conversion']))
+    return True
+
+# =============================================================================
+# RNARTIST JVM SETTINGS (Resource Governor)
+# =============================================================================
+# Every render launches its own JVM. Without limits each one sizes its heap and
+# GC threads from the whole host, so N workers x N JVMs oversubscribe the CPU.
+DEFAULT_RNARTIST_SETTINGS = {
+    'max_heap': None,               # -Xmx (e.g. "512m")
+    'initial_heap': None,           # -Xms
+    'active_processor_count': None, # -XX:ActiveProcessorCount
+    'gc': None,                     # serial, parallel, g1, z
+    'max_concurrent': 0,            # Max JVMs alive at once across workers (0 = no cap: one per worker)
+    'extra_args': [],
+    'cds': False,                   # Use an AppCDS archive to speed up JVM startup
+    'cds_archive': None,            # Archive path (default: next to the JAR)
+    'cache': False,                 # Reuse renders of identical structure + colors
+    'cache_dir': None,              # Render cache location (default: <output_dir>/.render_cache)
+    'command': None,                # Stand-in renderer (str or list); the KTS path is appended. Replaces java -jar
+}
+
+JVM_GC_FLAGS = {
+    'serial': '-XX:+UseSerialGC',
+    'parallel': '-XX:+UseParallelGC',
+    'g1': '-XX:+UseG1GC',
+    'z': '-XX:+UseZGC',
+}
+
+# Shared slot counter limiting concurrent JVMs and the run's cancellation flag.
+# Installed in each worker by init_worker(); None means no cap / not cancellable.
+_JVM_SLOTS = None
+_CANCEL_EVENT = None
+
+def init_worker(jvm_slots=None, cancel_event=None):
+    """Executor initializer: install shared primitives in the worker."""
+    global _JVM_SLOTS, _CANCEL_EVENT
+    _JVM_SLOTS = jvm_slots
+    _CANCEL_EVENT = cancel_event
+
+def get_rnartist_settings(profile={}):
+    """Merge RNArtistCore JVM settings: defaults < config.yaml < profile."""
+    settings = dict(DEFAULT_RNARTIST_SETTINGS)
+    for source in (CONFIG.get('rnartist') or {}, profile.get('rnartist') or {}):
+        if isinstance(source, dict):
+            settings.update({k: v for k, v in source.items() if v is not None})
+    return settings
+
+def build_java_command(jar_path, script_path, settings=None):
+    """Build the argv list for one RNArtistCore render."""
+    settings = settings or DEFAULT_RNARTIST_SETTINGS
+    if settings.get('command'):
+        command = settings['command']
+        cmd = shlex.split(command) if isinstance(command, str) else [str(a) for a in command]
+        return cmd + [script_path]
+    cmd = ['java']
+    if settings.get('initial_heap'):
+        cmd.append(f"-Xms{settings['initial_heap']}")
+    if settings.get('max_heap'):
+        cmd.append(f"-Xmx{settings['max_heap']}")
+    cpus = settings.get('active_processor_count')
+    if cpus and int(cpus) > 0:
+        cmd.append(f"-XX:ActiveProcessorCount={int(cpus)}")
+    gc = settings.get('gc')
+    if gc:
+        if gc in JVM_GC_FLAGS:
+            cmd.append(JVM_GC_FLAGS[gc])
+        else:
+            print(f"Warning: Unknown JVM garbage collector '{gc}'. Using JVM default.")
+    cmd.extend(str(a) for a in (settings.get('extra_args') or []))
+    if settings.get('shared_archive'):
+        # -Xshare:auto (JVM default) silently falls back if the archive is unusable
+        cmd.append(f"-XX:SharedArchiveFile={settings['shared_archive']}")
+    cmd.extend(['-jar', jar_path, script_path])
+    return cmd
+
+# =============================================================================
+# APPCDS ARCHIVE (Faster JVM Startup)
+# =============================================================================
+# A dynamic AppCDS archive stores the parsed classes of the fat JAR, so later
+# JVMs map them instead of loading them again. Requires Java 13+.
+CDS_MIN_JAVA_VERSION = 13
+
+# Tiny hairpin used for the archive training render
+CDS_TRAINING_SEQUENCE = "GGGGAAACCCCAUAUGGGGAAACCCCA"
+
+def get_java_major_version():
+    """Return the major version of the 'java' on PATH (8 for 1.8), or None."""
     try:
-        cmd = f'java -jar "{jar_path}" "{script_path}"'
-        print(f"Running RNArtistCore command: {cmd}")
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        
+        result = subprocess.run(['java', '-version'], capture_output=True, text=True, timeout=30)
+    except Exception:
+        return None
+    match = re.search(r'version "(\d+)(?:\.(\d+))?', result.stderr + result.stdout)
+    if not match:
+        return None
+    major = int(match.group(1))
+    if major == 1 and match.group(2):
+        major = int(match.group(2))
+    return major
+
+def get_cds_archive_path(jar_path, settings):
+    """Archive location: configured path, else next to the JAR, else the temp dir."""
+    if settings.get('cds_archive'):
+        return settings['cds_archive']
+    archive_name = os.path.splitext(os.path.basename(jar_path))[0] + ".jsa"
+    jar_dir = os.path.dirname(os.path.abspath(jar_path))
+    if os.access(jar_dir, os.W_OK):
+        return os.path.join(jar_dir, archive_name)
+    # e.g. installed under Program Files
+    return os.path.join(tempfile.gettempdir(), "rnartist_cds", archive_name)
+
+def create_cds_archive(jar_path, archive_path, settings, log=print):
+    """Render a small training script with -XX:ArchiveClassesAtExit. Returns True on success."""
+    os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+    tmp_archive = f"{archive_path}.{os.getpid()}.tmp"
+    with tempfile.TemporaryDirectory() as work_dir:
+        seq = CDS_TRAINING_SEQUENCE
+        structure = RNA.fold(seq)[0]
+        vienna_file = create_vienna_file(seq, structure, work_dir, "cds_training.vienna", "cds_training")
+        script_path = create_rnartist_script(vienna_file, None, work_dir, seq, [], sequence_name="cds_training")
+        train_settings = dict(settings, shared_archive=None)
+        train_settings['extra_args'] = list(settings.get('extra_args') or []) + [f"-XX:ArchiveClassesAtExit={tmp_archive}"]
+        cmd = build_java_command(jar_path, script_path, train_settings)
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        except Exception as e:
+            log(f"Warning: AppCDS training run failed: {e}")
+            return False
+    if result.returncode != 0 or not os.path.exists(tmp_archive):
+        log(f"Warning: AppCDS archive was not created (exit {result.returncode}).")
+        if os.path.exists(tmp_archive):
+            os.remove(tmp_archive)
+        return False
+    # Atomic publish so concurrent runs never see a half-written archive
+    os.replace(tmp_archive, archive_path)
+    return True
+
+def ensure_cds_archive(jar_path, settings, log=print):
+    """
+    Return a usable AppCDS archive for jar_path, creating it on first use.
+    Returns None when CDS is disabled or unsupported (renders then run without it).
+    """
+    if not settings.get('cds') or settings.get('command'):
+        return None
+    archive_path = get_cds_archive_path(jar_path, settings)
+    if os.path.exists(archive_path) and os.path.getmtime(archive_path) >= os.path.getmtime(jar_path):
+        return archive_path
+    java_version = get_java_major_version()
+    if java_version is None or java_version < CDS_MIN_JAVA_VERSION:
+        log(f"Info: AppCDS needs Java {CDS_MIN_JAVA_VERSION}+ (found: {java_version or 'unknown'}). Running without archive.")
+        return None
+    log(f"Creating AppCDS archive (first run): {archive_path}")
+    if create_cds_archive(jar_path, archive_path, settings, log):
+        return archive_path
+    log("Running without AppCDS archive.")
+    return None
+
+# =============================================================================
+# TIMEOUTS & CANCELLATION
+# =============================================================================
+DEFAULT_PERFORMANCE_SETTINGS = {
+    'max_workers': 10,
+    'executor': 'auto',      # auto, process, thread, serial
+    'fold_timeout': 0,       # Seconds per fold (0 = no limit)
+    'render_timeout': 0,     # Seconds per RNArtistCore render (0 = no limit)
+    'cancel_mode': 'abort',  # abort: stop running sequences, drain: let them finish
+    'incremental': True,     # Skip stages whose inputs are unchanged in an existing output folder
+    'trace': False,          # Write trace.json (Chrome trace-event timeline of all workers)
+    'profile_cpu': False,    # cProfile every worker task; write cpu_profile.pstats + cpu_profile.txt
+    'profile_top': 40,       # Functions listed in cpu_profile.txt
+    'tracemalloc': False,    # Record Python allocation peak + top allocation sites per sequence
+}
+
+# How often blocked waits check for timeouts / cancellation (seconds)
+PROCESS_POLL_INTERVAL = 0.01
+CANCEL_POLL_INTERVAL = 0.2
+JOBS_IN_FLIGHT_PER_WORKER = 2  # Submitted-but-unfinished jobs per worker in the main pipeline
+
+class StageInterrupted(Exception):
+    """A pipeline stage was stopped before it finished."""
+    status = 'interrupted'
+
+    def __init__(self, stage, message):
+        super().__init__(message)
+        self.stage = stage
+
+class StageTimeoutError(StageInterrupted):
+    status = 'timeout'
+
+class RunCancelledError(StageInterrupted):
+    status = 'cancelled'
+
+# Optional pipeline stages (fold and text outputs always run)
+DEFAULT_PIPELINE_SETTINGS = {
+    'colorbar': True,   # Per-base probability table + colorbar images
+    'render': True,     # RNArtistCore render (the KTS script is still written)
+}
+
+def get_pipeline_settings(profile={}):
+    """Merge pipeline stage toggles: defaults < config.yaml < profile."""
+    settings = dict(DEFAULT_PIPELINE_SETTINGS)
+    for source in (CONFIG.get('pipeline') or {}, profile.get('pipeline') or {}):
+        if isinstance(source, dict):
+            settings.update({k: bool(v) for k, v in source.items() if v is not None})
+    return settings
+
+def get_performance_settings(profile={}):
+    """Merge performance settings: defaults < config.yaml < profile."""
+    settings = dict(DEFAULT_PERFORMANCE_SETTINGS)
+    for source in (CONFIG.get('performance') or {}, profile.get('performance') or {}):
+        if isinstance(source, dict):
+            settings.update({k: v for k, v in source.items() if v is not None})
+    return settings
+
+def is_cancelled():
+    return _CANCEL_EVENT is not None and _CANCEL_EVENT.is_set()
+
+def check_cancelled(stage):
+    """Raise RunCancelledError if the run was cancelled before `stage`."""
+    if is_cancelled():
+        raise RunCancelledError(stage, f"Run cancelled before {stage}")
+
+def kill_process_group(proc):
+    """Kill a child started in its own process group, including its descendants."""
+    try:
+        if os.name == 'posix':
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(proc.pid)], capture_output=True)
+    except OSError:
+        # Group not created yet (or already gone): kill the process itself
+        try:
+            proc.kill()
+        except OSError:
+            pass
+
+def _wait_for_process(proc, timeout=None):
+    """
+    Wait for a child process, killing its process group on timeout or cancellation.
+    Returns (returncode, peak_rss_kb or None, status) with status 'ok', 'timeout' or 'cancelled'.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    status = 'ok'
+    if hasattr(os, 'wait4'):
+        wait_flags = os.WNOHANG if (deadline or _CANCEL_EVENT is not None) else 0
+        while True:
+            pid, wait_status, rusage = os.wait4(proc.pid, wait_flags)
+            if pid:
+                break
+            if is_cancelled():
+                status = 'cancelled'
+            elif deadline and time.monotonic() > deadline:
+                status = 'timeout'
+            if status != 'ok':
+                kill_process_group(proc)
+                _, wait_status, rusage = os.wait4(proc.pid, 0)
+                break
+            time.sleep(PROCESS_POLL_INTERVAL)
+        proc.returncode = os.waitstatus_to_exitcode(wait_status)
+        peak_rss = rusage.ru_maxrss
+        if sys.platform == 'darwin':
+            peak_rss //= 1024  # macOS reports bytes, Linux reports KB
+        return proc.returncode, peak_rss, status
+    # Windows: no per-child rusage available
+    while True:
+        try:
+            return proc.wait(timeout=PROCESS_POLL_INTERVAL), None, status
+        except subprocess.TimeoutExpired:
+            if is_cancelled():
+                status = 'cancelled'
+            elif deadline and time.monotonic() > deadline:
+                status = 'timeout'
+            if status != 'ok':
+                kill_process_group(proc)
+
+def _acquire_jvm_slot():
+    """Block until a JVM slot is free. Returns False if the run was cancelled meanwhile."""
+    while not _JVM_SLOTS.acquire(timeout=CANCEL_POLL_INTERVAL):
+        if is_cancelled():
+            return False
+    return True
+
+# Picklable stand-in for ViennaRNA plist entries (same .i/.j/.p attributes)
+PlistEntry = namedtuple('PlistEntry', ['i', 'j', 'p'])
+
+def _fold_child(conn, seq, profile):
+    """Child process body for fold_sequence_isolated()."""
+    if hasattr(os, 'setsid'):
+        os.setsid()  # Own process group, so the parent can kill it as a unit
+    try:
+        timer = StageTimer()
+        structure, plist, stats = fold_sequence(seq, profile, timer)
+        entries = []
+        for entry in plist:
+            if entry.i == 0 and entry.j == 0:
+                break
+            entries.append(PlistEntry(entry.i, entry.j, entry.p))
+        conn.send(('ok', structure, entries, stats, timer.events))
+    except Exception as e:
+        conn.send(('error', str(e)))
+    finally:
+        conn.close()
+
+_FOLD_CONTEXT = None
+
+def _fold_process_context():
+    """
+    Start method for fold_sequence_isolated(): forkserver (spawn where it is
+    unavailable), never a plain fork. Under the thread backend the fold child
+    would otherwise be forked from a pool thread while another thread holds
+    _PARAMS_LOCK, a logging lock or RNAlib state, and deadlock until its timeout.
+    """
+    global _FOLD_CONTEXT
+    if _FOLD_CONTEXT is None:
+        import multiprocessing
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            _FOLD_CONTEXT = multiprocessing.get_context('forkserver')
+            if __name__ != '__main__':
+                _FOLD_CONTEXT.set_forkserver_preload([__name__])  # Children start with RNAlib loaded
+        else:
+            _FOLD_CONTEXT = multiprocessing.get_context('spawn')
+    return _FOLD_CONTEXT
+
+def fold_sequence_isolated(seq, profile, timeout, timer=None):
+    """
+    Run fold_sequence() in a child process so it can be stopped. ViennaRNA calls
+    cannot be interrupted in-process, so the child is killed after `timeout`
+    seconds or when the run is cancelled.
+    """
+    context = _fold_process_context()
+    recv_conn, send_conn = context.Pipe(duplex=False)
+    proc = context.Process(target=_fold_child, args=(send_conn, seq, profile), daemon=True)
+    proc.start()
+    send_conn.close()
+    deadline = time.monotonic() + timeout
+    try:
+        while not recv_conn.poll(PROCESS_POLL_INTERVAL):
+            if is_cancelled():
+                raise RunCancelledError('fold', "Run cancelled during fold")
+            if time.monotonic() > deadline:
+                raise StageTimeoutError('fold', f"Fold exceeded timeout of {timeout:g} s")
+            if not proc.is_alive() and not recv_conn.poll():
+                raise RuntimeError(f"Fold process exited unexpectedly (exit code {proc.exitcode})")
+        message = recv_conn.recv()
+    finally:
+        if proc.is_alive():
+            kill_process_group(proc)
+        proc.join()
+        recv_conn.close()
+    if message[0] == 'error':
+        raise RuntimeError(message[1])
+    _, structure, plist, stats, events = message
+    if timer is not None:
+        timer.events.extend(events)
+    return structure, plist, stats
+
+def run_rnartist_visualization(script_path, jar_path, settings=None, timeout=None):
+    """
+    Render a KTS script with RNArtistCore.
+    The JVM runs in its own process group, which is killed after `timeout`
+    seconds or when the run is cancelled.
+    Returns a dict with the command, status ('ok', 'failed', 'timeout',
+    'cancelled'), exit status, wall time, time spent waiting for a JVM slot
+    and the peak RSS of the JVM (KB, POSIX only).
+    """
+    render_info = {
+        'status': 'failed',
+        'returncode': None,
+        'wall_time': 0.0,
+        'queue_time': 0.0,
+        'peak_rss_kb': None,
+    }
+    try:
+        cmd = build_java_command(jar_path, script_path, settings)
+        render_info['command'] = cmd
+        print(f"Running RNArtistCore command: {subprocess.list2cmdline(cmd)}")
+
+        t_queue = time.perf_counter()
+        if _JVM_SLOTS is not None and not _acquire_jvm_slot():
+            render_info['status'] = 'cancelled'
+            return render_info
+        try:
+            t_start = time.perf_counter()
+            render_info['queue_time'] = t_start - t_queue
+            if os.name == 'posix':
+                group_args = {'start_new_session': True}
+            else:
+                group_args = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+            # Temp files instead of pipes: we wait on the pid directly to get its rusage
+            with tempfile.TemporaryFile() as out_f, tempfile.TemporaryFile() as err_f:
+                proc = subprocess.Popen(cmd, stdout=out_f, stderr=err_f, **group_args)
+                returncode, peak_rss, wait_status = _wait_for_process(proc, timeout)
+                render_info['wall_time'] = time.perf_counter() - t_start
+                out_f.seek(0)
+                err_f.seek(0)
+                stdout = out_f.read().decode(errors='replace')
+                stderr = err_f.read().decode(errors='replace')
+        finally:
+            if _JVM_SLOTS is not None:
+                _JVM_SLOTS.release()
+
+        render_info['returncode'] = returncode
+        render_info['peak_rss_kb'] = peak_rss
+        if wait_status != 'ok':
+            render_info['status'] = wait_status
+        elif returncode == 0:
+            render_info['status'] = 'ok'
+
         # Always print stdout/stderr for debugging
-        if result.stdout:
-            print(f"RNArtist Output:\n{result.stdout}")
-        if result.stderr:
-            print(f"RNArtist Errors/Warnings:\n{result.stderr}")
+        if stdout:
+            print(f"RNArtist Output:\n{stdout}")
+        if stderr:
+            print(f"RNArtist Errors/Warnings:\n{stderr}")
             
-        if result.returncode == 0:
+        if wait_status == 'timeout':
+            print(f"RNArtistCore killed after exceeding timeout of {timeout:g} s")
+        elif wait_status == 'cancelled':
+            print("RNArtistCore killed: run cancelled")
+        elif returncode == 0:
             print("RNArtistCore visualization completed successfully (process exited with 0).")
             print("Output files generated in the output directory.")
         else:
-            print(f"RNArtistCore failed with return code {result.returncode}")
+            print(f"RNArtistCore failed with return code {returncode}")
     except Exception as e:
         print(f"Error running RNArtistCore: {e}")
         import traceback
         traceback.print_exc()
+    return render_info
+
+# =============================================================================
+# RENDER CACHE
+# =============================================================================
+# Identical structures with identical colors (duplicate inputs, enforced
+# constraints) produce identical pictures. Renders are cached under a hash of
+# the KTS script with output paths removed, so a hit is a file copy, not a JVM.
+RENDER_OUTPUT_EXTENSIONS = ('.svg', '.png')
+
+def render_cache_key(script_path, jar_path):
+    """
+    Hash the KTS script minus everything run-specific: the svg/png output paths
+    are dropped and the Vienna file path is replaced by its sequence and structure
+    (without the header, so renamed duplicates still hit). The JAR's size and
+    mtime are included so a new RNArtistCore invalidates old entries.
+    """
+    with open(script_path, 'r') as f:
+        content = f.read()
+
+    def inline_vienna(match):
+        with open(match.group(1), 'r') as vf:
+            lines = [l.strip() for l in vf if l.strip() and not l.startswith('>')]
+        return 'file = "' + '\n'.join(lines) + '"'
+
+    content = re.sub(r'path = "[^"]*"', 'path = ""', content)
+    content = re.sub(r'file = "([^"]*)"', inline_vienna, content)
+    digest = hashlib.sha256(content.encode())
+    if jar_path:
+        jar_stat = os.stat(jar_path)
+        digest.update(f"{os.path.basename(jar_path)}:{jar_stat.st_size}:{int(jar_stat.st_mtime)}".encode())
+    return digest.hexdigest()
+
+def _snapshot_render_outputs(out_dir):
+    """{name: (mtime_ns, size)} of the RNArtistCore images in out_dir (colorbars excluded)."""
+    snapshot = {}
+    for entry in os.scandir(out_dir):
+        if entry.name.endswith(RENDER_OUTPUT_EXTENSIONS) and "_colorbar_" not in entry.name and entry.is_file():
+            stat = entry.stat()
+            snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def _list_render_outputs(out_dir, before):
+    """
+    Images created or rewritten since the `before` snapshot. Comparing listings
+    (not mtimes against a clock) works on coarse-mtime filesystems and ignores
+    stale files left by earlier runs.
+    """
+    return sorted(name for name, stamp in _snapshot_render_outputs(out_dir).items() if before.get(name) != stamp)
+
+def _cached_output_name(name, cached_sequence_name, sequence_name):
+    """Cached file name for this sequence: the cached name prefix replaced, the suffix kept."""
+    if name.startswith(cached_sequence_name):
+        return sequence_name + name[len(cached_sequence_name):]
+    return name
+
+def _store_render_cache_entry(entry_dir, out_dir, files, sequence_name):
+    """Copy fresh render outputs into the cache (atomic publish via rename)."""
+    parent = os.path.dirname(entry_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".tmp_")
+    try:
+        for name in files:
+            shutil.copy2(os.path.join(out_dir, name), os.path.join(tmp_dir, name))
+        with open(os.path.join(tmp_dir, "manifest.json"), 'w') as f:
+            json.dump({'sequence_name': sequence_name, 'files': files}, f)
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Another worker published the same key first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def render_with_cache(script_path, jar_path, out_dir, sequence_name, settings=None, timeout=None):
+    """
+    Render through the cache when rnartist.cache is enabled. A hit copies the
+    cached SVG/PNG into out_dir (file names adapted to this sequence) and skips
+    the JVM. Returns the same dict as run_rnartist_visualization() plus 'cache_hit'.
+    """
+    settings = settings or {}
+    cache_dir = settings.get('cache_dir') if settings.get('cache') else None
+
+    if cache_dir:
+        t_start = time.perf_counter()
+        key = render_cache_key(script_path, jar_path)
+        entry_dir = os.path.join(cache_dir, key[:2], key)
+        manifest_path = os.path.join(entry_dir, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            outputs = []
+            for name in manifest['files']:
+                target = _cached_output_name(name, manifest['sequence_name'], sequence_name)
+                shutil.copy2(os.path.join(entry_dir, name), os.path.join(out_dir, target))
+                outputs.append(target)
+            print(f"RNArtistCore render cache hit ({key[:12]}): copied {len(outputs)} file(s).")
+            return {
+                'status': 'ok',
+                'returncode': 0,
+                'wall_time': time.perf_counter() - t_start,
+                'queue_time': 0.0,
+                'peak_rss_kb': None,
+                'cache_hit': True,
+                'outputs': outputs,
+            }
+
+    before = _snapshot_render_outputs(out_dir)
+    render_info = run_rnartist_visualization(script_path, jar_path, settings, timeout)
+    render_info['cache_hit'] = False
+    if render_info['status'] == 'ok':
+        render_info['outputs'] = _list_render_outputs(out_dir, before)
+        if cache_dir and render_info['outputs']:
+            _store_render_cache_entry(entry_dir, out_dir, render_info['outputs'], sequence_name)
+    return render_info
+
+def format_render_info(render_info):
+    """One-line description of a render for the run log."""
+    if not render_info or render_info.get('returncode') is None:
+        return "render not run"
+    if render_info.get('cache_hit'):
+        return "render cached"
+    if render_info.get('reused'):
+        return "render up to date"
+    if render_info.get('status') in ('timeout', 'cancelled'):
+        return f"render {render_info['status']} after {render_info['wall_time']:.2f} s"
+    text = f"render {render_info['wall_time']:.2f} s, exit {render_info['returncode']}"
+    if render_info.get('peak_rss_kb'):
+        text += f", peak RSS {render_info['peak_rss_kb'] / 1024:.0f} MB"
+    return text
+
+# =============================================================================
+# STAGE TIMING & PERFORMANCE REPORT
+# =============================================================================
+# Stages in pipeline order; performance.json lists them in this order.
+TIMED_STAGES = ('fold_mfe', 'fold_pf', 'fold_plist', 'text_write', 'colorbar', 'kts', 'render')
+REPORT_PERCENTILES = (50, 90, 99)
+
+class StageTimer:
+    """Collects the wall time of each pipeline stage for one sequence."""
+    def __init__(self):
+        self.started_us = time.time_ns() // 1000
+        # (stage, start time in µs since epoch, duration in s, pid, thread id)
+        self.events = []
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start_us = time.time_ns() // 1000
+        t_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.events.append((name, start_us, time.perf_counter() - t_start, os.getpid(), threading.get_ident()))
+
+    def totals(self):
+        totals = {}
+        for name, _, duration, _, _ in self.events:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+    def trace_events(self, sequence_name, length):
+        """
+        Chrome trace 'complete' events: one per stage plus one spanning the whole
+        sequence task in this worker, tagged with the sequence name and length.
+        """
+        args = {'sequence': sequence_name, 'length': length}
+        end_us = time.time_ns() // 1000
+        events = [{
+            'name': sequence_name, 'cat': 'sequence', 'ph': 'X',
+            'ts': self.started_us, 'dur': end_us - self.started_us,
+            'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args,
+        }]
+        for name, start_us, duration, pid, tid in self.events:
+            events.append({
+                'name': name, 'cat': 'stage', 'ph': 'X',
+                'ts': start_us, 'dur': int(duration * 1e6),
+                'pid': pid, 'tid': tid, 'args': args,
+            })
+        return events
+
+def timed_stage(timer, name):
+    """timer.stage(name), or a no-op context when no timer is given."""
+    return timer.stage(name) if timer is not None else contextlib.nullcontext()
+
+def write_performance_report(run_output_dir, results, wall_time):
+    """Aggregate per-sequence stage timings into performance.json."""
+    per_stage = defaultdict(list)
+    for r in results:
+        for name, seconds in (r.get('timings') or {}).items():
+            per_stage[name].append(seconds)
+    stages = {}
+    for name in list(TIMED_STAGES) + sorted(set(per_stage) - set(TIMED_STAGES)):
+        values = per_stage.get(name)
+        if not values:
+            continue
+        values = np.array(values)
+        stats = {
+            'count': len(values),
+            'total': float(values.sum()),
+            'mean': float(values.mean()),
+            'max': float(values.max()),
+        }
+        for q in REPORT_PERCENTILES:
+            stats[f'p{q}'] = float(np.percentile(values, q))
+        stages[name] = stats
+    stage_time_total = sum(s['total'] for s in stages.values())
+    for stats in stages.values():
+        stats['share'] = stats['total'] / stage_time_total if stage_time_total else 0.0
+    
+    completed = [r for r in results if r.get('status') == 'ok']
+    nucleotides = sum(r.get('length', 0) for r in completed)
+    report = {
+        'wall_time': wall_time,
+        'sequences': len(completed),
+        'nucleotides': nucleotides,
+        'sequences_per_s': len(completed) / wall_time if wall_time > 0 else None,
+        'nt_per_s': nucleotides / wall_time if wall_time > 0 else None,
+        'stages': stages,
+    }
+    with open(os.path.join(run_output_dir, "performance.json"), 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def write_chrome_trace(run_output_dir, results, run_start_us, run_end_us):
+    """
+    Write trace.json (Chrome trace-event format, open in Perfetto or
+    about:tracing) with the stage events of every worker and the run span.
+    """
+    events = []
+    for r in results:
+        events.extend(r.get('trace') or [])
+    parent_pid = os.getpid()
+    events.append({'name': 'run', 'cat': 'run', 'ph': 'X', 'ts': run_start_us,
+                   'dur': run_end_us - run_start_us, 'pid': parent_pid, 'tid': 0})
+    # Name processes/threads so the timeline reads "worker <pid>" instead of bare ids
+    for pid in sorted({e['pid'] for e in events}):
+        label = "engine (main)" if pid == parent_pid else f"worker {pid}"
+        events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': label}})
+    tids = sorted({(e['pid'], e['tid']) for e in events if e['ph'] == 'X' and e['tid']})
+    for n, (pid, tid) in enumerate(tids):
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': f"thread {n}"}})
+    path = os.path.join(run_output_dir, "trace.json")
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return path
+
+# =============================================================================
+# MEMORY & CPU TELEMETRY
+# =============================================================================
+# Per sequence task: peak RSS of the worker process (VmHWM, reset at task start
+# via /proc/self/clear_refs on Linux; elsewhere the process-lifetime peak from
+# getrusage), CPU time of the worker thread, and with performance.tracemalloc
+# the peak of Python-side allocations plus the largest allocation sites still
+# alive at the end of the task. With the thread executor, RSS and tracemalloc
+# are shared by all sequences running at the same time.
+TRACEMALLOC_TOP = 10
+
+def reset_peak_rss():
+    """Reset this process's peak RSS (Linux only). Returns True on success."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def read_peak_rss_kb():
+    """Peak RSS of this process in kB, or None if unavailable."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # macOS reports bytes
+
+class SequenceTelemetry:
+    """Peak memory and CPU time of one sequence task."""
+    def __init__(self, use_tracemalloc=False):
+        self.use_tracemalloc = use_tracemalloc
+        if use_tracemalloc:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        self.rss_reset = reset_peak_rss()
+        self.cpu_start = time.thread_time()
+
+    def finish(self):
+        data = {
+            'cpu_time': time.thread_time() - self.cpu_start,
+            'peak_rss_kb': read_peak_rss_kb(),
+            'peak_rss_scope': 'task' if self.rss_reset else 'process',
+        }
+        if self.use_tracemalloc:
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)])
+            data['py_peak_kb'] = peak / 1024
+            data['py_top'] = [{
+                'location': f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                'size_kb': stat.size / 1024,
+                'count': stat.count,
+            } for stat in snapshot.statistics('lineno')[:TRACEMALLOC_TOP]]
+        return data
+
+# =============================================================================
+# CPU PROFILING (cProfile across workers)
+# =============================================================================
+# Each worker task runs under its own cProfile.Profile; the raw stats dict is
+# returned with the result and merged in the parent with pstats. Time spent in
+# ViennaRNA shows up as the native fold calls (fc.mfe, fc.pf, ...) next to the
+# Python-side loops. Folds isolated by fold_timeout run in a child process and
+# are not profiled.
+
+# Result keys shipped from workers to the parent but not written to run_summary.json
+TRANSIENT_RESULT_KEYS = ('trace', 'cpu_profile')
+
+class _ProfileStats:
+    """Minimal profiler stand-in so pstats.Stats can load a shipped stats dict."""
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+def profiled_call(func, *args):
+    """Run func(*args) under cProfile. Returns (return value, raw stats dict)."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        value = func(*args)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return value, profiler.stats
+
+def write_cpu_profile(run_output_dir, results, top_n=40):
+    """
+    Merge the workers' cProfile stats into cpu_profile.pstats (load with
+    pstats or snakeviz) and write a top-N summary to cpu_profile.txt.
+    Returns the .pstats path, or None if no stats were collected.
+    """
+    merged = None
+    for r in results:
+        stats = r.get('cpu_profile')
+        if not stats:
+            continue
+        if merged is None:
+            merged = pstats.Stats(_ProfileStats(stats))
+        else:
+            merged.add(_ProfileStats(stats))
+    if merged is None:
+        return None
+    pstats_path = os.path.join(run_output_dir, "cpu_profile.pstats")
+    merged.dump_stats(pstats_path)
+    buffer = io.StringIO()
+    merged.stream = buffer
+    buffer.write(f"Merged cProfile stats of {sum(1 for r in results if r.get('cpu_profile'))} sequence task(s)\n")
+    for sort_key in ('cumulative', 'tottime'):
+        buffer.write(f"\n===== Top {top_n} by {sort_key} =====\n")
+        merged.sort_stats(sort_key).print_stats(top_n)
+    with open(os.path.join(run_output_dir, "cpu_profile.txt"), 'w') as f:
+        f.write(buffer.getvalue())
+    return pstats_path
+
+def write_run_summary(run_output_dir, results, errors):
+    """Write run_summary.json with one row per sequence and the error list."""
+    status_counts = defaultdict(int)
+    for r in results:
+        status_counts[r.get('status', 'ok')] += 1
+    summary = {
+        'status_counts': dict(status_counts),
+        'sequences': [{k: v for k, v in r.items() if k not in TRANSIENT_RESULT_KEYS} for r in results],
+        'errors': [{'sequence_name': name, 'message': msg} for name, msg in errors],
+    }
+    renders = [r['render'] for r in results if r.get('render') and r['render'].get('returncode') is not None]
+    if renders:
+        rss = [r['peak_rss_kb'] for r in renders if r.get('peak_rss_kb')]
+        summary['render_totals'] = {
+            'count': len(renders),
+            'failed': sum(1 for r in renders if r['status'] != 'ok'),
+            'wall_time_total': sum(r['wall_time'] for r in renders),
+            'wall_time_max': max(r['wall_time'] for r in renders),
+            'queue_time_total': sum(r['queue_time'] for r in renders),
+            'cache_hits': sum(1 for r in renders if r.get('cache_hit')),
+            'peak_rss_kb_max': max(rss) if rss else None,
+        }
+    telemetry = [(r['sequence_name'], r['telemetry']) for r in results if r.get('telemetry')]
+    if telemetry:
+        heaviest = max(telemetry, key=lambda t: t[1].get('peak_rss_kb') or 0)
+        py_peaks = [t.get('py_peak_kb') for _, t in telemetry if t.get('py_peak_kb') is not None]
+        summary['telemetry_totals'] = {
+            'cpu_time_total': sum(t['cpu_time'] for _, t in telemetry),
+            'cpu_time_max': max(t['cpu_time'] for _, t in telemetry),
+            'peak_rss_kb_max': heaviest[1].get('peak_rss_kb'),
+            'peak_rss_sequence': heaviest[0],
+            'py_peak_kb_max': max(py_peaks) if py_peaks else None,
+        }
+    path = os.path.join(run_output_dir, "run_summary.json")
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2, default=str)
+    return summary
+
+# =============================================================================
+# STAGE FINGERPRINTS (Incremental Re-runs)
+# =============================================================================
+# Each stage's outputs are recorded in <out_dir>/.stages.json together with a
+# fingerprint of the inputs that stage depends on:
+#   fold:     sequence, folding_params, constraints, SHAPE, algorithms
+#   coloring: fold + colormap, coloring_mode and colorbar styling
+#   render:   the KTS script content (see render_cache_key)
+# A re-run into the same folder recomputes only stages whose fingerprint changed.
+STAGE_MANIFEST_NAME = ".stages.json"
+FOLD_STATE_NAME = ".fold_state.npz"
+
+def stage_fingerprint(*parts):
+    """Stable hash of JSON-serializable stage inputs."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def load_stage_manifest(out_dir):
+    path = os.path.join(out_dir, STAGE_MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_stage_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, STAGE_MANIFEST_NAME)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def stage_is_current(out_dir, manifest, stage, fingerprint):
+    """True if `stage` was recorded with this fingerprint and its outputs still exist."""
+    entry = manifest.get(stage)
+    if not entry or entry.get('fingerprint') != fingerprint:
+        return False
+    return all(os.path.exists(os.path.join(out_dir, name)) for name in entry.get('outputs', []))
+
+def record_stage(manifest, stage, fingerprint, outputs):
+    manifest[stage] = {'fingerprint': fingerprint, 'outputs': [os.path.basename(o) for o in outputs]}
+
+def plist_to_arrays(plist):
+    """Convert a plist to (i, j, p) NumPy arrays (1-based positions)."""
+    rows = []
+    for entry in plist:
+        if entry.i == 0 and entry.j == 0:
+            break
+        rows.append((entry.i, entry.j, entry.p))
+    if not rows:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), np.zeros(0)
+    i, j, p = zip(*rows)
+    return np.array(i, dtype=np.int32), np.array(j, dtype=np.int32), np.array(p)
+
+def save_fold_state(out_dir, structure, plist, stats):
+    """Store the fold result so later runs can skip refolding."""
+    i, j, p = plist_to_arrays(plist)
+    path = os.path.join(out_dir, FOLD_STATE_NAME)
+    np.savez_compressed(path, structure=np.array(structure), stats=np.array(json.dumps(stats, default=float)), i=i, j=j, p=p)
+    return path
+
+def load_fold_state(out_dir):
+    """Return (structure, plist, stats) saved by save_fold_state()."""
+    with np.load(os.path.join(out_dir, FOLD_STATE_NAME)) as data:
+        structure = str(data['structure'])
+        stats = json.loads(str(data['stats']))
+        plist = [PlistEntry(int(i), int(j), float(p)) for i, j, p in zip(data['i'], data['j'], data['p'])]
+    return structure, plist, stats
+
+def write_fold_results(seq, structure, plist, stats, out_dir, sequence_name):
+    """Write the fold text outputs and the Vienna file. Returns the written paths."""
+    mfe = stats['mfe']
+    seq_rna = seq.replace('T', 'U').replace('t', 'u')
+    summary_path = os.path.join(out_dir, create_output_filename("summary", sequence_name, "txt"))
+    with open(summary_path, "w") as f:
+        f.write(f"Sequence: {seq_rna}\n")
+        f.write(f"Structure: {structure}\n")
+        f.write(f"MFE: {mfe:.2f}\n")
+        f.write(f"Ensemble Energy: {stats['ensemble_energy']:.2f}\n")
+        f.write(f"Frequency of MFE structure in ensemble: {stats['frequency']*100:.2f} %\n")
+        f.write(f"Ensemble Diversity: {stats['diversity']:.2f}\n")
+        
+    bpp_path = os.path.join(out_dir, create_output_filename("basepair_probabilities", sequence_name, "txt"))
+    with open(bpp_path, "w") as f:
+        for entry in plist:
+            if entry.i == 0 and entry.j == 0:
+                break
+            if entry.p > 0.00001:
+                f.write(f"P({entry.i},{entry.j}) = {entry.p:.10f}\n")
+    structure_pairs = []
+    stack = []
+    for idx, char in enumerate(structure):
+        if char == '(': stack.append(idx+1)
+        elif char == ')':
+            i = stack.pop()
+            j = idx+1
+            structure_pairs.append((i, j))
+    pair_probs = {}
+    for entry in plist:
+        if entry.i == 0 and entry.j == 0:
+            break
+        pair_probs[(entry.i, entry.j)] = entry.p
+        pair_probs[(entry.j, entry.i)] = entry.p
+    structure_bpp_path = os.path.join(out_dir, create_output_filename("structure_basepair_probs", sequence_name, "txt"))
+    with open(structure_bpp_path, "w") as f:
+        f.write("i\tj\tP_ij\n")
+        for i, j in structure_pairs:
+            p = pair_probs.get((i, j), 0.0)
+            f.write(f"{i}\t{j}\t{p:.10f}\n")
+    vienna_file = create_vienna_file(seq, structure, out_dir, create_output_filename("structure", sequence_name, "vienna"), sequence_name)
+    return [summary_path, bpp_path, structure_bpp_path, vienna_file]
+
+def coloring_outputs(out_dir, sequence_name, colormap_name):
+    """Files written by save_probability_results() for this colormap."""
+    cb_formats = CONFIG.get('colorbar', {}).get('format', 'png')
+    if isinstance(cb_formats, str):
+        cb_formats = [cb_formats]
+    outputs = [os.path.join(out_dir, create_output_filename("base_pairing_probabilities_per_base", sequence_name, "txt"))]
+    for cb_format in cb_formats:
+        outputs.append(os.path.join(out_dir, create_output_filename(f"base_pairing_probability_colorbar_{colormap_name}", sequence_name, cb_format)))
+    return outputs
 
 def process_sequence(header, seq, jar_path, outputs_dir, errors, profile={}):
     sequence_name = get_sequence_name(header)
     out_dir = os.path.join(outputs_dir, sequence_name)
-    os.makedirs(out_dir, exist_ok=True)
+    perf_cfg = profile.get('performance') or {}
+    fold_timeout = safe_float(perf_cfg.get('fold_timeout'), 0)
+    render_timeout = safe_float(perf_cfg.get('render_timeout'), 0)
+    incremental = perf_cfg.get('incremental', True)
+    trace = perf_cfg.get('trace', False)
+    pipeline = get_pipeline_settings(profile)
+    reused = []
+    timer = StageTimer()
+    telemetry = SequenceTelemetry(perf_cfg.get('tracemalloc', False))
     try:
-        structure, plist, stats = fold_sequence(seq, profile)
+        check_cancelled('fold')
+        os.makedirs(out_dir, exist_ok=True)
+        manifest = load_stage_manifest(out_dir) if incremental else {}
+        
+        # --- Stage 1: Fold ---
+        shape_file = (profile.get('shape_reactivity') or {}).get('file')
+        fold_fp = stage_fingerprint('fold', seq, profile.get('folding_params'), profile.get('constraints'),
+                                    profile.get('shape_reactivity'), shape_file_stamp(shape_file) if shape_file else None,
+                                    profile.get('algorithms'), (profile.get('alignment') or {}).get('sequences'))
+        if incremental and stage_is_current(out_dir, manifest, 'fold', fold_fp):
+            structure, plist, stats = load_fold_state(out_dir)
+            reused.append('fold')
+        else:
+            if fold_timeout > 0:
+                structure, plist, stats = fold_sequence_isolated(seq, profile, fold_timeout, timer)
+            else:
+                structure, plist, stats = fold_sequence(seq, profile, timer)
+            with timer.stage('text_write'):
+                fold_outputs = write_fold_results(seq, structure, plist, stats, out_dir, sequence_name)
+                if incremental:
+                    fold_outputs.append(save_fold_state(out_dir, structure, plist, stats))
+                    record_stage(manifest, 'fold', fold_fp, fold_outputs)
+                    save_stage_manifest(out_dir, manifest)
         mfe = stats['mfe']
+        vienna_file = os.path.join(out_dir, create_output_filename("structure", sequence_name, "vienna"))
         
-        seq_rna = seq.replace('T', 'U').replace('t', 'u')
-        with open(os.path.join(out_dir, create_output_filename("summary", sequence_name, "txt")), "w") as f:
-            f.write(f"Sequence: {seq_rna}\n")
-            f.write(f"Structure: {structure}\n")
-            f.write(f"MFE: {mfe:.2f}\n")
-            f.write(f"Ensemble Energy: {stats['ensemble_energy']:.2f}\n")
-            f.write(f"Frequency of MFE structure in ensemble: {stats['frequency']*100:.2f} %\n")
-            f.write(f"Ensemble Diversity: {stats['diversity']:.2f}\n")
-            
-        with open(os.path.join(out_dir, create_output_filename("basepair_probabilities", sequence_name, "txt")), "w") as f:
-            for entry in plist:
-                if entry.i == 0 and entry.j == 0:
-                    break
-                if entry.p > 0.00001:
-                    f.write(f"P({entry.i},{entry.j}) = {entry.p:.10f}\n")
-        structure_pairs = []
-        stack = []
-        for idx, char in enumerate(structure):
-            if char == '(': stack.append(idx+1)
-            elif char == ')':
-                i = stack.pop()
-                j = idx+1
-                structure_pairs.append((i, j))
-        pair_probs = {}
-        for entry in plist:
-            if entry.i == 0 and entry.j == 0:
-                break
-            pair_probs[(entry.i, entry.j)] = entry.p
-            pair_probs[(entry.j, entry.i)] = entry.p
-        with open(os.path.join(out_dir, create_output_filename("structure_basepair_probs", sequence_name, "txt")), "w") as f:
-            f.write("i\tj\tP_ij\n")
-            for i, j in structure_pairs:
-                p = pair_probs.get((i, j), 0.0)
-                f.write(f"{i}\t{j}\t{p:.10f}\n")
         pi_values = compute_base_pairing_probabilities(seq, plist)
         paired_status = get_paired_status(structure)
         
@@ -841,34 +1898,143 @@ def process_sequence(header, seq, jar_path, outputs_dir, errors, profile={}):
         selected_colormap = vis_cfg.get('colormap', SELECTED_COLORMAP)
         coloring_mode = vis_cfg.get('coloring_mode', COLORING_MODE)
         
-        colors = map_probabilities_to_colors(pi_values, paired_status, selected_colormap, coloring_mode)
-        save_probability_results(seq, pi_values, colors, out_dir, selected_colormap, sequence_name)
-        with open(os.path.join(out_dir, create_output_filename("structure", sequence_name, "vienna")), "w") as f:
-            f.write(f">{sequence_name}\n")
-            f.write(f"{seq_rna}\n")
-            f.write(f"{structure}\n")
-        vienna_file = create_vienna_file(seq, structure, out_dir, create_output_filename("structure", sequence_name, "vienna"), sequence_name)
+        # --- Stage 2: Coloring (per-base table + colorbar) ---
+        coloring_fp = stage_fingerprint('coloring', fold_fp, selected_colormap, coloring_mode, CONFIG.get('colorbar'),
+                                        CONFIG.get('output'), CONFIG.get('font'), CONFIG.get('line'), CONFIG.get('transparency'))
+        if pipeline['colorbar'] and incremental and stage_is_current(out_dir, manifest, 'coloring', coloring_fp):
+            reused.append('coloring')
+        elif pipeline['colorbar']:
+            with timer.stage('colorbar'):
+                colors = map_probabilities_to_colors(pi_values, paired_status, selected_colormap, coloring_mode)
+                save_probability_results(seq, pi_values, colors, out_dir, selected_colormap, sequence_name)
+            if incremental:
+                record_stage(manifest, 'coloring', coloring_fp, coloring_outputs(out_dir, sequence_name, selected_colormap))
+                save_stage_manifest(out_dir, manifest)
+        
+        # --- Stage 3: KTS script (cheap, always regenerated) ---
         basepair_probs_file = os.path.join(out_dir, create_output_filename("structure_basepair_probs", sequence_name, "txt"))
-        script_path = create_rnartist_script(vienna_file, basepair_probs_file, out_dir, seq, plist, selected_colormap, sequence_name, coloring_mode)
-        run_rnartist_visualization(script_path, jar_path)
-        return {
+        with timer.stage('kts'):
+            script_path = create_rnartist_script(vienna_file, basepair_probs_file, out_dir, seq, plist, selected_colormap, sequence_name, coloring_mode)
+        
+        # --- Stage 4: Render ---
+        check_cancelled('render')
+        render_fp = render_cache_key(script_path, jar_path)
+        render_info = None
+        if not pipeline['render']:
+            pass
+        elif incremental and stage_is_current(out_dir, manifest, 'render', render_fp) and manifest['render'].get('outputs'):
+            render_info = {'status': 'ok', 'returncode': 0, 'wall_time': 0.0, 'queue_time': 0.0,
+                           'peak_rss_kb': None, 'reused': True, 'outputs': manifest['render']['outputs']}
+            reused.append('render')
+        else:
+            with timer.stage('render'):
+                render_info = render_with_cache(script_path, jar_path, out_dir, sequence_name, get_rnartist_settings(profile), render_timeout or None)
+            if incremental and render_info['status'] == 'ok':
+                record_stage(manifest, 'render', render_fp, render_info.get('outputs', []))
+                save_stage_manifest(out_dir, manifest)
+        result = {
             'sequence_name': sequence_name,
+            'status': 'ok',
             'out_dir': out_dir,
             'mfe': mfe,
             'length': len(seq),
             'vienna_file': vienna_file,
-            'script_path': script_path
+            'script_path': script_path,
+            'render': render_info,
+            'stages_reused': reused,
+            'timings': timer.totals(),
+            'telemetry': telemetry.finish()
+        }
+        if trace:
+            result['trace'] = timer.trace_events(sequence_name, len(seq))
+        render_status = render_info['status'] if render_info else None
+        if render_status == 'timeout':
+            result.update(status='timeout', stage='render')
+            errors.append((sequence_name, f"Render exceeded timeout of {render_timeout:g} s"))
+        elif render_status == 'cancelled':
+            result.update(status='cancelled', stage='render')
+        return result
+    except StageInterrupted as e:
+        # Fold/render stopped: report the sequence as unfinished, not as a crash
+        if e.status != 'cancelled':
+            errors.append((sequence_name, str(e)))
+        result = {
+            'sequence_name': sequence_name,
+            'status': e.status,
+            'stage': e.stage,
+            'length': len(seq),
+            'timings': timer.totals(),
+            'telemetry': telemetry.finish()
         }
+        if trace:
+            result['trace'] = timer.trace_events(sequence_name, len(seq))
+        return result
     except Exception as e:
         errors.append((sequence_name, str(e)))
         return None
 
-def process_sequence_wrapper(args):
-    # Helper for ProcessPoolExecutor: unpack args and call process_sequence
-    return process_sequence(*args)
+# =============================================================================
+# STATS-ONLY MODE (algorithms.stats_only)
+# =============================================================================
+# Screening libraries: MFE, ensemble energy, MFE frequency and (optionally)
+# diversity per sequence, written as one row of <run folder>/summary.tsv.
+# No per-sequence folders, pair probabilities, colorbars or renders.
+STATS_SUMMARY_COLUMNS = ('sequence_name', 'length', 'mfe', 'ensemble_energy', 'frequency', 'diversity', 'structure')
 
+def process_sequence_stats(header, seq, errors, profile={}):
+    """Fold one sequence for the stats-only summary. Returns a result row or None."""
+    sequence_name = get_sequence_name(header)
+    fold_timeout = safe_float((profile.get('performance') or {}).get('fold_timeout'), 0)
+    timer = StageTimer()
+    try:
+        check_cancelled('fold')
+        if fold_timeout > 0:
+            structure, _, stats = fold_sequence_isolated(seq, profile, fold_timeout, timer)
+        else:
+            structure, _, stats = fold_sequence(seq, profile, timer)
+    except StageInterrupted as e:
+        if e.status != 'cancelled':
+            errors.append((sequence_name, str(e)))
+        return {'sequence_name': sequence_name, 'status': e.status, 'stage': e.stage, 'length': len(seq)}
+    except Exception as e:
+        errors.append((sequence_name, str(e)))
+        return None
+    return {
+        'sequence_name': sequence_name,
+        'status': 'ok',
+        'length': len(seq),
+        'structure': structure,
+        'mfe': stats['mfe'],
+        'ensemble_energy': stats['ensemble_energy'],
+        'frequency': float(stats['frequency']),
+        'diversity': stats['diversity'],
+        'timings': timer.totals(),
+    }
 
-def process_sequence_worker(args):
+def open_stats_summary(run_output_dir):
+    """Open summary.tsv and write the header. Returns the file object."""
+    f = open(os.path.join(run_output_dir, "summary.tsv"), 'w')
+    f.write('\t'.join(STATS_SUMMARY_COLUMNS) + '\n')
+    return f
+
+def write_stats_row(f, row):
+    values = []
+    for column in STATS_SUMMARY_COLUMNS:
+        value = row.get(column)
+        if value is None:
+            values.append("NA")
+        elif isinstance(value, float):
+            values.append(f"{value:.6g}")
+        else:
+            values.append(str(value))
+    f.write('\t'.join(values) + '\n')
+
+def process_sequence_wrapper(args):
+    # Helper for ProcessPoolExecutor: unpack args and call process_sequence
+    return process_sequence(*args)
+
+
+def process_sequence_worker(args):
     """
     Worker function for ProcessPoolExecutor.
     args: (header, seq, jar_path, out_dir, profile)
@@ -878,11 +2044,1245 @@ def process_sequence_worker(args):
     local_errors = []
     try:
         # Errors list is passed but local to the process. We return it.
-        result = process_sequence(header, seq, jar_path, out_dir, local_errors, profile)
+        if (profile.get('algorithms') or {}).get('stats_only'):
+            result = process_sequence_stats(header, seq, local_errors, profile)
+        elif (profile.get('performance') or {}).get('profile_cpu'):
+            result, stats = profiled_call(process_sequence, header, seq, jar_path, out_dir, local_errors, profile)
+            if result:
+                result['cpu_profile'] = stats
+        else:
+            result = process_sequence(header, seq, jar_path, out_dir, local_errors, profile)
         return result, local_errors
     except Exception as e:
         return None, [(get_sequence_name(header), str(e))]
 
+# =============================================================================
+# EXECUTOR BACKENDS
+# =============================================================================
+# process: one Python process per worker (parallel folds, highest startup cost)
+# thread:  threads in this process (parallel JVM renders and I/O, folds share the GIL)
+# serial:  runs each sequence in the calling thread (tiny jobs, debugging)
+EXECUTOR_BACKENDS = ('auto', 'process', 'thread', 'serial')
+
+# Auto-selection: below this total length folding is cheap and renders dominate,
+# so threads (no process spawn) are enough to overlap the JVMs.
+AUTO_THREAD_MAX_TOTAL_NT = 5000
+
+class SerialExecutor(concurrent.futures.Executor):
+    """Executor that runs each task in the calling thread at submit time."""
+
+    def __init__(self, initializer=None, initargs=(), should_stop=None):
+        # should_stop(): once True, further submissions come back cancelled
+        self._should_stop = should_stop
+        if initializer is not None:
+            initializer(*initargs)
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = concurrent.futures.Future()
+        if self._should_stop is not None and self._should_stop():
+            future.cancel()
+            future.set_running_or_notify_cancel()
+            return future
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+def choose_executor_backend(requested, n_jobs, total_nt, max_workers):
+    """Resolve 'auto' to a concrete backend from the job count and total sequence length."""
+    if requested in EXECUTOR_BACKENDS and requested != 'auto':
+        return requested
+    if requested not in EXECUTOR_BACKENDS:
+        print(f"Warning: Unknown executor '{requested}'. Using automatic selection.")
+    if n_jobs <= 1 or max_workers <= 1:
+        return 'serial'
+    if total_nt <= AUTO_THREAD_MAX_TOTAL_NT:
+        return 'thread'
+    return 'process'
+
+def choose_fold_backend(requested, n_jobs, max_workers):
+    """Backend for fold-only passes (screening, ranking): no renders to overlap, so auto never picks threads."""
+    backend = choose_executor_backend(requested, n_jobs, 0, max_workers)
+    if backend == 'thread' and requested == 'auto':
+        backend = 'process'
+    return backend
+
+def create_shared_primitives(backend):
+    """Return (semaphore_factory, event_factory) usable by the given backend's workers."""
+    if backend == 'process':
+        import multiprocessing
+        return multiprocessing.BoundedSemaphore, multiprocessing.Event
+    return threading.BoundedSemaphore, threading.Event
+
+def create_executor(backend, max_workers, initializer=None, initargs=(), should_stop=None):
+    """Create the executor for a resolved backend name."""
+    if backend == 'process':
+        return concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=initializer, initargs=initargs)
+    if backend == 'thread':
+        return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, initializer=initializer, initargs=initargs)
+    return SerialExecutor(initializer=initializer, initargs=initargs, should_stop=should_stop)
+
+# =============================================================================
+# BULK IN-MEMORY API (fold_many)
+# =============================================================================
+# For feature generation on large libraries: folds through the worker pool and
+# yields plain Python/NumPy results, with no per-sequence folders or text files.
+FOLD_MANY_CHUNK_SIZE = 64      # Records per worker task (amortizes inter-process overhead)
+FOLD_MANY_BPP_CUTOFF = 1e-5    # Pairs below this probability are dropped from bpp arrays and Pi
+FOLD_MANY_SHARD_ROWS = 100000  # Rows per Parquet shard
+
+def fold_record(header, seq, profile={}, bpp_cutoff=FOLD_MANY_BPP_CUTOFF):
+    """
+    Fold one sequence into an in-memory result:
+    sequence_name, sequence, structure, stats (mfe, ensemble_energy, frequency,
+    diversity), pi (per-base pairing probability, float32) and the sparse
+    base-pair probabilities bpp_i, bpp_j (1-based, int32) and bpp_p (float32).
+    pi is summed over the kept pairs only, so it can fall below the pipeline's
+    per-base Pi by at most (dropped partners of the base) x bpp_cutoff;
+    bpp_cutoff=0.0 gives identical values (the exact sum needs the full
+    O(N^2) probability matrix, which is slow and large for long sequences).
+    algorithms.stats_only is ignored: the results need the pair probabilities.
+    """
+    algorithms = profile.get('algorithms') or {}
+    if algorithms.get('stats_only'):
+        profile = dict(profile, algorithms=dict(algorithms, stats_only=False))
+    structure, plist, stats = fold_sequence(seq, profile, bpp_cutoff=bpp_cutoff)
+    i, j, p = plist_to_arrays(plist)
+    pi = np.bincount(i - 1, weights=p, minlength=len(seq)) + np.bincount(j - 1, weights=p, minlength=len(seq))
+    return {
+        'sequence_name': get_sequence_name(header),
+        'sequence': seq,
+        'structure': structure,
+        'stats': {k: (bool(v) if k == 'constraint_applied' else None if v is None else float(v)) for k, v in stats.items()},
+        'pi': pi.astype(np.float32),
+        'bpp_i': i,
+        'bpp_j': j,
+        'bpp_p': p.astype(np.float32),
+    }
+
+def _fold_chunk(chunk, profile, bpp_cutoff):
+    """Worker task for fold_many(): fold (index, header, seq) records, never raising."""
+    results = []
+    for index, header, seq in chunk:
+        try:
+            result = fold_record(header, seq, profile, bpp_cutoff)
+        except Exception as e:
+            result = {'sequence_name': get_sequence_name(header), 'sequence': seq, 'error': str(e)}
+        result['index'] = index
+        results.append(result)
+    return results
+
+def _iter_record_chunks(records, chunk_size):
+    """Group records ((header, seq) pairs or bare sequences) into indexed chunks."""
+    chunk = []
+    for index, record in enumerate(records):
+        if isinstance(record, str):
+            header, seq = f"seq_{index + 1}", record
+        else:
+            header, seq = record
+        chunk.append((index, header, seq))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class _ParquetShardWriter:
+    """Buffers fold_many() results and writes them as part-NNNNN.parquet files."""
+    def __init__(self, out_dir, shard_rows=FOLD_MANY_SHARD_ROWS):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Writing Parquet needs the optional 'pyarrow' package (pip install pyarrow).")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.out_dir = out_dir
+        self.shard_rows = shard_rows
+        self.rows = []
+        self.shards = 0
+        os.makedirs(out_dir, exist_ok=True)
+
+    def add(self, result):
+        if 'error' in result:
+            return
+        row = {
+            'index': result['index'],
+            'sequence_name': result['sequence_name'],
+            'sequence': result['sequence'],
+            'structure': result['structure'],
+            'pi': result['pi'].tolist(),
+            'bpp_i': result['bpp_i'].tolist(),
+            'bpp_j': result['bpp_j'].tolist(),
+            'bpp_p': result['bpp_p'].tolist(),
+        }
+        row.update(result['stats'])
+        self.rows.append(row)
+        if len(self.rows) >= self.shard_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        table = self.pa.Table.from_pylist(self.rows)
+        self.pq.write_table(table, os.path.join(self.out_dir, f"part-{self.shards:05d}.parquet"))
+        self.shards += 1
+        self.rows = []
+
+def fold_many(records, profile=None, max_workers=None, executor='process', chunk_size=FOLD_MANY_CHUNK_SIZE,
+              bpp_cutoff=FOLD_MANY_BPP_CUTOFF, parquet_dir=None, shard_rows=FOLD_MANY_SHARD_ROWS):
+    """
+    Fold many sequences through the worker pool without writing per-sequence files.
+    
+    Args:
+        records: Iterable of (header, seq) pairs or bare sequence strings. Consumed
+            lazily, so generators over huge FASTA files are fine.
+        profile (dict | str): Profile dict or path to a JSON profile
+            (algorithms.stats_only is ignored, see fold_record()).
+        max_workers (int): Worker count (default: performance.max_workers, 0 = all cores).
+        executor (str): process (default), thread or serial.
+        chunk_size (int): Records per worker task.
+        bpp_cutoff (float): Drop pairs below this probability from bpp_* and pi
+            (0.0 keeps all: pi then equals the pipeline's per-base Pi, slower).
+        parquet_dir (str): Optionally also write results as a sharded Parquet
+            dataset (requires pyarrow).
+        shard_rows (int): Rows per Parquet shard.
+    
+    Yields:
+        dict per sequence, in completion order (see fold_record(); 'index' is the
+        position in `records`). Failed sequences carry 'error' instead of results.
+    """
+    if isinstance(profile, str):
+        profile = load_profile(profile)
+    profile = profile or {}
+    if max_workers is None:
+        max_workers = int(get_performance_settings(profile).get('max_workers') or 0)
+    if max_workers <= 0:
+        max_workers = os.cpu_count() or 4
+    if executor == 'auto':
+        executor = 'process'  # No renders here: folding dominates
+    writer = _ParquetShardWriter(parquet_dir, shard_rows) if parquet_dir else None
+    chunks = _iter_record_chunks(records, chunk_size)
+    try:
+        with create_executor(executor, max_workers) as pool:
+            for result in iter_chunk_results(pool, _fold_chunk, chunks, (profile, bpp_cutoff), max_workers * 2):
+                if writer:
+                    writer.add(result)
+                yield result
+    finally:
+        if writer:
+            writer.flush()
+
+def iter_chunk_results(pool, func, chunks, args=(), max_in_flight=8, should_stop=None):
+    """
+    Submit func(chunk, *args) for each chunk with at most max_in_flight tasks
+    pending, and yield the items of each returned list as tasks complete.
+    A bounded number of chunks in flight keeps memory flat for very long inputs.
+    should_stop(): once True, no further chunks are submitted.
+    """
+    pending = set()
+    exhausted = False
+    while pending or not exhausted:
+        while not exhausted and len(pending) < max_in_flight:
+            chunk = None if should_stop is not None and should_stop() else next(chunks, None)
+            if chunk is None:
+                exhausted = True
+            else:
+                pending.add(pool.submit(func, chunk, *args))
+        if not pending:
+            break
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            if future.cancelled():
+                continue
+            yield from future.result()
+
+# =============================================================================
+# TWO-TIER SCREENING (screening)
+# =============================================================================
+# Tier 1 folds every sequence for its MFE only (no partition function, no
+# files) and applies the screen below; tier 2 runs the normal pipeline
+# (partition function, coloring, render) on the hits alone.
+DEFAULT_SCREENING_SETTINGS = {
+    'enabled': False,
+    'max_mfe': None,               # Hit if MFE <= this (kcal/mol)
+    'motif': None,                 # Hit if the MFE structure contains this dot-bracket substring
+    'motif_regex': False,          # Treat motif as a regular expression
+    'constraint': None,            # Hit if the MFE with this dot-bracket constraint ...
+    'constraint_tolerance': 0.0,   # ... is within this many kcal/mol of the unconstrained MFE
+    'chunk_size': 64,              # Sequences per tier-1 worker task
+}
+
+SCREENING_COLUMNS = ('sequence_name', 'length', 'mfe', 'constrained_mfe', 'structure', 'hit')
+
+def get_screening_settings(profile={}):
+    """Merge screening settings: defaults < config.yaml < profile."""
+    settings = dict(DEFAULT_SCREENING_SETTINGS)
+    for source in (CONFIG.get('screening') or {}, profile.get('screening') or {}):
+        if isinstance(source, dict):
+            settings.update({k: v for k, v in source.items() if v is not None})
+    return settings
+
+def describe_screen(settings):
+    """Human-readable summary of the active hit criteria."""
+    criteria = []
+    if settings.get('max_mfe') is not None:
+        criteria.append(f"MFE <= {float(settings['max_mfe']):.2f}")
+    if settings.get('motif'):
+        criteria.append(f"structure {'matches' if settings.get('motif_regex') else 'contains'} '{settings['motif']}'")
+    if settings.get('constraint'):
+        criteria.append(f"compatible with constraint (tolerance {safe_float(settings.get('constraint_tolerance'), 0.0):.2f})")
+    return ' and '.join(criteria) or "none (every sequence is a hit)"
+
+def screen_sequence(seq, profile, settings, motif_pattern=None):
+    """
+    Tier 1 for one sequence: MFE only, then the hit criteria (all must pass).
+    Returns (structure, mfe, constrained_mfe, hit); constrained_mfe is None
+    without a constraint.
+    """
+    md = configure_model_details(profile)
+    md.compute_bpp = 0
+    fc = create_fold_compound(seq, profile, md)
+    # Same structure space as the full pipeline: the profile's hard constraint and SHAPE data
+    constraints = profile.get('constraints') or {}
+    constraint_string = constraints.get('string') if constraints.get('enforce', True) else None
+    if constraint_string and len(constraint_string) == len(seq):
+        fc.hc_add_from_db(constraint_string, RNA.CONSTRAINT_DB_DEFAULT)
+    apply_shape_constraints(fc, len(seq), profile)
+    structure, mfe = fc.mfe()
+    hit = True
+    if settings.get('max_mfe') is not None and mfe > float(settings['max_mfe']):
+        hit = False
+    if hit and settings.get('motif'):
+        if motif_pattern is not None:
+            hit = motif_pattern.search(structure) is not None
+        else:
+            hit = settings['motif'] in structure
+    constrained_mfe = None
+    constraint = settings.get('constraint')
+    if hit and constraint:
+        if len(constraint) != len(seq):
+            hit = False
+        else:
+            # Same compound: the constraint only restricts the structure space
+            fc.hc_add_from_db(constraint, RNA.CONSTRAINT_DB_DEFAULT)
+            _, constrained_mfe = fc.mfe()
+            hit = constrained_mfe - mfe <= safe_float(settings.get('constraint_tolerance'), 0.0) + 1e-6
+    return structure, mfe, constrained_mfe, hit
+
+def _screen_chunk(chunk, profile, settings):
+    """Worker task for tier 1: screen (index, header, seq) records, never raising."""
+    motif_pattern = re.compile(settings['motif']) if settings.get('motif') and settings.get('motif_regex') else None
+    rows = []
+    for index, header, seq in chunk:
+        row = {'index': index, 'sequence_name': get_sequence_name(header), 'length': len(seq)}
+        try:
+            structure, mfe, constrained_mfe, hit = screen_sequence(seq, profile, settings, motif_pattern)
+            row.update(structure=structure, mfe=mfe, constrained_mfe=constrained_mfe, hit=hit)
+        except Exception as e:
+            row['error'] = str(e)
+        rows.append(row)
+    return rows
+
+def run_screening(jobs, profile, settings, backend, max_workers, run_output_dir, should_stop=None, log=print):
+    """
+    Tier 1 over all jobs. Writes <run folder>/screening.tsv (one row per
+    sequence) and returns (hit jobs in input order, errors).
+    """
+    if settings.get('motif') and settings.get('motif_regex'):
+        re.compile(settings['motif'])  # Fail early on a bad pattern, not once per chunk
+    chunk_size = max(1, int(settings.get('chunk_size') or DEFAULT_SCREENING_SETTINGS['chunk_size']))
+    records = ((job[0], job[1]) for job in jobs)
+    hits = []
+    errors = []
+    screened = 0
+    t_start = time.perf_counter()
+    with open(os.path.join(run_output_dir, "screening.tsv"), 'w') as f, \
+            create_executor(backend, max_workers, should_stop=should_stop) as pool:
+        f.write('\t'.join(SCREENING_COLUMNS) + '\n')
+        chunks = _iter_record_chunks(records, chunk_size)
+        for row in iter_chunk_results(pool, _screen_chunk, chunks, (profile, settings), max_workers * 2, should_stop):
+            screened += 1
+            if 'error' in row:
+                errors.append((row['sequence_name'], row['error']))
+                continue
+            constrained = row['constrained_mfe']
+            f.write(f"{row['sequence_name']}\t{row['length']}\t{row['mfe']:.2f}\t"
+                    f"{'NA' if constrained is None else f'{constrained:.2f}'}\t{row['structure']}\t{int(row['hit'])}\n")
+            if row['hit']:
+                hits.append(row['index'])
+    log(f"Screening: {len(hits)} hits of {screened} sequences in {time.perf_counter() - t_start:.2f} s"
+        + (f" ({len(errors)} failed)" if errors else ""))
+    return [jobs[index] for index in sorted(hits)], errors
+
+# =============================================================================
+# TOP-K RANKING (ranking)
+# =============================================================================
+# Pass 1 folds every sequence for its ensemble statistics only (as in
+# stats-only mode) and keeps the best top_k in a bounded heap in the parent;
+# pass 2 runs the full pipeline on the winners alone, so outputs and disk use
+# scale with top_k rather than with the library size.
+DEFAULT_RANKING_SETTINGS = {
+    'enabled': False,
+    'top_k': 100,          # Sequences that get full outputs
+    'metric': 'mfe',       # mfe, ensemble_energy, frequency, diversity
+    'descending': None,    # Rank the highest values first. null = per metric (see RANKING_METRICS)
+    'chunk_size': 64,      # Sequences per pass-1 worker task
+}
+
+# metric -> best first is the highest value (True) or the lowest (False)
+RANKING_METRICS = {
+    'mfe': False,              # Most stable structure
+    'ensemble_energy': False,
+    'frequency': True,         # MFE structure dominates the ensemble
+    'diversity': False,        # Well-defined ensemble
+}
+
+RANKING_COLUMNS = ('rank',) + STATS_SUMMARY_COLUMNS
+
+def get_ranking_settings(profile={}):
+    """Merge ranking settings: defaults < config.yaml < profile."""
+    settings = dict(DEFAULT_RANKING_SETTINGS)
+    for source in (CONFIG.get('ranking') or {}, profile.get('ranking') or {}):
+        if isinstance(source, dict):
+            settings.update({k: v for k, v in source.items() if v is not None})
+    if settings['metric'] not in RANKING_METRICS:
+        raise ValueError(f"Unknown ranking metric '{settings['metric']}' (choose from {', '.join(RANKING_METRICS)})")
+    return settings
+
+def _rank_chunk(chunk, profile):
+    """Worker task for pass 1: ensemble statistics of (index, header, seq) records, never raising."""
+    rows = []
+    for index, header, seq in chunk:
+        row = {'index': index, 'sequence_name': get_sequence_name(header), 'length': len(seq)}
+        try:
+            structure, _, stats = fold_sequence(seq, profile)
+            row.update(structure=structure, mfe=stats['mfe'], ensemble_energy=stats['ensemble_energy'],
+                       frequency=float(stats['frequency']), diversity=stats['diversity'])
+        except Exception as e:
+            row['error'] = str(e)
+        rows.append(row)
+    return rows
+
+def run_ranking(jobs, profile, settings, backend, max_workers, run_output_dir, should_stop=None, log=print):
+    """
+    Pass 1 over all jobs. Writes <run folder>/ranking.tsv (the winners, best
+    first) and returns (winner jobs in rank order, errors).
+    """
+    metric = settings['metric']
+    descending = RANKING_METRICS[metric] if settings.get('descending') is None else bool(settings['descending'])
+    top_k = max(1, int(settings.get('top_k') or DEFAULT_RANKING_SETTINGS['top_k']))
+    chunk_size = max(1, int(settings.get('chunk_size') or DEFAULT_RANKING_SETTINGS['chunk_size']))
+    # Statistics only; the pair probabilities are computed only if diversity is the metric
+    algorithms = dict(profile.get('algorithms') or {}, stats_only=True, diversity=(metric == 'diversity'))
+    pass_profile = dict(profile, algorithms=algorithms)
+
+    # Min-heap of (score, -index, row): the root is the worst kept row (ties: later input loses)
+    heap = []
+    errors = []
+    ranked = 0
+    t_start = time.perf_counter()
+    records = ((job[0], job[1]) for job in jobs)
+    with create_executor(backend, max_workers, should_stop=should_stop) as pool:
+        chunks = _iter_record_chunks(records, chunk_size)
+        for row in iter_chunk_results(pool, _rank_chunk, chunks, (pass_profile,), max_workers * 2, should_stop):
+            if 'error' in row:
+                errors.append((row['sequence_name'], row['error']))
+                continue
+            ranked += 1
+            score = row[metric] if descending else -row[metric]
+            entry = (score, -row['index'], row)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    winners = [entry[2] for entry in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+    with open(os.path.join(run_output_dir, "ranking.tsv"), 'w') as f:
+        f.write('\t'.join(RANKING_COLUMNS) + '\n')
+        for rank, row in enumerate(winners, start=1):
+            f.write(f"{rank}\t")
+            write_stats_row(f, row)
+    log(f"Ranking: kept top {len(winners)} of {ranked} sequences by {metric} "
+        f"({'highest' if descending else 'lowest'} first) in {time.perf_counter() - t_start:.2f} s"
+        + (f" ({len(errors)} failed)" if errors else ""))
+    return [jobs[row['index']] for row in winners], errors
+
+# =============================================================================
+# MUTATIONAL SCAN (mutational_scan)
+# =============================================================================
+# Every single-nucleotide variant of each input sequence (3 per position) is
+# generated here and folded through the pool; per-variant results are compared
+# with the wild type as each chunk arrives and written compactly per sequence:
+#   <name>_mutscan.npz  position, ref, alt, delta_mfe, delta_ensemble,
+#                       max_delta_pi (3N), wt_pi (N), and the sparse delta Pi
+#                       entries with |dPi| >= delta_pi_min as delta_pi_variant
+#                       (row into the 3N arrays), delta_pi_position (1-based)
+#                       and delta_pi (float32)
+#   <name>_mutscan.tsv  one row per variant
+# The dense 3N x N delta Pi matrix is never built (about 1.2 GB at 10 kb).
+# Only variants whose effect exceeds effect_threshold go on to the full pipeline.
+DEFAULT_MUTATIONAL_SCAN_SETTINGS = {
+    'enabled': False,
+    'effect_threshold': None,          # Full outputs + render for variants above this. null = none
+    'effect_metric': 'max_delta_pi',   # max_delta_pi, delta_mfe, delta_ensemble (absolute values)
+    'delta_pi_min': 0.01,              # Keep per-base delta Pi entries with at least this magnitude
+    'chunk_size': 32,                  # Variants per worker task
+}
+MUTATIONAL_EFFECT_METRICS = ('max_delta_pi', 'delta_mfe', 'delta_ensemble')
+MUTATIONAL_SCAN_COLUMNS = ('variant', 'position', 'ref', 'alt', 'mfe', 'delta_mfe', 'ensemble_energy',
+                           'delta_ensemble', 'max_delta_pi', 'bp_distance')
+
+def get_mutational_scan_settings(profile={}):
+    """Merge mutational scan settings: defaults < config.yaml < profile."""
+    settings = dict(DEFAULT_MUTATIONAL_SCAN_SETTINGS)
+    for source in (CONFIG.get('mutational_scan') or {}, profile.get('mutational_scan') or {}):
+        if isinstance(source, dict):
+            settings.update({k: v for k, v in source.items() if v is not None})
+    if settings['effect_metric'] not in MUTATIONAL_EFFECT_METRICS:
+        raise ValueError(f"Unknown effect metric '{settings['effect_metric']}' "
+                         f"(choose from {', '.join(MUTATIONAL_EFFECT_METRICS)})")
+    return settings
+
+def single_mutants(seq):
+    """(position (1-based), ref, alt) for every single-nucleotide substitution; T-alphabet for DNA input."""
+    upper = seq.upper()
+    alphabet = 'ACGT' if 'T' in upper and 'U' not in upper else 'ACGU'
+    return [(pos, ref, alt) for pos, ref in enumerate(upper, start=1) if ref in alphabet
+            for alt in alphabet if alt != ref]
+
+def _mutant_chunk(chunk, seq, profile):
+    """Worker task: fold (index, position, alt) variants of seq. Returns compact rows, never raising."""
+    rows = []
+    for index, position, alt in chunk:
+        mutant = seq[:position - 1] + alt + seq[position:]
+        try:
+            result = fold_record('', mutant, profile)
+            rows.append({'index': index, 'structure': result['structure'], 'mfe': result['stats']['mfe'],
+                         'ensemble_energy': result['stats']['ensemble_energy'], 'pi': result['pi']})
+        except Exception as e:
+            rows.append({'index': index, 'error': str(e)})
+    return rows
+
+def run_mutational_scan(jobs, profile, settings, backend, max_workers, run_output_dir, should_stop=None, log=print):
+    """
+    Scan all single mutants of every job's sequence. Writes the matrix/table per
+    sequence and returns (mutant jobs above the effect threshold, errors).
+    """
+    threshold = settings.get('effect_threshold')
+    metric = settings['effect_metric']
+    chunk_size = max(1, int(settings.get('chunk_size') or DEFAULT_MUTATIONAL_SCAN_SETTINGS['chunk_size']))
+    delta_pi_min = safe_float(settings.get('delta_pi_min'), DEFAULT_MUTATIONAL_SCAN_SETTINGS['delta_pi_min'])
+    selected = []
+    errors = []
+    with create_executor(backend, max_workers, should_stop=should_stop) as pool:
+        for job in jobs:
+            header, seq = job[0], job[1]
+            sequence_name = get_sequence_name(header)
+            if should_stop is not None and should_stop():
+                break
+            t_start = time.perf_counter()
+            try:
+                wild_type = fold_record(header, seq, profile)
+            except Exception as e:
+                errors.append((sequence_name, str(e)))
+                continue
+            variants = single_mutants(seq)
+            n_variants = len(variants)
+            positions = np.array([v[0] for v in variants], dtype=np.int32)
+            delta_mfe = np.full(n_variants, np.nan, dtype=np.float32)
+            delta_ensemble = np.full(n_variants, np.nan, dtype=np.float32)
+            max_delta_pi = np.full(n_variants, np.nan, dtype=np.float32)
+            sparse_variant, sparse_position, sparse_delta = [], [], []
+            structures = [None] * n_variants
+            tasks = [(index, position, alt) for index, (position, _, alt) in enumerate(variants)]
+            chunks = iter([tasks[start:start + chunk_size] for start in range(0, n_variants, chunk_size)])
+            wt_stats = wild_type['stats']
+            for row in iter_chunk_results(pool, _mutant_chunk, chunks, (seq, profile), max_workers * 2, should_stop):
+                index = row['index']
+                if 'error' in row:
+                    position, ref, alt = variants[index]
+                    errors.append((f"{sequence_name}_{ref}{position}{alt}", row['error']))
+                    continue
+                delta_mfe[index] = row['mfe'] - wt_stats['mfe']
+                delta_ensemble[index] = row['ensemble_energy'] - wt_stats['ensemble_energy']
+                delta_pi = row['pi'] - wild_type['pi']
+                max_delta_pi[index] = np.abs(delta_pi).max(initial=0.0)
+                kept = np.flatnonzero(np.abs(delta_pi) >= delta_pi_min)
+                sparse_variant.append(np.full(len(kept), index, dtype=np.int32))
+                sparse_position.append((kept + 1).astype(np.int32))
+                sparse_delta.append(delta_pi[kept].astype(np.float32))
+                structures[index] = row['structure']
+
+            effect = {'max_delta_pi': max_delta_pi, 'delta_mfe': np.abs(delta_mfe),
+                      'delta_ensemble': np.abs(delta_ensemble)}[metric]
+            np.savez_compressed(
+                os.path.join(run_output_dir, f"{sequence_name}_mutscan.npz"),
+                position=positions, ref=np.array([v[1] for v in variants]), alt=np.array([v[2] for v in variants]),
+                delta_mfe=delta_mfe, delta_ensemble=delta_ensemble, max_delta_pi=max_delta_pi, wt_pi=wild_type['pi'],
+                delta_pi_variant=np.concatenate(sparse_variant or [np.zeros(0, dtype=np.int32)]),
+                delta_pi_position=np.concatenate(sparse_position or [np.zeros(0, dtype=np.int32)]),
+                delta_pi=np.concatenate(sparse_delta or [np.zeros(0, dtype=np.float32)]),
+                wt_mfe=wt_stats['mfe'], wt_ensemble_energy=wt_stats['ensemble_energy'])
+            with open(os.path.join(run_output_dir, f"{sequence_name}_mutscan.tsv"), 'w') as f:
+                f.write('\t'.join(MUTATIONAL_SCAN_COLUMNS) + '\n')
+                for index, (position, ref, alt) in enumerate(variants):
+                    if structures[index] is None:
+                        continue
+                    f.write(f"{ref}{position}{alt}\t{position}\t{ref}\t{alt}\t"
+                            f"{wt_stats['mfe'] + delta_mfe[index]:.2f}\t{delta_mfe[index]:.2f}\t"
+                            f"{wt_stats['ensemble_energy'] + delta_ensemble[index]:.4f}\t{delta_ensemble[index]:.4f}\t"
+                            f"{max_delta_pi[index]:.4f}\t{RNA.bp_distance(wild_type['structure'], structures[index])}\n")
+            above = [] if threshold is None else np.flatnonzero(effect > float(threshold)).tolist()
+            for index in above:
+                position, ref, alt = variants[index]
+                mutant = seq[:position - 1] + alt + seq[position:]
+                selected.append((f"{sequence_name}_{ref}{position}{alt}", mutant) + tuple(job[2:]))
+            log(f"  {sequence_name}: {n_variants} variants in {time.perf_counter() - t_start:.2f} s, "
+                f"largest {metric} {np.nanmax(effect, initial=0.0):.3f}"
+                + (f", {len(above)} above {float(threshold):g}" if threshold is not None else ""))
+    return selected, errors
+
+# =============================================================================
+# PREFIX SCAN (prefix_scan)
+# =============================================================================
+# Co-transcriptional view: every step-th prefix of each input sequence (plus
+# the full sequence) is folded for MFE and ensemble statistics. Prefixes are
+# scheduled longest-first so the slowest folds start early and short ones fill
+# the gaps at the end. Results per sequence go to one compact file:
+#   <name>_prefixes.npz  length, mfe, ensemble_energy, frequency (per prefix) and
+#                        structure (fixed-width byte strings, dtype S<full length>)
+#   <name>_prefixes.tsv  the same as text
+# Every render_every-th frame (and the full sequence) gets full outputs.
+DEFAULT_PREFIX_SCAN_SETTINGS = {
+    'enabled': False,
+    'step': 1,             # Fold every step-th prefix
+    'min_length': 10,      # Shortest prefix
+    'render_every': 0,     # Full outputs for every n-th frame (0 = none)
+    'chunk_size': 8,       # Prefixes per worker task
+}
+PREFIX_SCAN_COLUMNS = ('length', 'mfe', 'ensemble_energy', 'frequency', 'structure')
+
+def get_prefix_scan_settings(profile={}):
+    """Merge prefix scan settings: defaults < config.yaml < profile."""
+    settings = dict(DEFAULT_PREFIX_SCAN_SETTINGS)
+    for source in (CONFIG.get('prefix_scan') or {}, profile.get('prefix_scan') or {}):
+        if isinstance(source, dict):
+            settings.update({k: v for k, v in source.items() if v is not None})
+    return settings
+
+def prefix_lengths(length, step=1, min_length=1):
+    """Prefix lengths min_length, min_length + step, ... always ending with the full length."""
+    step = max(1, int(step))
+    lengths = list(range(min(max(1, int(min_length)), length), length + 1, step))
+    if not lengths or lengths[-1] != length:
+        lengths.append(length)
+    return lengths
+
+def _prefix_chunk(chunk, seq, profile):
+    """Worker task: fold (index, length) prefixes of seq for statistics. Returns compact rows, never raising."""
+    rows = []
+    for index, length in chunk:
+        try:
+            structure, _, stats = fold_sequence(seq[:length], profile)
+            rows.append({'index': index, 'structure': structure, 'mfe': stats['mfe'],
+                         'ensemble_energy': stats['ensemble_energy'], 'frequency': float(stats['frequency'])})
+        except Exception as e:
+            rows.append({'index': index, 'error': str(e)})
+    return rows
+
+def run_prefix_scan(jobs, profile, settings, backend, max_workers, run_output_dir, should_stop=None, log=print):
+    """
+    Fold the prefixes of every job's sequence. Writes the compact results per
+    sequence and returns (sampled prefix jobs for full outputs, errors).
+    """
+    render_every = int(settings.get('render_every') or 0)
+    chunk_size = max(1, int(settings.get('chunk_size') or DEFAULT_PREFIX_SCAN_SETTINGS['chunk_size']))
+    # Statistics only: the pair probabilities are not needed per prefix
+    algorithms = dict(profile.get('algorithms') or {})
+    algorithms.update(stats_only=algorithms.get('partition_function', True), diversity=False)
+    pass_profile = dict(profile, algorithms=algorithms)
+    selected = []
+    errors = []
+    with create_executor(backend, max_workers, should_stop=should_stop) as pool:
+        for job in jobs:
+            header, seq = job[0], job[1]
+            sequence_name = get_sequence_name(header)
+            if should_stop is not None and should_stop():
+                break
+            t_start = time.perf_counter()
+            lengths = prefix_lengths(len(seq), settings.get('step', 1), settings.get('min_length', 1))
+            n_frames = len(lengths)
+            mfe = np.full(n_frames, np.nan, dtype=np.float32)
+            ensemble_energy = np.full(n_frames, np.nan, dtype=np.float32)
+            frequency = np.full(n_frames, np.nan, dtype=np.float32)
+            structures = np.full(n_frames, b'', dtype=f"S{len(seq)}")
+            # Longest first: the largest folds start early, short ones balance the tail
+            tasks = sorted(enumerate(lengths), key=lambda task: -task[1])
+            chunks = iter([tasks[start:start + chunk_size] for start in range(0, n_frames, chunk_size)])
+            for row in iter_chunk_results(pool, _prefix_chunk, chunks, (seq, pass_profile), max_workers * 2, should_stop):
+                index = row['index']
+                if 'error' in row:
+                    errors.append((f"{sequence_name}_1-{lengths[index]}", row['error']))
+                    continue
+                mfe[index] = row['mfe']
+                ensemble_energy[index] = row['ensemble_energy']
+                frequency[index] = row['frequency']
+                structures[index] = row['structure'].encode('ascii')
+
+            np.savez_compressed(os.path.join(run_output_dir, f"{sequence_name}_prefixes.npz"),
+                                length=np.array(lengths, dtype=np.int32), mfe=mfe, ensemble_energy=ensemble_energy,
+                                frequency=frequency, structure=structures)
+            with open(os.path.join(run_output_dir, f"{sequence_name}_prefixes.tsv"), 'w') as f:
+                f.write('\t'.join(PREFIX_SCAN_COLUMNS) + '\n')
+                for index, length in enumerate(lengths):
+                    if not structures[index]:
+                        continue
+                    f.write(f"{length}\t{mfe[index]:.2f}\t{ensemble_energy[index]:.4f}\t{frequency[index]:.6g}\t"
+                            f"{structures[index].decode('ascii')}\n")
+            if render_every > 0:
+                frames = [index for index in range(n_frames) if index % render_every == 0 or index == n_frames - 1]
+                for index in frames:
+                    if structures[index]:
+                        selected.append((f"{sequence_name}_1-{lengths[index]}", seq[:lengths[index]]) + tuple(job[2:]))
+            log(f"  {sequence_name}: {n_frames} prefixes ({lengths[0]}-{lengths[-1]} nt) in {time.perf_counter() - t_start:.2f} s"
+                + (f", {len(frames)} frames sampled for rendering" if render_every > 0 else ""))
+    return selected, errors
+
+# =============================================================================
+# SUBOPTIMAL STRUCTURES (subopt)
+# =============================================================================
+# RNAsubopt-style enumeration of every structure within `delta` kcal/mol of the
+# MFE. ViennaRNA hands each structure to a callback, which writes it straight
+# to <name>_subopt.txt.gz and updates the count, energy sum and histogram, so
+# memory stays flat however many structures there are. The bindings cannot stop
+# an enumeration quietly (an exception raised in the callback is printed with
+# its traceback), so max_structures caps the energy band instead: starting at
+# one histogram bin, the band is widened pass by pass until it holds more than
+# max_structures (or reaches delta). The file then keeps the lowest-energy
+# structures: all of the last band that fitted, topped up from the next one
+# (the row is then marked truncated). Structures come in enumeration order,
+# not sorted by energy.
+DEFAULT_SUBOPT_SETTINGS = {
+    'enabled': False,
+    'delta': 1.0,              # Energy band above the MFE (kcal/mol)
+    'max_structures': 100000,  # Keep at most this many (lowest-energy) structures per sequence (0 = no cap)
+    'histogram_bin': 0.1,      # Histogram bin width (kcal/mol)
+    'compress_level': 6,       # gzip level of the structure files
+    'full_outputs': False,     # Also run the normal pipeline for each sequence
+}
+SUBOPT_SUMMARY_COLUMNS = ('sequence_name', 'length', 'mfe', 'delta', 'structures', 'truncated', 'mean_energy',
+                          'max_energy', 'histogram')
+
+def get_subopt_settings(profile={}):
+    """Merge subopt settings: defaults < config.yaml < profile."""
+    settings = dict(DEFAULT_SUBOPT_SETTINGS)
+    for source in (CONFIG.get('subopt') or {}, profile.get('subopt') or {}):
+        if isinstance(source, dict):
+            settings.update({k: v for k, v in source.items() if v is not None})
+    return settings
+
+def enumerate_suboptimals(seq, profile, settings, out_path, header=None):
+    """
+    Stream the suboptimal structures of seq to a gzip file (RNAsubopt layout:
+    sequence, MFE and delta, then one 'structure energy' line each).
+    Returns the on-the-fly statistics; the histogram counts structures per
+    histogram_bin from the MFE upwards.
+    """
+    delta = max(0.0, safe_float(settings.get('delta'), DEFAULT_SUBOPT_SETTINGS['delta']))
+    max_structures = int(settings.get('max_structures') or 0)
+    bin_width = safe_float(settings.get('histogram_bin'), 0) or DEFAULT_SUBOPT_SETTINGS['histogram_bin']
+    md = configure_model_details(profile)
+    md.uniq_ML = 1  # Required by the subopt backtracking
+    md.compute_bpp = 0
+    fc = create_fold_compound(seq, profile, md)
+    constraints = profile.get('constraints') or {}
+    constraint_string = constraints.get('string') if constraints.get('enforce', True) else None
+    if constraint_string and len(constraint_string) == len(seq):
+        fc.hc_add_from_db(constraint_string, RNA.CONSTRAINT_DB_DEFAULT)
+    apply_shape_constraints(fc, len(seq), profile)
+    _, mfe = fc.mfe()
+
+    delta_dcal = int(round(delta * 100))
+    bin_dcal = max(1, int(round(bin_width * 100)))
+    band = min(delta_dcal, bin_dcal) if max_structures else delta_dcal
+    kept_band, kept_count = -1, 0  # Widest band known to hold at most max_structures
+    while True:
+        histogram = np.zeros(int(np.ceil(delta / bin_width - 1e-9)) + 1, dtype=np.int64)
+        state = {'seen': 0, 'above_kept': 0, 'count': 0, 'energy_sum': 0.0, 'max_energy': mfe, 'truncated': False}
+        with gzip.open(out_path, 'wt', compresslevel=int(settings.get('compress_level', 6))) as f:
+            if header:
+                f.write(f">{header}\n")
+            f.write(f"{seq} {mfe:6.2f} {delta:6.2f}\n")
+
+            def on_structure(structure, energy, data):
+                if structure is None:
+                    return  # End-of-enumeration call
+                state['seen'] += 1
+                if max_structures and int(round((energy - mfe) * 100)) > kept_band:
+                    if state['above_kept'] >= max_structures - kept_count:
+                        state['truncated'] = True
+                        return
+                    state['above_kept'] += 1
+                f.write(f"{structure} {energy:6.2f}\n")
+                state['count'] += 1
+                state['energy_sum'] += energy
+                state['max_energy'] = max(state['max_energy'], energy)
+                histogram[min(int((energy - mfe) / bin_width + 1e-6), len(histogram) - 1)] += 1
+
+            fc.subopt_cb(band, on_structure, None)
+        if not max_structures or state['seen'] > max_structures or band >= delta_dcal:
+            break
+        # Widen toward twice the cap, assuming the count grows exponentially with the
+        # band (fitted on the last two passes): at least one bin, at most double
+        seen = state['seen']
+        if kept_count and seen > kept_count:
+            grow = np.log(2 * max_structures / seen) / (np.log(seen / kept_count) / (band - kept_band))
+        else:
+            grow = band
+        grow = min(max(grow, bin_dcal), band)
+        kept_band, kept_count = band, seen
+        band = min(delta_dcal, band + int(np.ceil(grow / bin_dcal)) * bin_dcal)
+    return {
+        'mfe': mfe,
+        'delta': delta,
+        'structures': state['count'],
+        'truncated': state['truncated'],
+        'mean_energy': state['energy_sum'] / state['count'] if state['count'] else None,
+        'max_energy': state['max_energy'],
+        'histogram': histogram.tolist(),
+    }
+
+def _subopt_chunk(chunk, profile, settings, run_output_dir):
+    """Worker task: enumerate the suboptimals of (header, seq) records. Returns summary rows, never raising."""
+    rows = []
+    for header, seq in chunk:
+        sequence_name = get_sequence_name(header)
+        try:
+            stats = enumerate_suboptimals(seq, profile, settings,
+                                          os.path.join(run_output_dir, f"{sequence_name}_subopt.txt.gz"), header)
+            rows.append(dict(stats, sequence_name=sequence_name, length=len(seq)))
+        except Exception as e:
+            rows.append({'sequence_name': sequence_name, 'error': str(e)})
+    return rows
+
+def run_subopt(jobs, profile, settings, backend, max_workers, run_output_dir, should_stop=None, log=print):
+    """
+    Enumerate the suboptimal structures of every job's sequence, one sequence
+    per worker task. Writes subopt_summary.tsv and returns (jobs for full
+    outputs, errors); no jobs unless subopt.full_outputs is set.
+    """
+    errors = []
+    summary_path = os.path.join(run_output_dir, "subopt_summary.tsv")
+    chunks = ([(job[0], job[1])] for job in jobs)
+    with create_executor(backend, max_workers, should_stop=should_stop) as pool, open(summary_path, 'w') as f:
+        f.write('\t'.join(SUBOPT_SUMMARY_COLUMNS) + '\n')
+        for row in iter_chunk_results(pool, _subopt_chunk, chunks, (profile, settings, run_output_dir),
+                                      max_workers * 2, should_stop):
+            if 'error' in row:
+                errors.append((row['sequence_name'], row['error']))
+                continue
+            mean = f"{row['mean_energy']:.4f}" if row['mean_energy'] is not None else "NA"
+            f.write(f"{row['sequence_name']}\t{row['length']}\t{row['mfe']:.2f}\t{row['delta']:g}\t{row['structures']}\t"
+                    f"{int(row['truncated'])}\t{mean}\t{row['max_energy']:.2f}\t{','.join(map(str, row['histogram']))}\n")
+            log(f"  {row['sequence_name']}: {row['structures']} structures within {row['delta']:g} kcal/mol of "
+                f"{row['mfe']:.2f}" + (" (capped at max_structures)" if row['truncated'] else ""))
+    log(f"Subopt summary: {summary_path}")
+    return (list(jobs) if settings.get('full_outputs') else []), errors
+
+# =============================================================================
+# CONSTRAINT SCAN (constraints.scan / constraints.scan_file)
+# =============================================================================
+# One sequence under many hard constraints: each worker task builds the fold
+# compound once and, per variant, resets the hard constraints (hc_init) and
+# applies the next dot-bracket string. Results are compared against the
+# unconstrained fold in <run folder>/constraint_scan.tsv.
+CONSTRAINT_SCAN_COLUMNS = ('sequence_name', 'variant', 'mfe', 'delta_mfe', 'ensemble_energy', 'frequency',
+                           'diversity', 'bp_distance', 'structure', 'constraint')
+UNCONSTRAINED_VARIANT = 'unconstrained'
+
+def read_constraint_list(path):
+    """
+    Read constraint strings from a text file: one per line, optionally named by
+    a preceding '>name' line. Blank lines and '#' comments are skipped.
+    Returns [(name or None, constraint), ...].
+    """
+    variants = []
+    name = None
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('>'):
+                name = line[1:].strip() or None
+                continue
+            variants.append((name, line))
+            name = None
+    return variants
+
+def load_scan_constraints(profile):
+    """Constraint variants of the profile's scan (list and/or file), or [] when no scan is configured."""
+    constraints = profile.get('constraints') or {}
+    variants = [(entry.get('name'), entry['constraint']) if isinstance(entry, dict) else (None, entry)
+                for entry in constraints.get('scan') or []]
+    if constraints.get('scan_file'):
+        variants.extend(read_constraint_list(constraints['scan_file']))
+    # Unnamed variants are numbered by position: c1, c2, ...
+    return [(name or f"c{n}", constraint) for n, (name, constraint) in enumerate(variants, start=1)]
+
+def _scan_constraint_chunk(chunk, seq, profile):
+    """Worker task: fold seq under each (index, name, constraint) with one shared fold compound."""
+    algorithms = profile.get('algorithms', {})
+    with_pf = algorithms.get('partition_function', True)
+    md = configure_model_details(profile)
+    fc = create_fold_compound(seq, profile, md)
+    apply_shape_constraints(fc, len(seq), profile)  # Soft constraints are kept across hc_init()
+    kt = 0.00198717 * (md.temperature + 273.15)
+    rows = []
+    for index, name, constraint in chunk:
+        row = {'index': index, 'variant': name, 'constraint': constraint or None}
+        try:
+            if constraint and len(constraint) != len(seq):
+                raise ValueError(f"Constraint length ({len(constraint)}) does not match sequence length ({len(seq)})")
+            fc.hc_init()
+            if constraint:
+                fc.hc_add_from_db(constraint, RNA.CONSTRAINT_DB_DEFAULT)
+            structure, mfe = fc.mfe()
+            row.update(structure=structure, mfe=mfe)
+            if with_pf:
+                fc.exp_params_rescale(mfe)
+                _, ensemble_energy = fc.pf()
+                row.update(ensemble_energy=ensemble_energy, frequency=float(np.exp((ensemble_energy - mfe) / kt)),
+                           diversity=fc.mean_bp_distance())
+        except Exception as e:
+            row['error'] = str(e)
+        rows.append(row)
+    return rows
+
+def run_constraint_scan(header, seq, variants, profile, backend, max_workers, out_file, should_stop=None):
+    """
+    Fold one sequence unconstrained and under every (name, constraint) variant.
+    Appends rows to the open out_file and returns (rows in variant order, errors).
+    """
+    sequence_name = get_sequence_name(header)
+    tasks = [(0, UNCONSTRAINED_VARIANT, '')] + [(n, name, constraint) for n, (name, constraint) in enumerate(variants, start=1)]
+    # One chunk per worker: each builds its fold compound once
+    chunk_size = max(1, -(-len(tasks) // max_workers))
+    chunks = iter([tasks[start:start + chunk_size] for start in range(0, len(tasks), chunk_size)])
+    with create_executor(backend, max_workers, should_stop=should_stop) as pool:
+        rows = sorted(iter_chunk_results(pool, _scan_constraint_chunk, chunks, (seq, profile), max_workers, should_stop),
+                      key=lambda row: row['index'])
+    errors = [(f"{sequence_name} [{row['variant']}]", row['error']) for row in rows if 'error' in row]
+    reference = rows[0] if rows and rows[0]['index'] == 0 and 'error' not in rows[0] else None
+    for row in rows:
+        if 'error' in row:
+            continue
+        row['sequence_name'] = sequence_name
+        if reference is not None:
+            row['delta_mfe'] = row['mfe'] - reference['mfe']
+            row['bp_distance'] = RNA.bp_distance(reference['structure'], row['structure'])
+        values = []
+        for column in CONSTRAINT_SCAN_COLUMNS:
+            value = row.get(column)
+            values.append("NA" if value is None else f"{value:.6g}" if isinstance(value, float) else str(value))
+        out_file.write('\t'.join(values) + '\n')
+    return rows, errors
+
+# =============================================================================
+# COFOLD INTERACTION SCREEN (cofold)
+# =============================================================================
+# RNA-RNA duplexes for every (query, target) pair: queries are the input
+# sequences, targets a second FASTA (or the queries themselves: all-vs-all,
+# each unordered pair once). Monomer ensemble energies are computed once per
+# sequence and reused for every pair; the pair matrix is cut into tiles that
+# are folded on the workers. Only pairs with a binding free energy
+#   dG_bind = G(AB) - G(A) - G(B)   (ensemble free energies)
+# at or below max_binding_energy are kept, in <run folder>/cofold_hits.tsv.
+DEFAULT_COFOLD_SETTINGS = {
+    'enabled': False,
+    'targets': None,               # FASTA of the second set. null = all-vs-all within the input
+    'max_binding_energy': -10.0,   # Hit if dG_bind <= this (kcal/mol)
+    'tile_size': 16,               # Tile edge: tile_size x tile_size pairs per worker task
+    'monomer_chunk_size': 32,      # Monomers per worker task (ensemble energies)
+}
+COFOLD_HIT_COLUMNS = ('query', 'target', 'binding_energy', 'dimer_ensemble_energy', 'dimer_mfe',
+                      'query_ensemble_energy', 'target_ensemble_energy', 'structure')
+
+def get_cofold_settings(profile={}):
+    """Merge cofold settings: defaults < config.yaml < profile."""
+    settings = dict(DEFAULT_COFOLD_SETTINGS)
+    for source in (CONFIG.get('cofold') or {}, profile.get('cofold') or {}):
+        if isinstance(source, dict):
+            settings.update({k: v for k, v in source.items() if v is not None})
+    return settings
+
+def _monomer_chunk(chunk, profile):
+    """Worker task: ensemble free energy of (index, header, seq) monomers, never raising."""
+    md = configure_model_details(profile)
+    md.compute_bpp = 0
+    rows = []
+    for index, header, seq in chunk:
+        try:
+            fc = create_fold_compound(seq, profile, md)
+            _, mfe = fc.mfe()
+            fc.exp_params_rescale(mfe)
+            _, ensemble_energy = fc.pf()
+            rows.append({'index': index, 'ensemble_energy': ensemble_energy})
+        except Exception as e:
+            rows.append({'index': index, 'sequence_name': get_sequence_name(header), 'error': str(e)})
+    return rows
+
+def _cofold_tile(tile, profile, max_binding_energy):
+    """
+    Worker task: fold every pair of one tile ((queries, targets, diagonal) with
+    items (name, seq, ensemble_energy)). Returns the hits and failed pairs only.
+    """
+    queries, targets, diagonal = tile
+    md = configure_model_details(profile)
+    md.compute_bpp = 0
+    rows = []
+    for qi, (query, query_seq, query_g) in enumerate(queries):
+        for ti, (target, target_seq, target_g) in enumerate(targets):
+            if diagonal and ti < qi:
+                continue  # All-vs-all: each unordered pair once
+            try:
+                fc = create_fold_compound(f"{query_seq}&{target_seq}", profile, md)
+                structure, dimer_mfe = fc.mfe()
+                fc.exp_params_rescale(dimer_mfe)
+                _, dimer_g = fc.pf()
+            except Exception as e:
+                rows.append({'query': query, 'target': target, 'error': str(e)})
+                continue
+            binding_energy = dimer_g - query_g - target_g
+            if binding_energy <= max_binding_energy:
+                cut = len(query_seq)
+                rows.append({'query': query, 'target': target, 'binding_energy': binding_energy,
+                             'dimer_ensemble_energy': dimer_g, 'dimer_mfe': dimer_mfe,
+                             'query_ensemble_energy': query_g, 'target_ensemble_energy': target_g,
+                             'structure': f"{structure[:cut]}&{structure[cut:]}"})
+    return rows
+
+def run_cofold_screen(queries, targets, profile, settings, backend, max_workers, run_output_dir, should_stop=None, log=print):
+    """
+    Screen all query x target pairs (targets=None: all-vs-all within queries).
+    Writes cofold_hits.tsv (best binding first). Returns (number of hits, errors).
+    """
+    all_vs_all = targets is None
+    sequences = list(queries) + ([] if all_vs_all else list(targets))
+    tile_size = max(1, int(settings.get('tile_size') or DEFAULT_COFOLD_SETTINGS['tile_size']))
+    monomer_chunk_size = max(1, int(settings.get('monomer_chunk_size') or DEFAULT_COFOLD_SETTINGS['monomer_chunk_size']))
+    threshold = float(settings['max_binding_energy'])
+    errors = []
+    with create_executor(backend, max_workers, should_stop=should_stop) as pool:
+        # 1. Monomer ensemble energies, once per sequence
+        t_start = time.perf_counter()
+        energies = [None] * len(sequences)
+        for row in iter_chunk_results(pool, _monomer_chunk, _iter_record_chunks(sequences, monomer_chunk_size), (profile,),
+                                      max_workers * 2, should_stop):
+            if 'error' in row:
+                errors.append((row['sequence_name'], row['error']))
+            else:
+                energies[row['index']] = row['ensemble_energy']
+        log(f"  Monomers: {len(sequences)} folded in {time.perf_counter() - t_start:.2f} s")
+
+        items = [(get_sequence_name(header), seq, energies[index])
+                 for index, (header, seq) in enumerate(sequences) if energies[index] is not None]
+        n_queries = sum(1 for energy in energies[:len(queries)] if energy is not None)
+        query_items, target_items = (items, items) if all_vs_all else (items[:n_queries], items[n_queries:])
+
+        # 2. Pair matrix in tiles (all-vs-all: upper triangle only)
+        def tiles():
+            for q_start in range(0, len(query_items), tile_size):
+                for t_start_ in range(q_start if all_vs_all else 0, len(target_items), tile_size):
+                    yield (query_items[q_start:q_start + tile_size], target_items[t_start_:t_start_ + tile_size],
+                           all_vs_all and q_start == t_start_)
+        n_pairs = (len(items) * (len(items) + 1) // 2) if all_vs_all else len(query_items) * len(target_items)
+        t_start = time.perf_counter()
+        hits = []
+        for row in iter_chunk_results(pool, _cofold_tile, tiles(), (profile, threshold), max_workers * 2, should_stop):
+            if 'error' in row:
+                errors.append((f"{row['query']}&{row['target']}", row['error']))
+            else:
+                hits.append(row)
+        log(f"  Pairs: {n_pairs} folded in {time.perf_counter() - t_start:.2f} s, "
+            f"{len(hits)} with binding energy <= {threshold:g} kcal/mol")
+
+    hits.sort(key=lambda row: row['binding_energy'])
+    with open(os.path.join(run_output_dir, "cofold_hits.tsv"), 'w') as f:
+        f.write('\t'.join(COFOLD_HIT_COLUMNS) + '\n')
+        for row in hits:
+            f.write('\t'.join(f"{row[c]:.4f}" if isinstance(row[c], float) else str(row[c]) for c in COFOLD_HIT_COLUMNS) + '\n')
+    return len(hits), errors
+
+# =============================================================================
+# PER-SEQUENCE CONSTRAINTS & SHAPE DATA (constraints.file / shape_reactivity.dir)
+# =============================================================================
+# Batch runs: the constraint file (FASTA-like, one dot-bracket record per
+# sequence header) and the SHAPE directory (one reactivity file per sequence
+# name) are read/indexed once in the parent. Each job's profile then carries
+# only its own constraint string and SHAPE file path.
+SHAPE_FILE_EXTENSIONS = ('.shape', '.dat', '.txt')
+
+def read_constraint_records(path):
+    """Read a multi-record constraint file: {sequence name: dot-bracket string}."""
+    return {get_sequence_name(header): constraint for header, constraint in parse_multi_fasta(path)}
+
+def index_shape_directory(path):
+    """Map sequence names to reactivity files (<name>.shape, .dat or .txt) in a directory."""
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"SHAPE directory not found: {path}")
+    index = {}
+    for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+        stem, ext = os.path.splitext(entry.name)
+        if entry.is_file() and ext.lower() in SHAPE_FILE_EXTENSIONS:
+            index.setdefault(stem, entry.path)
+    return index
+
+def load_sequence_inputs(profile):
+    """
+    Load the profile's per-sequence inputs once.
+    Returns {'constraints': {name: string}, 'shape': {name: path}} (empty dicts when unset).
+    """
+    constraint_file = (profile.get('constraints') or {}).get('file')
+    shape_dir = (profile.get('shape_reactivity') or {}).get('dir')
+    return {
+        'constraints': read_constraint_records(constraint_file) if constraint_file else {},
+        'shape': index_shape_directory(shape_dir) if shape_dir else {},
+    }
+
+def job_profile(profile, sequence_name, sequence_inputs):
+    """
+    The profile for one sequence: its own constraint string and SHAPE file
+    replace the batch-wide file/directory (sequences without a record keep
+    constraints.string / shape_reactivity.file). Returns profile itself if
+    there are no per-sequence inputs.
+    """
+    if not sequence_inputs['constraints'] and not sequence_inputs['shape']:
+        return profile
+    constraints = {k: v for k, v in (profile.get('constraints') or {}).items() if k not in ('file', 'scan', 'scan_file')}
+    if sequence_name in sequence_inputs['constraints']:
+        constraints['string'] = sequence_inputs['constraints'][sequence_name]
+    shape = {k: v for k, v in (profile.get('shape_reactivity') or {}).items() if k != 'dir'}
+    if sequence_name in sequence_inputs['shape']:
+        shape['file'] = sequence_inputs['shape'][sequence_name]
+    return dict(profile, constraints=constraints, shape_reactivity=shape)
+
+# =============================================================================
+# CONSENSUS FOLDING OF ALIGNMENTS (Stockholm / ClustalW input)
+# =============================================================================
+# Alignment files fold RNAalifold-style: one comparative fold compound per
+# alignment (energy + covariation), whose consensus structure and pair
+# probabilities go through the usual text/colorbar/KTS/render stages under the
+# alignment's consensus sequence. Files are parsed lazily, one alignment at a
+# time, and the run only keeps a few alignments per worker in flight.
+ALIGNMENT_FORMATS = {'.sto': 'stockholm', '.stk': 'stockholm', '.stockholm': 'stockholm',
+                     '.aln': 'clustal', '.clustal': 'clustal'}
+ALIGNMENT_GAP_CHARS = '.~_'
+CONSENSUS_GAP_BASE = 'N'  # Consensus columns that are mostly gaps
+
+def alignment_format(path):
+    """'stockholm', 'clustal' or None (not an alignment file), by extension."""
+    return ALIGNMENT_FORMATS.get(os.path.splitext(path)[1].lower())
+
+def _finish_alignment(rows, source):
+    """(names, sequences) from {name: [pieces]}, with gaps as '-' and T as U."""
+    names = list(rows)
+    sequences = [''.join(rows[name]).upper().replace('T', 'U') for name in names]
+    sequences = [seq.translate(str.maketrans(ALIGNMENT_GAP_CHARS, '-' * len(ALIGNMENT_GAP_CHARS))) for seq in sequences]
+    if len({len(seq) for seq in sequences}) > 1:
+        raise ValueError(f"Aligned sequences differ in length in {source}")
+    return names, sequences
+
+def iter_alignments(path):
+    """
+    Yield (alignment name, sequence names, aligned sequences) for each alignment
+    in a Stockholm (several alignments separated by '//') or ClustalW file.
+    Alignments are named by their #=GF ID line, else after the file.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    fmt = alignment_format(path)
+    count = 0
+    name, rows = None, {}
+    with open(path, 'r') as f:
+        for line in f:
+            if fmt == 'stockholm' and line.startswith('//'):
+                if rows:
+                    count += 1
+                    yield (name or (stem if count == 1 else f"{stem}_{count}"),) + _finish_alignment(rows, path)
+                name, rows = None, {}
+            elif fmt == 'stockholm' and line.startswith('#=GF ID'):
+                name = line.split(None, 2)[2].strip() if len(line.split()) > 2 else None
+            elif not line.strip() or line[0].isspace() or line.startswith(('#', 'CLUSTAL', 'MUSCLE')):
+                continue  # Comments, annotation, headers and conservation lines
+            else:
+                parts = line.split()
+                if len(parts) >= 2:
+                    rows.setdefault(parts[0], []).append(parts[1])
+    if rows:
+        count += 1
+        yield (name or (stem if count == 1 else f"{stem}_{count}"),) + _finish_alignment(rows, path)
+
+def consensus_sequence(sequences, md):
+    """Consensus (most frequent base per column) with gap columns as CONSENSUS_GAP_BASE."""
+    return RNA.aln_consensus_sequence(list(sequences), md).replace('_', CONSENSUS_GAP_BASE).replace('-', CONSENSUS_GAP_BASE)
+
+def fold_alignment(sequences, profile={}, timer=None, bpp_cutoff=0.0):
+    """
+    Comparative fold of aligned sequences; same return values as fold_sequence().
+    The MFE is the consensus energy (free energy + covariance term). Hard
+    constraints apply per alignment column; SHAPE data is not used (the run logs a warning).
+    """
+    md = configure_model_details(profile)
+    fc = create_fold_compound(list(sequences), profile, md)
+    constraints = profile.get('constraints') or {}
+    constraint_string = constraints.get('string') if constraints.get('enforce', True) else None
+    constraint_applied = False
+    if constraint_string and len(constraint_string) == len(sequences[0]):
+        fc.hc_add_from_db(constraint_string, RNA.CONSTRAINT_DB_DEFAULT)
+        constraint_applied = True
+
+    with timed_stage(timer, 'fold_mfe'):
+        structure, mfe = fc.mfe()
+    algorithms = profile.get('algorithms', {})
+    stats_only = algorithms.get('stats_only', False)
+    plist, ensemble_energy, frequency, diversity = [], 0.0, 0.0, 0.0
+    if algorithms.get('partition_function', True) or stats_only:
+        fc.exp_params_rescale(mfe)
+        with timed_stage(timer, 'fold_pf'):
+            _, ensemble_energy = fc.pf()
+        if not stats_only:
+            with timed_stage(timer, 'fold_plist'):
+                plist = fc.plist_from_probs(bpp_cutoff)
+        kt = 0.00198717 * (md.temperature + 273.15)
+        frequency = np.exp((ensemble_energy - mfe) / kt)
+        diversity = None if stats_only and not algorithms.get('diversity', False) else fc.mean_bp_distance()
+    stats = {
+        "mfe": mfe,
+        "ensemble_energy": ensemble_energy,
+        "frequency": frequency,
+        "diversity": diversity,
+        "constraint_applied": constraint_applied
+    }
+    return structure, plist, stats
+
+def iter_alignment_jobs(paths, profile, errors, log=print):
+    """
+    Yield (name, consensus sequence, alignment) per alignment, reading the files
+    lazily. `alignment` ({'names', 'sequences'}) goes into the job profile, which
+    routes fold_sequence() to fold_alignment(). Unreadable files are added to errors.
+    """
+    md = configure_model_details(profile)
+    for path in paths:
+        log(f"Reading alignment file: {os.path.basename(path)} (streamed)")
+        try:
+            for name, names, sequences in iter_alignments(path):
+                yield name, consensus_sequence(sequences, md), {'names': names, 'sequences': sequences}
+        except (OSError, ValueError, IndexError) as e:
+            errors.append((os.path.basename(path), str(e)))
+
 def check_java_available(log_callback=print):
     """Check if Java is available in the system path."""
     import shutil
@@ -899,15 +3299,26 @@ def check_java_available(log_callback=print):
 # =============================================================================
 # PROGRAMMATIC ENTRY POINT (For GUI Integration)
 # =============================================================================
-def run_engine_programmatic(input_path, profile_path=None, output_dir="outputs", callback=None):
+def run_engine_programmatic(input_path, profile_path=None, output_dir="outputs", callback=None, cancel_event=None,
+                            executor=None, max_workers=None, trace=None, profile_cpu=None):
     """
     Programmatic entry point for running the engine from Python code.
     
     Args:
-        input_path (str): Path to input FASTA file or directory.
+        input_path (str): Path to input FASTA/alignment file or directory.
         profile_path (str): Path to JSON profile.
         output_dir (str): Root output directory.
         callback (func): Optional callback for logging (message: str).
+        cancel_event (threading.Event): Optional cancellation token. Once set,
+            queued sequences are dropped and (in 'abort' mode) running ones are
+            stopped. Unfinished sequences are marked in run_summary.json.
+        executor (str): Optional backend override: auto, process, thread, serial.
+        max_workers (int): Optional worker count override.
+        trace (bool): Optional override of performance.trace (write trace.json).
+        profile_cpu (bool): Optional override of performance.profile_cpu (cProfile workers).
+    
+    Returns:
+        bool: True if the run completed, False on setup failure or cancellation.
     """
     def log(msg):
         if callback:
@@ -916,23 +3327,57 @@ def run_engine_programmatic(input_path, profile_path=None, output_dir="outputs",
             print(msg)
 
     log("Debug: Engine started.")
-    log("Debug: Checking for Java...")
-    if not check_java_available(log):
-        log("Debug: Java check FAILED.")
+    # Load Profile
+    log("Debug: Loading profile...")
+    profile = load_profile(profile_path)
+    rnartist_settings = get_rnartist_settings(profile)
+    pipeline_settings = get_pipeline_settings(profile)
+    stats_only = bool((profile.get('algorithms') or {}).get('stats_only'))
+    try:
+        scan_variants = load_scan_constraints(profile)
+    except (OSError, KeyError) as e:
+        log(f"Error: Could not load scan constraints: {e}")
         return False
-    log("Debug: Java check passed.")
+    # Java and the JAR are only needed when RNArtistCore itself renders
+    mutscan_cfg = dict(CONFIG.get('mutational_scan') or {}, **(profile.get('mutational_scan') or {}))
+    prefix_cfg = dict(CONFIG.get('prefix_scan') or {}, **(profile.get('prefix_scan') or {}))
+    cofold_settings = get_cofold_settings(profile)
+    subopt_settings = get_subopt_settings(profile)
+    renders_nothing = (stats_only or scan_variants or cofold_settings.get('enabled')
+                       or (subopt_settings.get('enabled') and not subopt_settings.get('full_outputs'))
+                       or (mutscan_cfg.get('enabled') and mutscan_cfg.get('effect_threshold') is None)
+                       or (prefix_cfg.get('enabled') and not prefix_cfg.get('render_every')))
+    needs_java = pipeline_settings['render'] and not rnartist_settings.get('command') and not renders_nothing
+    if needs_java:
+        log("Debug: Checking for Java...")
+        if not check_java_available(log):
+            log("Debug: Java check FAILED.")
+            return False
+        log("Debug: Java check passed.")
     
     log("=" * 60)
     log("RNAfold to RNArtist Engine v5 (Profile Enabled)")
     log("=" * 60)
     
-    # Load Profile
-    log("Debug: Loading profile...")
-    profile = load_profile(profile_path)
     if profile:
         log(f"Loaded Profile: {profile_path}")
     else:
         log("No profile loaded. Using default RNAfold settings (T=37, d=2, noLP=1).")
+    if cofold_settings.get('enabled'):
+        log(f"Cofold screen: {'all-vs-all' if not cofold_settings.get('targets') else 'input x ' + cofold_settings['targets']} "
+            f"to cofold_hits.tsv (no per-sequence outputs).")
+    elif scan_variants:
+        log(f"Constraint scan: {len(scan_variants)} constraints per sequence to constraint_scan.tsv (no per-sequence outputs).")
+    elif stats_only:
+        log("Stats-only mode: MFE and ensemble statistics to summary.tsv (no per-sequence outputs).")
+        if (profile.get('algorithms') or {}).get('diversity'):
+            log("Stats-only diversity: on (algorithms.diversity; the pair probability matrix is computed).")
+        else:
+            log("Stats-only diversity: NA (enable algorithms.diversity; costs the pair probability matrix).")
+    elif not pipeline_settings['render']:
+        log("Render stage disabled (pipeline.render: false).")
+    elif rnartist_settings.get('command'):
+        log(f"Using stand-in renderer: {rnartist_settings['command']}")
 
     # Correct JAR path resolution
     # In frozen exe, we look in sys._MEIPASS or current dir
@@ -954,11 +3399,29 @@ def run_engine_programmatic(input_path, profile_path=None, output_dir="outputs",
             jar_path = p
             break
             
-    if not jar_path:
+    if needs_java and not jar_path:
         log("Error: RNArtistCore.jar not found.")
         return False
-        
-    log(f"Using RNArtist JAR: {jar_path}")
+    if jar_path:
+        log(f"Using RNArtist JAR: {jar_path}")
+
+    # Resolve JVM settings once; workers receive them through the profile
+    rnartist_settings['shared_archive'] = ensure_cds_archive(jar_path, rnartist_settings, log) if needs_java else None
+    if rnartist_settings['shared_archive']:
+        log(f"Using AppCDS archive: {rnartist_settings['shared_archive']}")
+    if rnartist_settings.get('cache'):
+        rnartist_settings['cache_dir'] = os.path.abspath(rnartist_settings.get('cache_dir') or os.path.join(output_dir, ".render_cache"))
+        log(f"Render cache: {rnartist_settings['cache_dir']}")
+    perf_settings = get_performance_settings(profile)
+    if executor is not None:
+        perf_settings['executor'] = executor
+    if max_workers is not None:
+        perf_settings['max_workers'] = max_workers
+    if trace is not None:
+        perf_settings['trace'] = trace
+    if profile_cpu is not None:
+        perf_settings['profile_cpu'] = profile_cpu
+    profile = dict(profile, rnartist=rnartist_settings, performance=perf_settings, pipeline=pipeline_settings)
 
     # Create Run Folder
     import datetime
@@ -987,13 +3450,23 @@ def run_engine_programmatic(input_path, profile_path=None, output_dir="outputs",
     # Collect Input Files
     input_files = []
     if os.path.isdir(input_path):
-        for ext in ("*.fasta", "*.fa", "*.txt"):
+        for ext in ("*.fasta", "*.fa", "*.txt") + tuple('*' + ext for ext in ALIGNMENT_FORMATS):
             input_files.extend(glob.glob(os.path.join(input_path, ext)))
         if not input_files:
-            log(f"No FASTA files found in directory: {input_path}")
+            log(f"No FASTA or alignment files found in directory: {input_path}")
             return False
     else:
         input_files = [input_path]
+    # Alignments are streamed into the main pipeline later, not read up front
+    alignment_files = [path for path in input_files if alignment_format(path)]
+    input_files = [path for path in input_files if not alignment_format(path)]
+
+    # Per-sequence constraint records and SHAPE files (read once, sliced per job)
+    try:
+        sequence_inputs = load_sequence_inputs(profile)
+    except (OSError, ValueError) as e:
+        log(f"Error: Could not load per-sequence inputs: {e}")
+        return False
 
     # Prepare Jobs
     jobs = []
@@ -1007,62 +3480,212 @@ def run_engine_programmatic(input_path, profile_path=None, output_dir="outputs",
             for header, seq in records:
                 seq_name = get_sequence_name(header)
                 log(f"  Queued: {seq_name} ({len(seq)} bp)")
-                jobs.append((header, seq, jar_path, run_output_dir, [], profile))
+                jobs.append((header, seq, jar_path, run_output_dir, [], job_profile(profile, seq_name, sequence_inputs)))
         except Exception as e:
             errors.append((os.path.basename(fasta_file), str(e)))
 
-    if not jobs:
+    if not jobs and (not alignment_files or cofold_settings.get('enabled') or scan_variants):
         log("No valid sequences to process.")
         return False
+    if alignment_files:
+        log(f"Alignments: {len(alignment_files)} files, consensus-folded in the main pipeline"
+            + (" (not part of the cofold/constraint scan/fold passes)" if jobs else ""))
+        shape_cfg = profile.get('shape_reactivity') or {}
+        if shape_cfg.get('file') or shape_cfg.get('dir'):
+            log("Warning: SHAPE data (shape_reactivity) is not used for alignments; they fold without it.")
+    if sequence_inputs['constraints'] or sequence_inputs['shape']:
+        names = {get_sequence_name(job[0]) for job in jobs}
+        log(f"Per-sequence inputs: constraints for {len(names & sequence_inputs['constraints'].keys())}, "
+            f"SHAPE data for {len(names & sequence_inputs['shape'].keys())} of {len(jobs)} sequences")
 
-    # Determine workers
-    # Check profile (from GUI) first
-    max_workers = 10
-    
-    # Try profile first
-    if profile:
-         prof_perf = profile.get('performance', {})
-         if isinstance(prof_perf, dict):
-              val = prof_perf.get('max_workers')
-              if val is not None:
-                  max_workers = val
-    else:
-        # Fallback to config
-        perf_cfg = CONFIG.get('performance', {})
-        max_workers = perf_cfg.get('max_workers', 10)
+    # Determine workers (profile from GUI first, then config.yaml)
+    max_workers = int(perf_settings.get('max_workers') or 0)
     
     # If 0 or None, use auto-detect
-    if not max_workers or max_workers <= 0:
+    if max_workers <= 0:
         max_workers = os.cpu_count() or 4
+    
+    if cofold_settings.get('enabled'):
+        try:
+            targets = parse_multi_fasta(cofold_settings['targets']) if cofold_settings.get('targets') else None
+        except OSError as e:
+            log(f"Error: Could not read cofold targets: {e}")
+            return False
+        queries = [(job[0], job[1]) for job in jobs]
+        cofold_backend = choose_fold_backend(perf_settings.get('executor', 'auto'), len(queries) + len(targets or []), max_workers)
+        log(f"\nCofolding {len(queries)} x {len(targets) if targets is not None else len(queries)} sequences "
+            f"using '{cofold_backend}' executor...")
+        n_hits, cofold_errors = run_cofold_screen(queries, targets, profile, cofold_settings, cofold_backend,
+                                                  1 if cofold_backend == 'serial' else max_workers, run_output_dir,
+                                                  should_stop=lambda: cancel_event is not None and cancel_event.is_set(), log=log)
+        errors.extend(cofold_errors)
+        log(f"Hit list: {os.path.join(run_output_dir, 'cofold_hits.tsv')} ({n_hits} pairs)")
+        for name, msg in errors:
+            log(f"  {name}: {msg}")
+        write_run_summary(run_output_dir, [{'sequence_name': get_sequence_name(header), 'status': 'ok', 'length': len(seq)}
+                                           for header, seq in queries], errors)
+        return not (cancel_event is not None and cancel_event.is_set())
+    
+    if scan_variants:
+        # Constraint scan: parallel across the variants of each sequence, not across sequences
+        scan_backend = choose_fold_backend(perf_settings.get('executor', 'auto'), len(scan_variants) + 1, max_workers)
+        scan_workers = 1 if scan_backend == 'serial' else min(max_workers, len(scan_variants) + 1)
+        log(f"\nScanning {len(jobs)} sequences x {len(scan_variants)} constraints using '{scan_backend}' executor (Workers: {scan_workers})...")
+        scan_path = os.path.join(run_output_dir, "constraint_scan.tsv")
+        summary_rows = []
+        t_scan = time.perf_counter()
+        with open(scan_path, 'w') as f:
+            f.write('\t'.join(CONSTRAINT_SCAN_COLUMNS) + '\n')
+            for header, seq, *_ in jobs:
+                if cancel_event is not None and cancel_event.is_set():
+                    log("Run cancelled.")
+                    break
+                rows, scan_errors = run_constraint_scan(header, seq, scan_variants, profile, scan_backend, scan_workers, f,
+                                                        should_stop=lambda: cancel_event is not None and cancel_event.is_set())
+                errors.extend(scan_errors)
+                folded = sum(1 for row in rows if 'error' not in row)
+                log(f"  [OK] {get_sequence_name(header)} ({folded} of {len(rows)} variants folded)")
+                summary_rows.append({'sequence_name': get_sequence_name(header), 'status': 'ok', 'length': len(seq)})
+        log(f"Scan table: {scan_path} ({time.perf_counter() - t_scan:.2f} s)")
+        for name, msg in errors:
+            log(f"  {name}: {msg}")
+        write_run_summary(run_output_dir, summary_rows, errors)
+        return not (cancel_event is not None and cancel_event.is_set())
+    
+    # Fold-only passes that set the jobs for the full pipeline: prefix scan (all
+    # prefixes, keep sampled frames), mutational scan (all single mutants, keep
+    # those above the effect threshold), screening
+    # (MFE-only pass, keep the hits), ranking (statistics pass, keep the top K),
+    # then suboptimal enumeration (keep all only with subopt.full_outputs)
+    try:
+        prefix_settings = get_prefix_scan_settings(profile)
+        mutscan_settings = get_mutational_scan_settings(profile)
+        screening_settings = get_screening_settings(profile)
+        ranking_settings = get_ranking_settings(profile)
+    except ValueError as e:
+        log(f"Error: {e}")
+        return False
+    fold_passes = []
+    if prefix_settings.get('enabled'):
+        fold_passes.append((run_prefix_scan, prefix_settings, "Prefix scan of {n} sequences",
+                            "No frames sampled for rendering (prefix_scan.render_every: 0)."))
+    if mutscan_settings.get('enabled'):
+        fold_passes.append((run_mutational_scan, mutscan_settings, "Mutational scan of {n} sequences",
+                            "No variants above the effect threshold: nothing to render."))
+    if screening_settings.get('enabled'):
+        fold_passes.append((run_screening, screening_settings, "Screening {n} sequences (MFE only)",
+                            "No sequences left after screening."))
+    if ranking_settings.get('enabled'):
+        fold_passes.append((run_ranking, ranking_settings,
+                            f"Ranking {{n}} sequences by {ranking_settings['metric']} (top {ranking_settings['top_k']})",
+                            "No sequences could be ranked."))
+    if subopt_settings.get('enabled'):
+        fold_passes.append((run_subopt, subopt_settings,
+                            f"Enumerating suboptimals of {{n}} sequences (delta {subopt_settings['delta']:g} kcal/mol, "
+                            f"max {subopt_settings['max_structures'] or 'unlimited'})",
+                            "Suboptimal structures written (subopt.full_outputs: false): no per-sequence outputs."))
+    for pass_func, pass_settings, description, empty_message in (fold_passes if jobs else ()):
+        pass_backend = choose_fold_backend(perf_settings.get('executor', 'auto'), len(jobs), max_workers)
+        log(f"\n{description.format(n=len(jobs))} using '{pass_backend}' executor...")
+        if pass_func is run_screening:
+            log(f"Hit criteria: {describe_screen(screening_settings)}")
+        try:
+            jobs, pass_errors = pass_func(jobs, profile, pass_settings, pass_backend,
+                                          1 if pass_backend == 'serial' else max_workers, run_output_dir,
+                                          should_stop=lambda: cancel_event is not None and cancel_event.is_set(), log=log)
+        except re.error as e:
+            log(f"Error: Invalid screening motif pattern: {e}")
+            return False
+        errors.extend(pass_errors)
+        if cancel_event is not None and cancel_event.is_set():
+            log("Run cancelled.")
+            return False
+        if not jobs and not alignment_files:
+            log(empty_message)
+            for name, msg in errors:
+                log(f"  {name}: {msg}")
+            write_run_summary(run_output_dir, [], errors)
+            return True
+    
+    # Pick the executor backend (auto: by job count and total length)
+    total_nt = sum(len(job[1]) for job in jobs)
+    backend = choose_executor_backend(perf_settings.get('executor', 'auto'), len(jobs), total_nt, max_workers)
+    if (stats_only or alignment_files) and backend == 'thread' and perf_settings.get('executor', 'auto') == 'auto':
+        backend = 'process'  # No renders to overlap, or alignment count/size unknown: folding dominates
+    if perf_settings.get('profile_cpu') and backend == 'thread':
+        # Only one cProfile profiler can be active per process at a time
+        log("CPU profiling: using 'process' executor instead of 'thread'.")
+        backend = 'process'
+    if backend == 'serial':
+        max_workers = 1
+    if not alignment_files:
+        max_workers = min(max_workers, len(jobs))
+    make_semaphore, make_event = create_shared_primitives(backend)
         
-    # Execute in Parallel (Multiprocessing)
-    log(f"\nProcessing {len(jobs)} sequences using Multiprocessing (Workers: {max_workers})...")
+    log(f"\nProcessing {len(jobs)} sequences ({total_nt} nt)" + (f" and {len(alignment_files)} alignment files" if alignment_files else "")
+        + f" using '{backend}' executor (Workers: {max_workers})...")
     
     count = 0 
     
-    # Ensure workers count is valid for ProcessPoolExecutor (must be > 0 or None)
-    # If max_workers is None, it uses default.
-    # We already set it to explicit count unless 0.
+    # JVM resource governor: cap concurrently running RNArtistCore JVMs
+    jvm_slots = None
+    max_jvms = int(rnartist_settings.get('max_concurrent') or 0)
+    if 0 < max_jvms < max_workers:
+        jvm_slots = make_semaphore(max_jvms)
+    log(f"JVM settings: heap={rnartist_settings.get('max_heap') or 'default'}, "
+        f"cpus={rnartist_settings.get('active_processor_count') or 'all'}, "
+        f"gc={rnartist_settings.get('gc') or 'default'}, "
+        f"max concurrent={max_jvms if jvm_slots else max_workers}")
+    if perf_settings.get('fold_timeout') or perf_settings.get('render_timeout'):
+        log(f"Timeouts: fold={perf_settings.get('fold_timeout') or 'none'} s, "
+            f"render={perf_settings.get('render_timeout') or 'none'} s")
     
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+    # Per-sequence rows for run_summary.json (successes and unfinished alike)
+    summary_rows = []
+    cancelled = False
+    # Seen by every worker; set on cancellation in 'abort' mode
+    worker_cancel = make_event()
+    cancel_mode = perf_settings.get('cancel_mode', 'abort')
+    if backend == 'serial' and cancel_event is not None and cancel_mode != 'drain':
+        # Serial tasks run inside submit(), so the loop below never gets a chance
+        # to relay the cancellation: let the worker watch the caller's event directly.
+        worker_cancel = cancel_event
+    
+    def should_stop():
+        return cancel_event is not None and cancel_event.is_set()
+    
+    t_run = time.perf_counter()
+    run_start_us = time.time_ns() // 1000
+    # Stats-only rows are streamed to summary.tsv as they complete
+    stats_summary = open_stats_summary(run_output_dir) if stats_only else None
+    pool = create_executor(backend, max_workers, init_worker, (jvm_slots, worker_cancel), should_stop)
+    with pool as executor:
         # Allow passing errors via wrapper? No, wrapper handles it.
         # Prepare arguments for worker (remove 'errors' list from tuple)
         # Job format: (header, seq, j_path, out_dir, errs, prof)
         # New format: (header, seq, j_path, out_dir, prof)
-        worker_args = []
-        for job in jobs:
-            header, seq, j_path, out_dir, _, prof = job
-            worker_args.append((header, seq, j_path, out_dir, prof))
-            
-        # Submit all jobs
-        futures = {executor.submit(process_sequence_worker, args): args for args in worker_args}
+        worker_args = ((header, seq, j_path, out_dir, prof) for header, seq, j_path, out_dir, _, prof in jobs)
+        if alignment_files:
+            worker_args = itertools.chain(worker_args, (
+                (name, seq, jar_path, run_output_dir, dict(job_profile(profile, name, sequence_inputs), alignment=alignment))
+                for name, seq, alignment in iter_alignment_jobs(alignment_files, profile, errors, log)))
         
-        for future in concurrent.futures.as_completed(futures):
-            count += 1
-            # Retrieve original args if needed for debugging? No, result usually has info.
-            # But if exception occurs in worker BEFORE process_sequence logic, we might not get sequence_name.
-            # Actually process_sequence_worker catches top-level exception and returns name from header.
-            
+        # Submit a few jobs per worker at a time, topping up as they finish, so
+        # streamed alignments are never all held in memory
+        futures = {}
+        def submit_jobs():
+            for args in itertools.islice(worker_args, max(max_workers * JOBS_IN_FLIGHT_PER_WORKER - len(futures), 0)):
+                futures[executor.submit(process_sequence_worker, args)] = args
+        submit_jobs()
+        
+        def handle_future(future):
+            # process_sequence_worker catches top-level exceptions and returns the name from the header.
+            header, seq = futures.pop(future)[:2]
+            if future.cancelled():
+                seq_name = get_sequence_name(header)
+                summary_rows.append({'sequence_name': seq_name, 'status': 'cancelled', 'stage': 'queued', 'length': len(seq)})
+                log(f"  [CANCELLED] {seq_name} (not started)")
+                return
             try:
                 result, errs = future.result()
                 
@@ -1074,11 +3697,21 @@ def run_engine_programmatic(input_path, profile_path=None, output_dir="outputs",
                 elif errs:
                     seq_name = errs[0][0] # (name, msg)
                 
-                if result:
+                status = result.get('status', 'ok') if result else 'failed'
+                if status == 'ok' and stats_summary is not None:
+                    all_results.append(result)
+                    write_stats_row(stats_summary, result)
+                    log(f"  [OK] {seq_name} (MFE {result['mfe']:.2f})")
+                elif status == 'ok':
                     all_results.append(result)
-                    log(f"  [OK] {seq_name}")
+                    reused = result.get('stages_reused')
+                    log(f"  [OK] {seq_name} ({format_render_info(result.get('render'))}"
+                        + (f"; reused: {', '.join(reused)}" if reused else "") + ")")
+                elif result:
+                    log(f"  [{status.upper()}] {seq_name} (during {result.get('stage')})")
                 else:
                     log(f"  [FAIL] {seq_name}")
+                summary_rows.append(result or {'sequence_name': seq_name, 'status': 'failed', 'length': len(seq)})
                 
                 if errs:
                     errors.extend(errs)
@@ -1090,18 +3723,85 @@ def run_engine_programmatic(input_path, profile_path=None, output_dir="outputs",
                 log(f"  [CRITICAL ERROR] A worker process failed: {e}")
                 log(traceback.format_exc())
                 errors.append(("Unknown", str(e)))
+                summary_rows.append({'sequence_name': get_sequence_name(header), 'status': 'failed', 'length': len(seq)})
+        
+        while futures:
+            done, pending = concurrent.futures.wait(set(futures), timeout=CANCEL_POLL_INTERVAL, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                count += 1
+                handle_future(future)
+            
+            if not cancelled and should_stop():
+                cancelled = True
+                log(f"\nCancellation requested ({cancel_mode}): dropping queued sequences...")
+                if cancel_mode != 'drain':
+                    worker_cancel.set()
+                # Not-yet-started futures are cancelled and come back from wait() as done
+                for future in pending:
+                    future.cancel()
+            if not cancelled:
+                submit_jobs()
+        # Jobs never submitted because of the cancellation
+        for header, seq, *_ in worker_args:
+            summary_rows.append({'sequence_name': get_sequence_name(header), 'status': 'cancelled', 'stage': 'queued', 'length': len(seq)})
+            log(f"  [CANCELLED] {get_sequence_name(header)} (not started)")
 
+    if stats_summary is not None:
+        stats_summary.close()
+        log(f"Summary table: {os.path.join(run_output_dir, 'summary.tsv')}")
+    if backend != 'process':
+        # Thread/serial workers installed the primitives in this process: clear them
+        init_worker(None, None)
+    if should_stop():
+        cancelled = True
+    run_wall_time = time.perf_counter() - t_run
+    
     # Summary
     log("-" * 40)
     log(f"Results saved in: {run_output_dir}")
     log(f"Successfully processed: {len(all_results)}")
+    unfinished = [r for r in summary_rows if r.get('status') in ('timeout', 'cancelled')]
+    if unfinished:
+        log(f"Unfinished (timeout/cancelled): {len(unfinished)}")
     log(f"Errors: {len(errors)}")
     
     if errors:
         log("\nError Details:")
         for name, msg in errors:
             log(f"  {name}: {msg}")
-            
+    
+    summary = write_run_summary(run_output_dir, summary_rows, errors)
+    render_totals = summary.get('render_totals')
+    if render_totals:
+        peak = render_totals['peak_rss_kb_max']
+        log(f"Renders: {render_totals['count']} ({render_totals['failed']} failed), "
+            f"total {render_totals['wall_time_total']:.2f} s, slowest {render_totals['wall_time_max']:.2f} s, "
+            f"waiting for JVM slot {render_totals['queue_time_total']:.2f} s, cache hits {render_totals['cache_hits']}"
+            + (f", peak RSS {peak / 1024:.0f} MB" if peak else ""))
+    
+    telemetry_totals = summary.get('telemetry_totals')
+    if telemetry_totals:
+        peak = telemetry_totals['peak_rss_kb_max']
+        log(f"Workers: CPU {telemetry_totals['cpu_time_total']:.2f} s total"
+            + (f", peak RSS {peak / 1024:.0f} MB ({telemetry_totals['peak_rss_sequence']})" if peak else "")
+            + (f", Python peak {telemetry_totals['py_peak_kb_max'] / 1024:.1f} MB" if telemetry_totals['py_peak_kb_max'] is not None else ""))
+    
+    perf = write_performance_report(run_output_dir, summary_rows, run_wall_time)
+    if perf['stages']:
+        slowest = max(perf['stages'], key=lambda name: perf['stages'][name]['total'])
+        log(f"Throughput: {perf['sequences_per_s']:.2f} seq/s, {perf['nt_per_s']:.0f} nt/s in {run_wall_time:.2f} s; "
+            f"most time in '{slowest}' ({perf['stages'][slowest]['share'] * 100:.0f}% of stage time)")
+    if perf_settings.get('trace'):
+        trace_path = write_chrome_trace(run_output_dir, summary_rows, run_start_us, run_start_us + int(run_wall_time * 1e6))
+        log(f"Trace written to {trace_path} (open in https://ui.perfetto.dev or chrome://tracing)")
+    if perf_settings.get('profile_cpu'):
+        pstats_path = write_cpu_profile(run_output_dir, summary_rows, int(perf_settings.get('profile_top') or 40))
+        if pstats_path:
+            log(f"CPU profile written to {pstats_path} (top functions in cpu_profile.txt)")
+    
+    if cancelled:
+        log("Run cancelled.")
+        return False
     return True
 
 if __name__ == "__main__":
@@ -1109,11 +3809,15 @@ if __name__ == "__main__":
     multiprocessing.freeze_support() # Crucial for PyInstaller if we ever use ProcessPool
     
     parser = argparse.ArgumentParser(description="RNAfold Engine v5")
-    parser.add_argument("input_path", help="Input file (FASTA) or directory")
+    parser.add_argument("input_path", help="Input file (FASTA, Stockholm or ClustalW alignment) or directory")
     parser.add_argument("--profile", type=str, default=None, help="Path to JSON profile configuration")
-    parser.add_argument("--workers", type=int, default=None, help="Ignored in v5.1 (Sequential)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of parallel workers (0 = auto-detect). Overrides profile/config")
+    parser.add_argument("--executor", choices=EXECUTOR_BACKENDS, default=None, help="Executor backend (default: from config, 'auto')")
+    parser.add_argument("--trace", action="store_true", default=None, help="Write trace.json (Chrome trace-event timeline of worker stages)")
+    parser.add_argument("--profile-cpu", action="store_true", default=None, help="cProfile each worker task and write merged cpu_profile.pstats/.txt")
     parser.add_argument("--jar", type=str, default=None, help="Ignored in v5.1 (Auto-detected)")
     
     args = parser.parse_args()
     
-    run_engine_programmatic(args.input_path, profile_path=args.profile)
+    run_engine_programmatic(args.input_path, profile_path=args.profile, executor=args.executor, max_workers=args.workers,
+                            trace=args.trace, profile_cpu=args.profile_cpu)
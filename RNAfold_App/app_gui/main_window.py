@@ -8,6 +8,7 @@ from .ui_components import AccordionFrame
 from .tabs.input_tab import InputTab
 from .tabs.params_tab import ParamsTab
 from .tabs.constraints_tab import ConstraintsTab
+from .tabs.shape_tab import ShapeTab
 from .tabs.advanced_tabs import DanglesTab, EnergyTab, PerformanceTab
 from .tabs.visual_tab import VisualTab
 
@@ -66,29 +67,34 @@ class RNAfoldApp(ctk.CTk):
         self.acc_constraints.grid(row=2, column=0, sticky="ew", pady=2)
         self.constraints_ui = ConstraintsTab(self.acc_constraints.get_content_frame(), self)
 
-        # 2. Fold algorithms and basic options
+        # 2. SHAPE reactivity data
+        self.acc_shape = AccordionFrame(self.scroll_frame, "SHAPE Reactivity Data", start_collapsed=True)
+        self.acc_shape.grid(row=3, column=0, sticky="ew", pady=2)
+        self.shape_ui = ShapeTab(self.acc_shape.get_content_frame(), self)
+
+        # 3. Fold algorithms and basic options
         self.acc_algo = AccordionFrame(self.scroll_frame, "Fold algorithms and basic options", start_collapsed=True)
-        self.acc_algo.grid(row=3, column=0, sticky="ew", pady=2)
+        self.acc_algo.grid(row=4, column=0, sticky="ew", pady=2)
         self.params_ui = ParamsTab(self.acc_algo.get_content_frame(), self)
 
-        # 3. Dangling end options
+        # 4. Dangling end options
         self.acc_dangles = AccordionFrame(self.scroll_frame, "Dangling end options", start_collapsed=True)
-        self.acc_dangles.grid(row=4, column=0, sticky="ew", pady=2)
+        self.acc_dangles.grid(row=5, column=0, sticky="ew", pady=2)
         self.dangles_ui = DanglesTab(self.acc_dangles.get_content_frame(), self)
 
-        # 4. Energy Parameters
+        # 5. Energy Parameters
         self.acc_energy = AccordionFrame(self.scroll_frame, "Energy Parameters", start_collapsed=True)
-        self.acc_energy.grid(row=5, column=0, sticky="ew", pady=2)
+        self.acc_energy.grid(row=6, column=0, sticky="ew", pady=2)
         self.energy_ui = EnergyTab(self.acc_energy.get_content_frame(), self)
 
-        # 5. Visualization Options
+        # 6. Visualization Options
         self.acc_visual = AccordionFrame(self.scroll_frame, "Visualization Options (Colormap & Style)", start_collapsed=True)
-        self.acc_visual.grid(row=6, column=0, sticky="ew", pady=2)
+        self.acc_visual.grid(row=7, column=0, sticky="ew", pady=2)
         self.visual_tab = VisualTab(self.acc_visual.get_content_frame(), self)
 
-        # 6. Performance Options
+        # 7. Performance Options
         self.acc_perf = AccordionFrame(self.scroll_frame, "Performance Options (Parallel Processing)", start_collapsed=True)
-        self.acc_perf.grid(row=7, column=0, sticky="ew", pady=2)
+        self.acc_perf.grid(row=8, column=0, sticky="ew", pady=2)
         
         # Get default from loaded config
         def_workers = engine.CONFIG.get('performance', {}).get('max_workers', 10)
@@ -96,7 +102,7 @@ class RNAfoldApp(ctk.CTk):
 
         # --- C. Log Area ---
         self.log_frame = ctk.CTkFrame(self.scroll_frame)
-        self.log_frame.grid(row=8, column=0, sticky="ew", pady=20)
+        self.log_frame.grid(row=9, column=0, sticky="ew", pady=20)
         ctk.CTkLabel(self.log_frame, text="Execution Log:").pack(anchor="w", padx=5)
         self.log_box = ctk.CTkTextbox(self.log_frame, height=150, font=("Consolas", 11))
         self.log_box.pack(fill="x", padx=5, pady=5)
@@ -124,7 +130,22 @@ class RNAfoldApp(ctk.CTk):
             fg_color="green", 
             hover_color="darkgreen"
         )
-        self.run_btn.grid(row=0, column=1, sticky="e", padx=10, pady=10)
+        self.run_btn.grid(row=0, column=2, sticky="e", padx=10, pady=10)
+        
+        # Stop Button (enabled while a run is active)
+        self.cancel_event = threading.Event()
+        self.stop_btn = ctk.CTkButton(
+            self.footer_frame, 
+            text="STOP", 
+            command=self.stop_engine, 
+            width=100, 
+            height=50, 
+            font=("Arial", 16, "bold"), 
+            fg_color="firebrick", 
+            hover_color="darkred",
+            state="disabled"
+        )
+        self.stop_btn.grid(row=0, column=1, sticky="e", padx=10, pady=10)
 
     # ------------------
     # Helper Methods
@@ -144,6 +165,7 @@ class RNAfoldApp(ctk.CTk):
         profile = {
             "folding_params": folding_params,
             "constraints": self.constraints_ui.get_values(),
+            "shape_reactivity": self.shape_ui.get_shape_values(),
             "algorithms": self.params_ui.get_algorithms(),
         }
         profile.update(self.visual_tab.get_data())
@@ -188,22 +210,35 @@ class RNAfoldApp(ctk.CTk):
         # 3. Disable Button
         self.run_btn.configure(state="disabled", text="Running...")
         self.status_label.configure(text="Processing...", text_color="orange")
+        self.cancel_event = threading.Event()
+        self.stop_btn.configure(state="normal")
 
         # 4. Threaded Execution (Direct Call)
-        thread = threading.Thread(target=self.run_direct, args=(input_path, temp_profile_path))
+        thread = threading.Thread(target=self.run_direct, args=(input_path, temp_profile_path, self.cancel_event))
         thread.start()
 
-    def run_direct(self, input_path, profile_path):
+    def stop_engine(self):
+        """Request cancellation; the engine drops queued sequences and stops running ones."""
+        self.cancel_event.set()
+        self.stop_btn.configure(state="disabled")
+        self.status_label.configure(text="Cancelling...", text_color="orange")
+        self.log("Stop requested. Cancelling run...")
+
+    def run_direct(self, input_path, profile_path, cancel_event):
         try:
             # We pass self.log as the callback to route logs to GUI
             success = engine.run_engine_programmatic(
                 input_path=input_path,
                 profile_path=profile_path,
                 output_dir="outputs", # Or configurable
-                callback=self.log
+                callback=self.log,
+                cancel_event=cancel_event
             )
             
-            if success:
+            if cancel_event.is_set():
+                self.after(0, lambda: self.status_label.configure(text="Cancelled", text_color="orange"))
+                self.log("Run cancelled. Unfinished sequences are listed in run_summary.json.")
+            elif success:
                 self.after(0, lambda: self.status_label.configure(text="Completed Successfully", text_color="green"))
                 self.log("Done.")
             else:
@@ -218,3 +253,4 @@ class RNAfoldApp(ctk.CTk):
         
         finally:
             self.after(0, lambda: self.run_btn.configure(state="normal", text="RUN ENGINE"))
+            self.after(0, lambda: self.stop_btn.configure(state="disabled"))
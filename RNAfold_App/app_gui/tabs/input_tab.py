@@ -61,7 +61,7 @@ class InputTab:
         mode = self.input_mode.get()
         path = ""
         if mode == "file":
-            path = filedialog.askopenfilename(filetypes=[("FASTA files", "*.fasta *.fa *.txt"), ("All files", "*.*")])
+            path = filedialog.askopenfilename(filetypes=[("FASTA files", "*.fasta *.fa *.txt"), ("Alignments", "*.sto *.stk *.stockholm *.aln *.clustal"), ("All files", "*.*")])
         elif mode == "dir":
             path = filedialog.askdirectory()
         
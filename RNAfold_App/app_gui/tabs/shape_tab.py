@@ -38,7 +38,7 @@ class ShapeTab:
         ctk.CTkEntry(param_frame, textvariable=self.intercept_var, width=60).pack(side="left", padx=5)
 
     def browse_shape(self):
-        path = filedialog.askopenfilename(filetypes=[("Data files", "*.dat *.txt"), ("All files", "*.*")])
+        path = filedialog.askopenfilename(filetypes=[("Data files", "*.shape *.dat *.txt"), ("All files", "*.*")])
         if path:
             self.shape_file_path.set(path)
 
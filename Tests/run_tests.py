@@ -3,19 +3,35 @@ import os
 import subprocess
 import time
 
+# Batch and scan modes: (suite title, script), run in this order
+MODE_SUITES = [
+    ("Mutational Scan Verification", "verify_mutational_scan.py"),
+    ("Suboptimal Enumeration Verification", "verify_subopt.py"),
+    ("Two-tier Screening Verification", "verify_screening.py"),
+    ("Cofold Screen Verification", "verify_cofold.py"),
+    ("Bulk Fold API Verification", "verify_fold_many.py"),
+    ("Stats-only Mode Verification", "verify_stats_only.py"),
+    ("SHAPE Soft Constraints Verification", "verify_shape.py"),
+    ("Alignment Consensus Folding Verification", "verify_alignment.py"),
+    ("Top-K Ranking Verification", "verify_ranking.py"),
+    ("Constraint Scan Verification", "verify_constraint_scan.py"),
+    ("Per-Sequence Inputs Verification", "verify_sequence_inputs.py"),
+    ("Prefix Scan Verification", "verify_prefix_scan.py"),
+]
+
 def print_header(name):
     print("\n" + "="*60)
     print(f" TEST SUITE: {name}")
     print("="*60 + "\n")
 
-def run_script(script_name):
+def run_script(script_name, args=()):
     print(f"Running {script_name}...")
     try:
         # Run the script and capture output
         # Ensure we run it from the parent directory context if needed, or just let it adjust path
         # The existing scripts seem to expect to be run from the Tests/ dir or have paths set up carefully.
         # Let's simple subprocess call it.
-        result = subprocess.run([sys.executable, script_name], capture_output=True, text=True)
+        result = subprocess.run([sys.executable, script_name, *args], capture_output=True, text=True)
         
         if result.returncode == 0:
             print("STATUS: [ PASS ]")
@@ -48,12 +64,51 @@ def main():
         print("Visualization verification failed. Stopping.")
         sys.exit(1)
         
-    # 3. Full Integration Run
+    # 3. Timeouts & Cancellation
+    print_header("Timeout & Cancellation Verification")
+    if not run_script("verify_timeouts.py"):
+        print("Timeout verification failed. Stopping.")
+        sys.exit(1)
+        
+    # 4. Incremental Stage Reuse
+    print_header("Incremental Stage Reuse Verification")
+    if not run_script("verify_incremental.py"):
+        print("Incremental reuse verification failed. Stopping.")
+        sys.exit(1)
+        
+    # 5. Render Cache
+    print_header("Render Cache Verification")
+    if not run_script("verify_render_cache.py"):
+        print("Render cache verification failed. Stopping.")
+        sys.exit(1)
+        
+    # 6. Batch & Scan Modes
+    for title, script in MODE_SUITES:
+        print_header(title)
+        if not run_script(script):
+            print(f"{title} failed. Stopping.")
+            sys.exit(1)
+        
+    # 7. Full Integration Run
     print_header("Full Integration Test")
     if not run_script("verify_full_run.py"):
         print("Full integration test failed. Stopping.")
         sys.exit(1)
         
+    # 8. Performance Regression Gate (comparison logic always; the re-run only if a baseline was recorded on this machine)
+    print_header("Performance Regression Gate")
+    if not run_script("verify_benchmark_compare.py"):
+        print("Regression gate self-check failed. Stopping.")
+        sys.exit(1)
+    baseline = os.path.join("..", "Dev_Tools", "benchmark_baseline.json")
+    if not os.path.exists(baseline):
+        print(f"STATUS: [ SKIPPED ] baseline not found: {os.path.abspath(baseline)}")
+        print("Baselines are machine-specific and not committed. Record one before your change with:")
+        print("    python Dev_Tools/benchmark_compare.py record")
+    elif not run_script(os.path.join("..", "Dev_Tools", "benchmark_compare.py"), ["check", "--baseline", baseline]):
+        print("Significant performance regression against the baseline. Stopping.")
+        sys.exit(1)
+        
     print("\n" + "="*60)
     print(f" ALL TESTS PASSED in {time.time() - start_time:.2f} seconds")
     print("="*60)
@@ -0,0 +1,107 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNA
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+# Two alignments; the first is interleaved over two blocks and uses '.' gaps and T
+STOCKHOLM = """# STOCKHOLM 1.0
+#=GF ID famA
+s1  GGGGAAAC-CC
+s2  GGCGAAACGCC
+s3  GG-GAAACCCC
+
+s1  CAUAUGGGG
+s2  -AUAUGCGG
+s3  -AUA.GGGG
+#=GC SS_cons ....................
+//
+# STOCKHOLM 1.0
+t1  GCGCUUCGGCGCAAAAGCGC
+t2  GCCCTTCGGGGCAAAAGCGC
+//
+"""
+CLUSTAL = """CLUSTAL W (1.83) multiple sequence alignment
+
+a   GGGGAAACCCCAUAUGGGG
+b   GGCGAAACGCCAUAUGCGG
+    ** ******* *****
+
+a   AAAC
+b   AAAC
+"""
+FAM_A = ['GGGGAAAC-CCCAUAUGGGG', 'GGCGAAACGCC-AUAUGCGG', 'GG-GAAACCCC-AUA-GGGG']
+
+def write(work_dir, name, text):
+    path = os.path.join(work_dir, name)
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+def test_parsers():
+    print("\n--- Testing Alignment Parsers ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_alignment_")
+    try:
+        alignments = list(engine.iter_alignments(write(work_dir, "fam.sto", STOCKHOLM)))
+        check("Stockholm alignments", ['famA', 'fam_2'], [a[0] for a in alignments])
+        check("Interleaved rows concatenated", (['s1', 's2', 's3'], FAM_A), alignments[0][1:])
+        check("Second alignment (T -> U)", ['GCGCUUCGGCGCAAAAGCGC', 'GCCCUUCGGGGCAAAAGCGC'], alignments[1][2])
+        clustal = list(engine.iter_alignments(write(work_dir, "fam2.aln", CLUSTAL)))
+        check("Clustal", [('fam2', ['a', 'b'], ['GGGGAAACCCCAUAUGGGGAAAC', 'GGCGAAACGCCAUAUGCGGAAAC'])], clustal)
+        try:
+            list(engine.iter_alignments(write(work_dir, "bad.sto", "x  ACGU\ny  ACG\n//\n")))
+            check("Ragged alignment rejected", True, False)
+        except ValueError:
+            check("Ragged alignment rejected", True, True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_consensus_fold():
+    print("\n--- Testing Consensus Fold against RNAlib ---")
+    md = engine.configure_model_details({})
+    fc = RNA.fold_compound(FAM_A, md)
+    structure, mfe = fc.mfe()
+    consensus = engine.consensus_sequence(FAM_A, md)
+    check("Consensus length", len(FAM_A[0]), len(consensus))
+    check("Consensus bases", RNA.aln_consensus_sequence(FAM_A, md).replace('_', 'N').replace('-', 'N'), consensus)
+    engine_structure, plist, stats = engine.fold_sequence(consensus, {'alignment': {'names': ['s1', 's2', 's3'], 'sequences': FAM_A}})
+    check("Consensus structure", structure, engine_structure)
+    check("Consensus MFE", round(mfe, 4), round(stats['mfe'], 4))
+    check("Pair probabilities", True, len(plist) > 0)
+
+def test_run_warns_about_shape():
+    print("\n--- Testing Alignment Run ---")
+    engine.CONFIG.setdefault('output', {})['structure'] = 'flat'
+    work_dir = tempfile.mkdtemp(prefix="verify_alignment_")
+    try:
+        path = write(work_dir, "fam.sto", STOCKHOLM)
+        shape = write(work_dir, "react.shape", "1 G 0.5\n")
+        profile_path = write(work_dir, "profile.json", json.dumps(
+            {'pipeline': {'render': False}, 'shape_reactivity': {'file': shape}, 'performance': {'incremental': False}}))
+        log = []
+        ok = engine.run_engine_programmatic(path, profile_path, output_dir=os.path.join(work_dir, "out"),
+                                            callback=log.append, executor='serial')
+        check("Run completed", True, ok)
+        check("SHAPE warning logged", True, any("SHAPE data (shape_reactivity) is not used for alignments" in line for line in log))
+        check("Folder per alignment", True, all(os.path.isdir(os.path.join(work_dir, "out", name)) for name in ('famA', 'fam_2')))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_parsers()
+    test_consensus_fold()
+    test_run_warns_about_shape()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
@@ -0,0 +1,64 @@
+import sys
+import os
+import json
+import shutil
+import subprocess
+import tempfile
+DEV_TOOLS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Dev_Tools")
+sys.path.append(DEV_TOOLS)
+import benchmark_compare
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+def result_doc(medians, iqr=0.0001, suite='microbench'):
+    """Synthetic microbench document: {function: median seconds}, min = median."""
+    return {'benchmark': suite, 'settings': {},
+            'results': [{'function': name, 'length': 100, 'median': median, 'iqr': iqr, 'min': median}
+                        for name, median in medians.items()]}
+
+def test_thresholds():
+    print("\n--- Testing Significance Thresholds ---")
+    baseline = result_doc({'steady': 0.010, 'slower': 0.010, 'faster': 0.010, 'tiny': 0.0001, 'noisy': 0.010})
+    current = result_doc({'steady': 0.011, 'slower': 0.020, 'faster': 0.005, 'tiny': 0.0003, 'noisy': 0.020})
+    current['results'][4]['iqr'] = 0.02  # Change is within 1.5 IQRs of the noisy run
+    statuses = {row['key'][0]: row['status'] for row in benchmark_compare.compare_results(baseline, current)}
+    check("10% change is ok", 'ok', statuses['steady'])
+    check("Doubling is slower", 'slower', statuses['slower'])
+    check("Halving is faster", 'faster', statuses['faster'])
+    check("Below absolute floor is ok", 'ok', statuses['tiny'])
+    check("Within noise band is ok", 'ok', statuses['noisy'])
+    missing = benchmark_compare.compare_results(baseline, result_doc({'steady': 0.010}))
+    check("Missing rows reported", 4, sum(1 for row in missing if row['status'] == 'missing'))
+
+def test_exit_codes():
+    print("\n--- Testing Exit Codes ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_bench_compare_")
+    try:
+        paths = {}
+        for name, doc in (('base', result_doc({'f': 0.010})), ('same', result_doc({'f': 0.0105})),
+                          ('slow', result_doc({'f': 0.030})), ('other', result_doc({'f': 0.010}, suite='scaling'))):
+            paths[name] = os.path.join(work_dir, f"{name}.json")
+            with open(paths[name], 'w') as f:
+                json.dump(doc, f)
+        script = os.path.join(DEV_TOOLS, "benchmark_compare.py")
+        def exit_code(current):
+            return subprocess.run([sys.executable, script, "compare", paths['base'], paths[current]],
+                                  capture_output=True, text=True).returncode
+        check("No slowdown exits 0", 0, exit_code('same'))
+        check("Slowdown exits 1", 1, exit_code('slow'))
+        check("Suite mismatch exits 2", 2, exit_code('other'))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_thresholds()
+    test_exit_codes()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
@@ -0,0 +1,73 @@
+import sys
+import os
+import csv
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNA
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+SEQUENCES = [("a", "GGGGAAACCCCAUAUGCGC"), ("b", "GCGCAUAUGGGGUUUCCCC"), ("c", "AUAUAUAUAGGCUAGCC")]
+
+def ensemble_energy(seq, md):
+    fc = RNA.fold_compound(seq, md)
+    _, mfe = fc.mfe()
+    fc.exp_params_rescale(mfe)
+    return fc.pf()[1]
+
+def run_screen(work_dir):
+    settings = dict(engine.DEFAULT_COFOLD_SETTINGS, enabled=True, max_binding_energy=1000.0, tile_size=2, monomer_chunk_size=2)
+    n_hits, errors = engine.run_cofold_screen(SEQUENCES, None, {}, settings, 'serial', 1, work_dir, log=lambda msg: None)
+    check("Errors", [], errors)
+    with open(os.path.join(work_dir, "cofold_hits.tsv"), 'r') as f:
+        rows = list(csv.DictReader(f, delimiter='\t'))
+    check("Rows written", n_hits, len(rows))
+    return rows
+
+def test_all_vs_all_pairs():
+    print("\n--- Testing All-vs-all Pair Count ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_cofold_")
+    try:
+        rows = run_screen(work_dir)
+        n = len(SEQUENCES)
+        check("Upper triangle incl. self pairs", n * (n + 1) // 2, len(rows))
+        check("Each unordered pair once", n * (n + 1) // 2, len({frozenset((r['query'], r['target'])) for r in rows}))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_pair_against_rnalib():
+    print("\n--- Testing a Pair against RNAlib ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_cofold_")
+    try:
+        row = next(r for r in run_screen(work_dir) if {r['query'], r['target']} == {'a', 'b'})
+        query_seq, target_seq = dict(SEQUENCES)[row['query']], dict(SEQUENCES)[row['target']]
+        md = engine.configure_model_details({})
+        fc = RNA.fold_compound(f"{query_seq}&{target_seq}", md)
+        structure, dimer_mfe = fc.mfe()
+        fc.exp_params_rescale(dimer_mfe)
+        dimer_g = fc.pf()[1]
+        query_g, target_g = ensemble_energy(query_seq, md), ensemble_energy(target_seq, md)
+        check("Dimer ensemble energy", True, abs(float(row['dimer_ensemble_energy']) - dimer_g) < 1e-3)
+        check("binding_energy = G(AB) - G(A) - G(B)", True,
+              abs(float(row['binding_energy']) - (dimer_g - query_g - target_g)) < 1e-3)
+        check("Stored parts add up", True, abs(float(row['binding_energy']) - (float(row['dimer_ensemble_energy'])
+              - float(row['query_ensemble_energy']) - float(row['target_ensemble_energy']))) < 1e-3)
+        cut = len(query_seq)
+        check("&-split structure", f"{structure[:cut]}&{structure[cut:]}", row['structure'])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_all_vs_all_pairs()
+    test_pair_against_rnalib()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
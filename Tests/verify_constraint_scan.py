@@ -0,0 +1,76 @@
+import sys
+import os
+import io
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNA
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+SEQUENCE = "GGGAAAUCCCGCGCUUCGGCGCAUAUGGCCAAAGGCC"
+VARIANTS = [
+    ('closed', "(((....)))..........................."),
+    ('open5', "xxxxxxxxxx..........................."),
+    ('hairpin', "..........((((....))))..............."),
+    ('pairs_open', "..............................|||||||"),
+    ('ends', "(...................................)"),
+]
+
+def direct_fold(constraint):
+    """Fresh fold compound per constraint, as RNAfold -C would fold it."""
+    md = engine.configure_model_details({})
+    fc = RNA.fold_compound(SEQUENCE, md)
+    if constraint:
+        fc.hc_add_from_db(constraint, RNA.CONSTRAINT_DB_DEFAULT)
+    return fc.mfe()
+
+def test_scan():
+    print("\n--- Testing Constraint Scan against Direct Constrained Folds ---")
+    reference_structure, reference_mfe = direct_fold('')
+    for workers in (1, 3):
+        out = io.StringIO()
+        rows, errors = engine.run_constraint_scan(">seqA", SEQUENCE, VARIANTS + [('short', "((..))")], {},
+                                                  'thread' if workers > 1 else 'serial', workers, out)
+        check(f"[{workers} workers] Variant order", [engine.UNCONSTRAINED_VARIANT] + [name for name, _ in VARIANTS] + ['short'],
+              [row['variant'] for row in rows])
+        check(f"[{workers} workers] Unconstrained MFE", round(reference_mfe, 4), round(rows[0]['mfe'], 4))
+        for row, (name, constraint) in zip(rows[1:], VARIANTS):
+            structure, mfe = direct_fold(constraint)
+            check(f"[{workers} workers] {name} structure", structure, row['structure'])
+            check(f"[{workers} workers] {name} delta_mfe", round(mfe - reference_mfe, 4), round(row['delta_mfe'], 4))
+            check(f"[{workers} workers] {name} bp_distance", RNA.bp_distance(reference_structure, structure), row['bp_distance'])
+        check(f"[{workers} workers] Length mismatch reported", ["seqA [short]"], [label for label, _ in errors])
+        lines = out.getvalue().splitlines()
+        check(f"[{workers} workers] TSV rows (failed variant skipped)", len(VARIANTS) + 1, len(lines))
+        check(f"[{workers} workers] TSV columns", len(engine.CONSTRAINT_SCAN_COLUMNS), len(lines[1].split('\t')))
+
+def test_load_variants():
+    print("\n--- Testing Scan Constraint Sources ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_constraint_scan_")
+    try:
+        path = os.path.join(work_dir, "variants.txt")
+        with open(path, 'w') as f:
+            f.write("# scan variants\n>from_file\n((....))\n\n.x......\n")
+        check("Constraint list", [('from_file', "((....))"), (None, ".x......")], engine.read_constraint_list(path))
+        profile = {'constraints': {'scan': [{'name': 'inline', 'constraint': "(....)."}, "x......"], 'scan_file': path}}
+        check("Named and numbered variants",
+              [('inline', "(....)."), ('c2', "x......"), ('from_file', "((....))"), ('c4', ".x......")],
+              engine.load_scan_constraints(profile))
+        check("No scan configured", [], engine.load_scan_constraints({'constraints': {'string': "((..))"}}))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_scan()
+    test_load_variants()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
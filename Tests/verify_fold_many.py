@@ -0,0 +1,47 @@
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+RECORDS = [("fm1", "GGGGAAACCCCAUAUGGGGAAACCCCA"),
+           ("fm2", "AUGCUAGCUAGGCUAACGAUCGAUGCAUCGGAUCGAUCGAAU"),
+           ("fm3", "GCGCUUCGGCGCAAAAUUUUGGGGAAACCCC")]
+
+def pipeline_fold(seq):
+    """Structure, stats and per-base Pi as the per-sequence pipeline computes them."""
+    structure, plist, stats = engine.fold_sequence(seq, {})
+    return structure, stats, engine.compute_base_pairing_probabilities(seq, plist)
+
+def test_matches_fold_sequence():
+    print("\n--- Testing fold_many against fold_sequence ---")
+    for cutoff in (engine.FOLD_MANY_BPP_CUTOFF, 0.0):
+        results = {r['sequence_name']: r for r in engine.fold_many(RECORDS, {}, max_workers=2, executor='serial', bpp_cutoff=cutoff)}
+        check(f"All records folded (cutoff {cutoff:g})", sorted(name for name, _ in RECORDS), sorted(results))
+        for name, seq in RECORDS:
+            structure, stats, pi = pipeline_fold(seq)
+            result = results[name]
+            check(f"{name} structure", structure, result['structure'])
+            check(f"{name} MFE", round(stats['mfe'], 4), round(result['stats']['mfe'], 4))
+            check(f"{name} ensemble energy", round(stats['ensemble_energy'], 4), round(result['stats']['ensemble_energy'], 4))
+            shortfall = pi - result['pi']
+            # Truncation only removes pairs: each base loses at most cutoff per dropped partner
+            bound = cutoff * len(seq) + 1e-6
+            check(f"{name} Pi within truncation bound (cutoff {cutoff:g})", True,
+                  bool(np.all(shortfall > -1e-6) and np.all(shortfall <= bound)))
+            kept = result['bpp_p']
+            check(f"{name} sparse pairs above cutoff", True, bool(np.all(kept >= cutoff)))
+
+if __name__ == "__main__":
+    test_matches_fold_sequence()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
@@ -0,0 +1,84 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "RNAfold_App"))
+import RNAfold_to_RNArtist_engine as engine
+
+FAKE_RENDERER = os.path.join(ROOT, "Dev_Tools", "fake_rnartist.py")
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+def run(work_dir, fasta, profile):
+    """One engine run into work_dir/out. Returns {sequence name: sorted stages_reused}."""
+    profile_path = os.path.join(work_dir, "profile.json")
+    with open(profile_path, 'w') as f:
+        json.dump(profile, f)
+    out_dir = os.path.join(work_dir, "out")
+    ok = engine.run_engine_programmatic(fasta, profile_path, output_dir=out_dir, callback=lambda msg: None, executor='serial')
+    check("Run completed", True, ok)
+    with open(os.path.join(out_dir, "run_summary.json"), 'r') as f:
+        rows = json.load(f)['sequences']
+    return {row['sequence_name']: sorted(row.get('stages_reused') or []) for row in rows}
+
+def test_stage_reuse():
+    print("\n--- Testing Incremental Stage Reuse ---")
+    engine.CONFIG.setdefault('output', {})['structure'] = 'flat'
+    work_dir = tempfile.mkdtemp(prefix="verify_incremental_")
+    try:
+        fasta = os.path.join(work_dir, "input.fasta")
+        with open(fasta, 'w') as f:
+            f.write(">inc1\nGGGGAAACCCCAUAUGGGGAAACCCCAUAGCGCUUCGGCGCA\n>inc2\nAUGCUAGCUAGGCUAACGAUCGAUGCAUCGGAUCGAUCGAAU\n")
+        base = {
+            'rnartist': {'command': [sys.executable, FAKE_RENDERER, "--latency", "0"], 'cache': False},
+            'performance': {'incremental': True, 'max_workers': 1},
+            'visualization': {'colormap': 'coolwarm'},
+            'folding_params': {'temperature': 37.0},
+        }
+        first = run(work_dir, fasta, base)
+        check("First run reuses nothing", {'inc1': [], 'inc2': []}, first)
+
+        again = run(work_dir, fasta, base)
+        check("Unchanged rerun reuses all stages", {name: ['coloring', 'fold', 'render'] for name in first}, again)
+
+        recolored = run(work_dir, fasta, dict(base, visualization={'colormap': 'viridis'}))
+        check("Colormap change reuses only fold", {name: ['fold'] for name in first}, recolored)
+
+        warmer = run(work_dir, fasta, dict(base, visualization={'colormap': 'viridis'}, folding_params={'temperature': 50.0}))
+        check("Temperature change reruns everything", {name: [] for name in first}, warmer)
+
+        fp = engine.stage_fingerprint('fold', "ACGU", {'temperature': 37.0})
+        check("Fingerprint is stable", fp, engine.stage_fingerprint('fold', "ACGU", {'temperature': 37.0}))
+        check("Fingerprint tracks parameters", False, fp == engine.stage_fingerprint('fold', "ACGU", {'temperature': 37.5}))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_fold_state_roundtrip():
+    print("\n--- Testing Fold State Round Trip ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_fold_state_")
+    try:
+        seq = "GGGGAAACCCCAUAUGGGGAAACCCCA"
+        structure, plist, stats = engine.fold_sequence(seq, {})
+        engine.save_fold_state(work_dir, structure, plist, stats)
+        loaded_structure, loaded_plist, loaded_stats = engine.load_fold_state(work_dir)
+        check("Structure", structure, loaded_structure)
+        check("MFE", round(stats['mfe'], 4), round(loaded_stats['mfe'], 4))
+        pi = engine.compute_base_pairing_probabilities(seq, plist)
+        loaded_pi = engine.compute_base_pairing_probabilities(seq, loaded_plist)
+        check("Pi values match", True, bool(abs(pi - loaded_pi).max() < 1e-6))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_stage_reuse()
+    test_fold_state_roundtrip()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
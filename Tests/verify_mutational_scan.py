@@ -0,0 +1,62 @@
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNA
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+def direct_fold(seq):
+    """MFE, ensemble energy and per-base Pi straight from RNAlib (engine model details)."""
+    fc = RNA.fold_compound(seq, engine.configure_model_details({}))
+    _, mfe = fc.mfe()
+    fc.exp_params_rescale(mfe)
+    _, ensemble_energy = fc.pf()
+    bpp = np.array(fc.bpp())
+    return mfe, ensemble_energy, (bpp.sum(axis=0) + bpp.sum(axis=1))[1:]
+
+def test_scan_matches_direct_folds():
+    print("\n--- Testing Mutational Scan against RNAlib ---")
+    seq = "GGGAAACCCAUAGCGCUUCGGCGC"
+    work_dir = tempfile.mkdtemp(prefix="verify_mutscan_")
+    try:
+        settings = dict(engine.DEFAULT_MUTATIONAL_SCAN_SETTINGS, enabled=True)
+        selected, errors = engine.run_mutational_scan([("wt", seq)], {}, settings, 'serial', 1, work_dir, log=lambda msg: None)
+        check("Errors", [], errors)
+        check("No variants selected without threshold", [], selected)
+        scan = np.load(os.path.join(work_dir, "wt_mutscan.npz"))
+        check("Variant count", 3 * len(seq), len(scan['position']))
+        check("No dense matrix stored", True, scan['delta_pi'].ndim == 1)
+
+        wt_mfe, wt_ensemble, wt_pi = direct_fold(seq)
+        for index in (0, 17, 40, 3 * len(seq) - 1):
+            position, alt = int(scan['position'][index]), str(scan['alt'][index])
+            mfe, ensemble, pi = direct_fold(seq[:position - 1] + alt + seq[position:])
+            label = f"{scan['ref'][index]}{position}{alt}"
+            check(f"{label} delta MFE", round(mfe - wt_mfe, 2), round(float(scan['delta_mfe'][index]), 2))
+            check(f"{label} delta ensemble", True, abs((ensemble - wt_ensemble) - scan['delta_ensemble'][index]) < 1e-3)
+            check(f"{label} max delta Pi", True, abs(np.abs(pi - wt_pi).max() - scan['max_delta_pi'][index]) < 1e-3)
+
+        kept = scan['delta_pi']
+        check("Sparse entries above delta_pi_min", True, bool(np.all(np.abs(kept) >= settings['delta_pi_min'])))
+        largest = np.zeros(len(scan['position']), dtype=np.float32)
+        np.maximum.at(largest, scan['delta_pi_variant'], np.abs(kept))
+        check("Sparse maxima match max_delta_pi", True,
+              bool(np.allclose(largest, np.where(scan['max_delta_pi'] >= settings['delta_pi_min'], scan['max_delta_pi'], 0))))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_scan_matches_direct_folds()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
@@ -0,0 +1,78 @@
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNA
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+SEQUENCES = [
+    ("seqA transcript", "GGGAAAUCCCGCGCUUCGGCGCAUAUGGCCAAAGGCCAUAUGGGGAAACCCC"),
+    ("seqB", "GCGCUUCGGCGCAAAAGCGCAAGCGC"),
+]
+
+def direct_fold(seq):
+    """MFE structure, MFE and ensemble free energy of a fresh RNAlib fold."""
+    fc = RNA.fold_compound(seq, engine.configure_model_details({}))
+    structure, mfe = fc.mfe()
+    fc.exp_params_rescale(mfe)
+    _, ensemble_energy = fc.pf()
+    return structure, round(mfe, 2), round(ensemble_energy, 2)
+
+def test_prefix_lengths():
+    print("\n--- Testing Prefix Lengths ---")
+    check("Step 1", [3, 4, 5, 6], engine.prefix_lengths(6, 1, 3))
+    check("Full length appended", [10, 17, 24, 26], engine.prefix_lengths(26, 7, 10))
+    check("Full length on the grid", [10, 18, 26], engine.prefix_lengths(26, 8, 10))
+    check("min_length above length", [5], engine.prefix_lengths(5, 2, 10))
+    check("Non-positive step and min_length", [1, 2, 3], engine.prefix_lengths(3, 0, 0))
+
+def test_scan():
+    print("\n--- Testing Prefix Scan against Direct Folds ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_prefix_scan_")
+    try:
+        jobs = [(header, seq, None, None, [], {}) for header, seq in SEQUENCES]
+        settings = dict(engine.DEFAULT_PREFIX_SCAN_SETTINGS, enabled=True, step=7, min_length=10, render_every=2, chunk_size=3)
+        log = []
+        selected, errors = engine.run_prefix_scan(jobs, {}, settings, 'thread', 2, work_dir, log=log.append)
+        check("No errors", [], errors)
+        for header, seq in SEQUENCES:
+            name = engine.get_sequence_name(header)
+            lengths = engine.prefix_lengths(len(seq), 7, 10)
+            data = np.load(os.path.join(work_dir, f"{name}_prefixes.npz"))
+            check(f"{name} npz arrays", sorted(engine.PREFIX_SCAN_COLUMNS), sorted(data.files))
+            check(f"{name} lengths", lengths, data['length'].tolist())
+            check(f"{name} structure dtype", f"S{len(seq)}", data['structure'].dtype.str[1:])
+            expected = [direct_fold(seq[:length]) for length in lengths]
+            check(f"{name} structures", [s for s, _, _ in expected], [s.decode('ascii') for s in data['structure']])
+            check(f"{name} MFE per prefix", [m for _, m, _ in expected], [round(float(v), 2) for v in data['mfe']])
+            check(f"{name} ensemble energy per prefix", [e for _, _, e in expected],
+                  [round(float(v), 2) for v in data['ensemble_energy']])
+            with open(os.path.join(work_dir, f"{name}_prefixes.tsv")) as f:
+                rows = [line.rstrip('\n').split('\t') for line in f]
+            check(f"{name} TSV", (list(engine.PREFIX_SCAN_COLUMNS), [str(length) for length in lengths]),
+                  (rows[0], [row[0] for row in rows[1:]]))
+        # Frames 0, 2, ... plus the last one (the full sequence), with the job's remaining fields
+        check("Frames for rendering", ['seqA_1-10', 'seqA_1-24', 'seqA_1-38', 'seqA_1-52', 'seqB_1-10', 'seqB_1-24', 'seqB_1-26'],
+              [job[0] for job in selected])
+        check("Frame sequence is the prefix", SEQUENCES[0][1][:24], selected[1][1])
+        check("Frame job fields", (None, None, [], {}), selected[0][2:])
+        check("Log lines", 2, len(log))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_prefix_lengths()
+    test_scan()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
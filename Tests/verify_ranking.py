@@ -0,0 +1,84 @@
+import sys
+import os
+import random
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNA
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+def make_jobs():
+    rng = random.Random(7)
+    seqs = [''.join(rng.choice('ACGU') for _ in range(rng.randint(30, 60))) for _ in range(12)]
+    seqs.append(seqs[4])  # Tie with an earlier sequence: the earlier one ranks first
+    return [(f">seq{i}", seq, None, None, [], {}) for i, seq in enumerate(seqs)]
+
+def brute_force(jobs, key, reverse):
+    """Full sort of direct RNAlib values; ties keep input order."""
+    md = engine.configure_model_details({})
+    values = []
+    for index, job in enumerate(jobs):
+        fc = RNA.fold_compound(job[1], md)
+        structure, mfe = fc.mfe()
+        fc.exp_params_rescale(mfe)
+        fc.pf()
+        values.append((index, round({'mfe': mfe, 'frequency': fc.pr_structure(structure)}[key], 4)))
+    return sorted(values, key=lambda v: -v[1] if reverse else v[1])
+
+def run(jobs, work_dir, **ranking):
+    settings = dict(engine.DEFAULT_RANKING_SETTINGS, enabled=True, **ranking)
+    log = []
+    winners, errors = engine.run_ranking(jobs, {}, settings, 'serial', 1, work_dir, log=log.append)
+    with open(os.path.join(work_dir, "ranking.tsv")) as f:
+        rows = [line.rstrip('\n').split('\t') for line in f]
+    return winners, errors, rows, log
+
+def test_top_k():
+    print("\n--- Testing Top-K Ranking against a Full Sort ---")
+    jobs = make_jobs()
+    work_dir = tempfile.mkdtemp(prefix="verify_ranking_")
+    try:
+        expected = brute_force(jobs, 'mfe', False)[:5]
+        winners, errors, rows, _ = run(jobs, work_dir, top_k=5, metric='mfe', chunk_size=3)
+        check("Winners by MFE (lowest first)", [jobs[i][0] for i, _ in expected], [job[0] for job in winners])
+        check("TSV header", list(engine.RANKING_COLUMNS), rows[0])
+        check("TSV ranks", ['1', '2', '3', '4', '5'], [row[0] for row in rows[1:]])
+        mfe_col = engine.RANKING_COLUMNS.index('mfe')
+        check("TSV MFE values", [v for _, v in expected], [round(float(row[mfe_col]), 4) for row in rows[1:]])
+        check("No errors", [], errors)
+
+        expected = brute_force(jobs, 'frequency', True)[:3]
+        winners, _, _, log = run(jobs, work_dir, top_k=3, metric='frequency', chunk_size=4)
+        check("Winners by frequency (highest first)", [jobs[i][0] for i, _ in expected], [job[0] for job in winners])
+        check("Log line", True, "kept top 3 of 13 sequences by frequency (highest first)" in log[-1])
+
+        winners, _, _, _ = run(jobs, work_dir, top_k=100, metric='mfe', descending=True)
+        check("top_k above library size keeps all", len(jobs), len(winners))
+        check("descending override (highest MFE first)", jobs[brute_force(jobs, 'mfe', True)[0][0]][0], winners[0][0])
+        check("Tie: earlier input first", True, winners.index(jobs[4]) < winners.index(jobs[12]))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_settings():
+    print("\n--- Testing Ranking Settings ---")
+    check("Profile overrides", 7, engine.get_ranking_settings({'ranking': {'top_k': 7}})['top_k'])
+    try:
+        engine.get_ranking_settings({'ranking': {'metric': 'size'}})
+        check("Unknown metric rejected", True, False)
+    except ValueError:
+        check("Unknown metric rejected", True, True)
+
+if __name__ == "__main__":
+    test_top_k()
+    test_settings()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
@@ -0,0 +1,62 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "RNAfold_App"))
+import RNAfold_to_RNArtist_engine as engine
+
+FAKE_RENDERER = os.path.join(ROOT, "Dev_Tools", "fake_rnartist.py")
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+def test_duplicate_sequence_hits_cache():
+    print("\n--- Testing Render Cache on Duplicate Sequences ---")
+    engine.CONFIG.setdefault('output', {})['structure'] = 'flat'
+    work_dir = tempfile.mkdtemp(prefix="verify_render_cache_")
+    try:
+        seq = "GGGGAAACCCCAUAUGGGGAAACCCCAUAGCGCUUCGGCGCA"
+        fasta = os.path.join(work_dir, "input.fasta")
+        with open(fasta, 'w') as f:
+            f.write(f">dup\n{seq}\n>dup_copy\n{seq}\n")
+        profile_path = os.path.join(work_dir, "profile.json")
+        with open(profile_path, 'w') as f:
+            json.dump({'rnartist': {'command': [sys.executable, FAKE_RENDERER, "--latency", "0"], 'cache': True,
+                                    'cache_dir': os.path.join(work_dir, "cache")},
+                       'performance': {'incremental': False, 'max_workers': 1}}, f)
+        out_dir = os.path.join(work_dir, "out")
+        # A stale image from an earlier run must not be taken for a render output
+        os.makedirs(os.path.join(out_dir, "dup"))
+        with open(os.path.join(out_dir, "dup", "leftover.svg"), 'w') as f:
+            f.write("<svg/>")
+        log = []
+        ok = engine.run_engine_programmatic(fasta, profile_path, output_dir=out_dir, callback=log.append, executor='serial')
+        check("Run completed", True, ok)
+        check("Second record reports render cached", True, any("dup_copy (render cached" in line for line in log))
+        with open(os.path.join(out_dir, "run_summary.json"), 'r') as f:
+            rows = {row['sequence_name']: row for row in json.load(f)['sequences']}
+        check("First record outputs", ['dup.png', 'dup.svg'], sorted(rows['dup']['render']['outputs']))
+        check("Cached outputs renamed", ['dup_copy.png', 'dup_copy.svg'], sorted(rows['dup_copy']['render']['outputs']))
+        check("Cached files exist", True, all(os.path.exists(os.path.join(out_dir, "dup_copy", name))
+                                              for name in rows['dup_copy']['render']['outputs']))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_cached_output_names():
+    print("\n--- Testing Cached Output Names ---")
+    check("Prefix replaced", "seq_2.svg", engine._cached_output_name("seq.svg", "seq", "seq_2"))
+    check("Name inside suffix kept", "b_a.svg", engine._cached_output_name("a_a.svg", "a", "b"))
+    check("Foreign name kept", "other.png", engine._cached_output_name("other.png", "a", "b"))
+
+if __name__ == "__main__":
+    test_duplicate_sequence_hits_cache()
+    test_cached_output_names()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
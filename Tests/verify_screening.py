@@ -0,0 +1,50 @@
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+HAIRPIN = "GGGGGCAAAGCCCCCAUAUAUAUAU"
+UNSTRUCTURED = "AAAAAAAAAAAAAAAAAAAAAAAAA"
+
+def test_profile_constraint_applies():
+    print("\n--- Testing Screening with a Profile Constraint ---")
+    constrained = {'constraints': {'string': 'xxxxx' + '.' * (len(HAIRPIN) - 5), 'enforce': True}}
+    settings = dict(engine.DEFAULT_SCREENING_SETTINGS, enabled=True, max_mfe=-3.0)
+    for label, profile in (("unconstrained", {}), ("constrained", constrained)):
+        structure, mfe, _, _ = engine.screen_sequence(HAIRPIN, profile, settings)
+        full_structure, _, full_stats = engine.fold_sequence(HAIRPIN, profile)
+        check(f"Tier-1 MFE equals full fold ({label})", round(full_stats['mfe'], 2), round(mfe, 2))
+        check(f"Tier-1 structure equals full fold ({label})", full_structure, structure)
+    check("Hit without constraint", True, engine.screen_sequence(HAIRPIN, {}, settings)[3])
+    check("No hit with constraint", False, engine.screen_sequence(HAIRPIN, constrained, settings)[3])
+
+def test_run_screening_keeps_hits():
+    print("\n--- Testing run_screening ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_screening_")
+    try:
+        jobs = [("flat1", UNSTRUCTURED), ("hp1", HAIRPIN), ("flat2", UNSTRUCTURED), ("hp2", HAIRPIN)]
+        settings = dict(engine.DEFAULT_SCREENING_SETTINGS, enabled=True, max_mfe=-3.0, motif="(((((", chunk_size=1)
+        hits, errors = engine.run_screening(jobs, {}, settings, 'serial', 1, work_dir, log=lambda msg: None)
+        check("Errors", [], errors)
+        check("Hits in input order", ["hp1", "hp2"], [job[0] for job in hits])
+        with open(os.path.join(work_dir, "screening.tsv"), 'r') as f:
+            check("One table row per sequence", len(jobs) + 1, len(f.readlines()))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_profile_constraint_applies()
+    test_run_screening_keeps_hits()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
@@ -0,0 +1,110 @@
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNA
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+SEQUENCES = {
+    'seqA': "GGGAAAUCCCGCGCUUCGGCGCAUAUGGCCAAAGGCC",
+    'seqB': "GGGGAAACCCCAUAUGGGGAAACCCCAUAGCGCUUCGGCGCA",
+    'seqC': "GCGCUUCGGCGCAAAAGCGCAAGCGC",
+}
+CONSTRAINTS = {
+    'seqA': "xxxxxxxxxx...........................",
+    'seqB': "((((...))))...............................",
+}
+BATCH_CONSTRAINT = "." * len(SEQUENCES['seqC'])
+
+def write_inputs(work_dir):
+    constraint_file = os.path.join(work_dir, "constraints.txt")
+    with open(constraint_file, 'w') as f:
+        for name, constraint in CONSTRAINTS.items():
+            f.write(f">{name} from the batch\n{constraint[:20]}\n{constraint[20:]}\n")
+    shape_dir = os.path.join(work_dir, "shape")
+    os.makedirs(os.path.join(shape_dir, "nested.shape"))
+    seq = SEQUENCES['seqB']
+    for name in ("seqB.dat", "seqB.shape", "seqC.txt", "seqA.csv"):
+        with open(os.path.join(shape_dir, name), 'w') as f:
+            f.write(''.join(f"{i} {base} {1.2 if base == 'A' else 0.05}\n" for i, base in enumerate(seq, start=1)))
+    return constraint_file, shape_dir
+
+def direct_constrained_mfe(seq, constraint):
+    fc = RNA.fold_compound(seq, engine.configure_model_details({}))
+    fc.hc_add_from_db(constraint, RNA.CONSTRAINT_DB_DEFAULT)
+    return fc.mfe()
+
+def test_readers():
+    print("\n--- Testing Constraint File and SHAPE Directory Readers ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_sequence_inputs_")
+    try:
+        constraint_file, shape_dir = write_inputs(work_dir)
+        check("Constraint records (multi-line)", CONSTRAINTS, engine.read_constraint_records(constraint_file))
+        index = engine.index_shape_directory(shape_dir)
+        check("SHAPE index (first extension wins, others ignored)",
+              {'seqB': os.path.join(shape_dir, "seqB.dat"), 'seqC': os.path.join(shape_dir, "seqC.txt")}, index)
+        try:
+            engine.index_shape_directory(os.path.join(work_dir, "missing"))
+            check("Missing SHAPE directory rejected", True, False)
+        except FileNotFoundError:
+            check("Missing SHAPE directory rejected", True, True)
+        check("No per-sequence inputs", {'constraints': {}, 'shape': {}}, engine.load_sequence_inputs({}))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_job_profiles():
+    print("\n--- Testing Per-Sequence Job Profiles ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_sequence_inputs_")
+    try:
+        constraint_file, shape_dir = write_inputs(work_dir)
+        profile = {
+            'constraints': {'file': constraint_file, 'string': BATCH_CONSTRAINT, 'enforce': True,
+                            'scan': ["x" + "." * 25]},
+            'shape_reactivity': {'dir': shape_dir, 'method': 'deigan'},
+        }
+        inputs = engine.load_sequence_inputs(profile)
+        check("Inputs loaded", (['seqA', 'seqB'], ['seqB', 'seqC']), (sorted(inputs['constraints']), sorted(inputs['shape'])))
+        check("Unchanged without inputs", True, engine.job_profile(profile, 'seqA', {'constraints': {}, 'shape': {}}) is profile)
+
+        profiles = {name: engine.job_profile(profile, name, inputs) for name in SEQUENCES}
+        check("seqA constraint", CONSTRAINTS['seqA'], profiles['seqA']['constraints']['string'])
+        check("seqA has no SHAPE file", None, profiles['seqA']['shape_reactivity'].get('file'))
+        check("seqB SHAPE file", os.path.join(shape_dir, "seqB.dat"), profiles['seqB']['shape_reactivity']['file'])
+        check("seqC keeps the batch constraint", BATCH_CONSTRAINT, profiles['seqC']['constraints']['string'])
+        check("Batch-wide keys removed", (False, False, False),
+              ('file' in profiles['seqA']['constraints'], 'scan' in profiles['seqA']['constraints'],
+               'dir' in profiles['seqB']['shape_reactivity']))
+        check("Batch profile untouched", (BATCH_CONSTRAINT, shape_dir),
+              (profile['constraints']['string'], profile['shape_reactivity']['dir']))
+        check("Other settings kept", ('deigan', True),
+              (profiles['seqB']['shape_reactivity']['method'], profiles['seqB']['constraints']['enforce']))
+
+        for name in CONSTRAINTS:
+            structure, mfe = direct_constrained_mfe(SEQUENCES[name], CONSTRAINTS[name])
+            single = {'constraints': {'string': CONSTRAINTS[name]},
+                      'shape_reactivity': dict(profiles[name]['shape_reactivity'])}
+            _, _, expected = engine.fold_sequence(SEQUENCES[name], single)
+            engine_structure, _, stats = engine.fold_sequence(SEQUENCES[name], profiles[name])
+            check(f"{name} folds as a single-sequence run", round(expected['mfe'], 4), round(stats['mfe'], 4))
+            if name == 'seqA':
+                check("seqA constrained fold vs RNAlib", (structure, round(mfe, 4)), (engine_structure, round(stats['mfe'], 4)))
+            else:
+                check("seqB SHAPE data applied", True, round(mfe, 4) != round(stats['mfe'], 4))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_readers()
+    test_job_profiles()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
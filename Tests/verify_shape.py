@@ -0,0 +1,89 @@
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNA
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+SEQ = "GGGGAAACCCCAUAUGGGGAAACCCCAUAGCGCUUCGGCGCA"
+# Hairpin loops reactive, stems protected; positions 20-23 have no data, 30 is NA
+REACTIVITY = {i: (1.2 if SEQ[i - 1] == 'A' else 0.05) for i in range(1, len(SEQ) + 1) if not 20 <= i <= 23}
+
+def write_shape_file(path, reactivity, missing_na=(30,)):
+    with open(path, 'w') as f:
+        for i, value in sorted(reactivity.items()):
+            f.write(f"{i} {SEQ[i - 1]} {'NA' if i in missing_na else value}\n")
+
+def observed(reactivity, missing=-1.0, missing_na=(30,)):
+    """1-based list as RNAlib takes it: reactivities, `missing` where there is no data."""
+    return [missing] + [reactivity[i] if i in reactivity and i not in missing_na else missing for i in range(1, len(SEQ) + 1)]
+
+def engine_mfe(path, method, **extra):
+    profile = {'shape_reactivity': dict({'file': path, 'method': method}, **extra)}
+    _, _, stats = engine.fold_sequence(SEQ, profile)
+    return round(stats['mfe'], 4)
+
+def reference_mfe(add_constraints):
+    fc = RNA.fold_compound(SEQ, engine.configure_model_details({}))
+    add_constraints(fc)
+    return round(fc.mfe()[1], 4)
+
+def test_methods_match_rnalib():
+    print("\n--- Testing SHAPE Methods against RNAlib ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_shape_")
+    try:
+        path = os.path.join(work_dir, "react.shape")
+        write_shape_file(path, REACTIVITY)
+        s = engine.DEFAULT_SHAPE_SETTINGS
+        check("Deigan (sc_set_stack) = sc_add_SHAPE_deigan",
+              reference_mfe(lambda fc: fc.sc_add_SHAPE_deigan(observed(REACTIVITY), s['slope'], s['intercept'])),
+              engine_mfe(path, 'Deigan'))
+        check("Zarringhalam = sc_add_SHAPE_zarringhalam",
+              reference_mfe(lambda fc: fc.sc_add_SHAPE_zarringhalam(observed(REACTIVITY), s['beta'], s['default_value'], s['conversion'])),
+              engine_mfe(path, 'Zarringhalam'))
+
+        def add_up(fc):
+            for i, value in enumerate(observed(REACTIVITY, missing=0.0)[1:], start=1):
+                if value:
+                    fc.sc_add_up(i, value)
+        check("Washietl (sc_set_up) = per-position sc_add_up", reference_mfe(add_up), engine_mfe(path, 'Washietl'))
+        check("SHAPE changes the fold", True, engine_mfe(path, 'Deigan') != reference_mfe(lambda fc: None))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_cache_invalidated_by_edit():
+    print("\n--- Testing Reactivity Cache Invalidation ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_shape_")
+    try:
+        path = os.path.join(work_dir, "react.shape")
+        write_shape_file(path, REACTIVITY)
+        params = (engine.DEFAULT_SHAPE_SETTINGS['slope'], engine.DEFAULT_SHAPE_SETTINGS['intercept'])
+        stamp = engine.shape_file_stamp(path)
+        first = engine.shape_vector(path, stamp, len(SEQ), 'deigan', params)
+        hits = engine.shape_vector.cache_info().hits
+        engine.shape_vector(path, engine.shape_file_stamp(path), len(SEQ), 'deigan', params)
+        check("Unchanged file served from cache", hits + 1, engine.shape_vector.cache_info().hits)
+
+        write_shape_file(path, {i: 2.0 for i in REACTIVITY})
+        os.utime(path, ns=(stamp[0] + 10**9, stamp[0] + 10**9))  # Distinct stamp even on coarse-mtime filesystems
+        new_stamp = engine.shape_file_stamp(path)
+        check("Edit gives a new stamp", True, new_stamp != stamp)
+        check("Edited file re-read", False, engine.shape_vector(path, new_stamp, len(SEQ), 'deigan', params) == first)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_methods_match_rnalib()
+    test_cache_invalidated_by_edit()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
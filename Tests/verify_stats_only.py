@@ -0,0 +1,78 @@
+import sys
+import os
+import csv
+import json
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+RECORDS = [("so1", "GGGGAAACCCCAUAUGGGGAAACCCCA"), ("so2", "AUGCUAGCUAGGCUAACGAUCGAUGCAUCGGAUCGAUCGAAU")]
+
+def test_stats_match_full_mode():
+    print("\n--- Testing Stats-only against Full Mode ---")
+    for name, seq in RECORDS:
+        _, _, full = engine.fold_sequence(seq, {})
+        for diversity in (False, True):
+            _, plist, stats = engine.fold_sequence(seq, {'algorithms': {'stats_only': True, 'diversity': diversity}})
+            label = f"{name} ({'with' if diversity else 'without'} diversity)"
+            check(f"{label} MFE", round(full['mfe'], 4), round(stats['mfe'], 4))
+            check(f"{label} ensemble energy", round(full['ensemble_energy'], 4), round(stats['ensemble_energy'], 4))
+            check(f"{label} frequency", round(float(full['frequency']), 6), round(float(stats['frequency']), 6))
+            check(f"{label} no plist", 0, len(plist))
+            check(f"{label} diversity", round(full['diversity'], 4) if diversity else None,
+                  round(stats['diversity'], 4) if diversity else stats['diversity'])
+
+def test_summary_table():
+    print("\n--- Testing summary.tsv ---")
+    engine.CONFIG.setdefault('output', {})['structure'] = 'flat'
+    work_dir = tempfile.mkdtemp(prefix="verify_stats_only_")
+    try:
+        fasta = os.path.join(work_dir, "input.fasta")
+        with open(fasta, 'w') as f:
+            f.writelines(f">{name}\n{seq}\n" for name, seq in RECORDS)
+        profile_path = os.path.join(work_dir, "profile.json")
+        with open(profile_path, 'w') as f:
+            json.dump({'algorithms': {'stats_only': True}}, f)
+        log = []
+        ok = engine.run_engine_programmatic(fasta, profile_path, output_dir=os.path.join(work_dir, "out"),
+                                            callback=log.append, executor='serial')
+        check("Run completed", True, ok)
+        check("Diversity trade-off logged", True, any("diversity: NA (enable algorithms.diversity" in line for line in log))
+        with open(os.path.join(work_dir, "out", "summary.tsv"), 'r') as f:
+            rows = {row['sequence_name']: row for row in csv.DictReader(f, delimiter='\t')}
+        check("One row per sequence", sorted(name for name, _ in RECORDS), sorted(rows))
+        _, _, full = engine.fold_sequence(RECORDS[0][1], {})
+        check("Table MFE", round(full['mfe'], 2), round(float(rows['so1']['mfe']), 2))
+        check("Table diversity", "NA", rows['so1']['diversity'])
+        check("No per-sequence folders", False, os.path.isdir(os.path.join(work_dir, "out", "so1")))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_fold_many_ignores_stats_only():
+    print("\n--- Testing fold_many with a Stats-only Profile ---")
+    expected = {name: engine.fold_record(name, seq, {}) for name, seq in RECORDS}
+    results = list(engine.fold_many(RECORDS, {'algorithms': {'stats_only': True}}, max_workers=1, executor='serial'))
+    check("No error rows", [], [r['error'] for r in results if 'error' in r])
+    for result in results:
+        name = result['sequence_name']
+        full = expected[name]
+        check(f"{name} diversity", round(full['stats']['diversity'], 4), round(result['stats']['diversity'], 4))
+        check(f"{name} pair probabilities kept", len(full['bpp_p']), len(result['bpp_p']))
+        check(f"{name} Pi", True, bool(result['pi'].any()) and float(abs(full['pi'] - result['pi']).max()) < 1e-6)
+
+if __name__ == "__main__":
+    test_stats_match_full_mode()
+    test_summary_table()
+    test_fold_many_ignores_stats_only()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
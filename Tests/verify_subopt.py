@@ -0,0 +1,77 @@
+import sys
+import os
+import io
+import gzip
+import shutil
+import contextlib
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNA
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+SEQ = "GCUAAAGACAAUUACAUAACAUACACGUCAGCACGAAACUUGUUGGCCCAGUGUGAAUCG"
+DELTA = 3.0
+
+def structure_lines(path):
+    """Structure lines of a subopt file (header, sequence line skipped)."""
+    with gzip.open(path, 'rt') as f:
+        return [line for line in f if line[0] in '.(']
+
+def test_uncapped_matches_rnalib():
+    print("\n--- Testing Uncapped Enumeration ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_subopt_")
+    try:
+        path = os.path.join(work_dir, "s_subopt.txt.gz")
+        settings = dict(engine.DEFAULT_SUBOPT_SETTINGS, delta=DELTA, max_structures=0)
+        stats = engine.enumerate_suboptimals(SEQ, {}, settings, path, "s")
+        md = engine.configure_model_details({})
+        md.uniq_ML = 1
+        expected = len(RNA.fold_compound(SEQ, md).subopt(int(DELTA * 100)))
+        check("Count matches fc.subopt(delta)", expected, stats['structures'])
+        check("Lines written", expected, len(structure_lines(path)))
+        check("Not truncated", False, stats['truncated'])
+        check("Histogram total", expected, sum(stats['histogram']))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_cap_truncates():
+    print("\n--- Testing max_structures Cap ---")
+    work_dir = tempfile.mkdtemp(prefix="verify_subopt_")
+    try:
+        path = os.path.join(work_dir, "s_subopt.txt.gz")
+        full_path = os.path.join(work_dir, "full_subopt.txt.gz")
+        engine.enumerate_suboptimals(SEQ, {}, dict(engine.DEFAULT_SUBOPT_SETTINGS, delta=DELTA, max_structures=0), full_path)
+        full = structure_lines(full_path)
+        for cap in (5, 8):
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                stats = engine.enumerate_suboptimals(SEQ, {}, dict(engine.DEFAULT_SUBOPT_SETTINGS, delta=DELTA, max_structures=cap), path)
+            lines = structure_lines(path)
+            check(f"[cap {cap}] Truncated", True, stats['truncated'])
+            check(f"[cap {cap}] Count", cap, stats['structures'])
+            check(f"[cap {cap}] Lines written", cap, len(lines))
+            check(f"[cap {cap}] Histogram total", cap, sum(stats['histogram']))
+            check(f"[cap {cap}] stderr clean", "", stderr.getvalue())
+            check(f"[cap {cap}] Subset of the full enumeration", True, set(lines) <= set(full))
+            # Lowest energies first: nothing left out lies below the band that fitted completely
+            kept = sorted(float(line.split()[-1]) for line in lines)
+            left_out = sorted(float(line.split()[-1]) for line in set(full) - set(lines))
+            check(f"[cap {cap}] MFE structure kept", round(stats['mfe'], 2), kept[0])
+            check(f"[cap {cap}] Lower energies kept", True, left_out[0] >= kept[cap // 2])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_uncapped_matches_rnalib()
+    test_cap_truncates()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")
@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+import subprocess
+import threading
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RNAfold_App"))
+import RNAfold_to_RNArtist_engine as engine
+
+FAILURES = []
+
+def check(label, expected, got):
+    print(f"{label}: Expected {expected}, Got {got}")
+    if expected != got:
+        FAILURES.append(label)
+
+def sleeper(seconds):
+    """Child in its own process group, like an RNArtistCore JVM."""
+    group_args = {'start_new_session': True} if os.name == 'posix' else {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return subprocess.Popen([sys.executable, "-c", f"import time; time.sleep({seconds})"], **group_args)
+
+def test_process_timeout():
+    print("\n--- Testing Process Timeout ---")
+    t_start = time.time()
+    _, _, status = engine._wait_for_process(sleeper(30), timeout=0.5)
+    check("Status", "timeout", status)
+    check("Killed within 5 s", True, time.time() - t_start < 5)
+
+def test_process_cancel():
+    print("\n--- Testing Process Cancellation ---")
+    cancel = threading.Event()
+    engine.init_worker(None, cancel)
+    try:
+        threading.Timer(0.3, cancel.set).start()
+        _, _, status = engine._wait_for_process(sleeper(30))
+        check("Status", "cancelled", status)
+        try:
+            engine.check_cancelled("render")
+            check("check_cancelled raises", True, False)
+        except engine.RunCancelledError as e:
+            check("check_cancelled raises", True, True)
+            check("Stage", "render", e.stage)
+    finally:
+        engine.init_worker(None, None)
+
+def test_isolated_fold():
+    print("\n--- Testing Isolated Fold ---")
+    seq = "GGGGAAAACCCCAUGCAUGCAGGGAAACCC"
+    structure, plist, stats = engine.fold_sequence(seq, {})
+    iso_structure, iso_plist, iso_stats = engine.fold_sequence_isolated(seq, {}, timeout=60)
+    check("Structure", structure, iso_structure)
+    check("MFE", round(stats['mfe'], 4), round(iso_stats['mfe'], 4))
+    pi = engine.compute_base_pairing_probabilities(seq, plist)
+    iso_pi = engine.compute_base_pairing_probabilities(seq, iso_plist)
+    check("Pi values match", True, bool(abs(pi - iso_pi).max() < 1e-9))
+
+def test_isolated_fold_from_thread():
+    print("\n--- Testing Isolated Fold from a Pool Thread ---")
+    seq = "GGGGAAAACCCCAUGCAUGCAGGGAAACCC"
+    check("Start method", True, engine._fold_process_context().get_start_method() != 'fork')
+    # Another thread holds the params lock, as a concurrent fold would: a forked child would inherit it locked
+    results = []
+    with engine._PARAMS_LOCK:
+        worker = threading.Thread(target=lambda: results.append(engine.fold_sequence_isolated(seq, {}, timeout=30)))
+        t_start = time.time()
+        worker.start()
+        worker.join(40)
+    check("Fold completed", 1, len(results))
+    check("Within 20 s (no inherited lock)", True, time.time() - t_start < 20)
+
+if __name__ == "__main__":
+    test_process_timeout()
+    test_process_cancel()
+    test_isolated_fold()
+    test_isolated_fold_from_thread()
+    if FAILURES:
+        print(f"\nFAILED: {', '.join(FAILURES)}")
+        sys.exit(1)
+    print("\nVerification Checks Complete.")